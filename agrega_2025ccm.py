@@ -1,12 +1,13 @@
 import pandas as pd
 import re
+from modules.data.operadores import es_operador, normalizar_operadores
 
 # Leer el archivo fuente
 csv_path = '2025ccm.csv'
 df = pd.read_csv(csv_path, sep=';', dtype=str)
 
 # Excluir la fila TOTAL si existe
-df = df[~df['EVALUADORES'].str.strip().str.upper().eq('TOTAL')]
+df = df[~es_operador(df['EVALUADORES'], ['TOTAL'])]
 
 # Transformar a formato largo
 df_melted = df.melt(id_vars=['EVALUADORES'], var_name='FechaOriginal', value_name='Pendientes')
@@ -33,14 +34,14 @@ df_melted['Fecha'] = df_melted['FechaOriginal'].apply(convertir_fecha_2025)
 df_melted = df_melted[['Fecha', 'Proceso', 'OPERADOR', 'Año', 'Pendientes']]
 df_melted = df_melted[df_melted['Pendientes'].notna()]
 df_melted['Pendientes'] = df_melted['Pendientes'].replace('', '0').astype(int)
-df_melted['OPERADOR'] = df_melted['OPERADOR'].str.strip().str.upper()
+df_melted['OPERADOR'] = normalizar_operadores(df_melted['OPERADOR'])
 df_melted['Año'] = df_melted['Año'].astype(str)
 
 # Leer el histórico existente
 historico_path = 'ARCHIVOS/historico_pendientes_operador.csv'
 try:
     historico = pd.read_csv(historico_path, dtype=str)
-    historico['OPERADOR'] = historico['OPERADOR'].str.strip().str.upper()
+    historico['OPERADOR'] = normalizar_operadores(historico['OPERADOR'])
     historico['Año'] = historico['Año'].astype(str)
 except FileNotFoundError:
     historico = pd.DataFrame(columns=df_melted.columns)
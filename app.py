@@ -3,14 +3,34 @@ Dashboard de Análisis de Procesos
 Aplicación principal de Streamlit
 """
 
+import importlib
+import time
+from typing import Callable, Tuple
 import streamlit as st
-from modules.data.loader import cargar_datos, obtener_archivos_proceso
-from modules.components.dashboard_ejecutivo import mostrar_dashboard_ejecutivo
-from modules.components.pendientes import mostrar_pendientes
-from modules.components.produccion_diaria import mostrar_produccion_diaria
-from modules.components.ingresos_diarios import mostrar_ingresos_diarios
-from modules.components.proyeccion_cierre import mostrar_proyeccion_cierre
-from modules.components.evolucion_pendientes import mostrar_evolucion_pendientes
+from modules.data.loader import (
+    cargar_datos, obtener_archivos_proceso, procesar_pendientes,
+    crear_tabla_pendientes, registrar_snapshot_pendientes
+)
+from modules.data.snapshots import Snapshot, modo_snapshot, snapshot_activo
+from modules.components.reporte_completo import boton_reporte_completo
+from modules.components.panel_rendimiento import perfilado_solicitado, mostrar_panel_rendimiento
+from modules.components.panel_memoria import mostrar_panel_memoria
+from modules.utils.cache import obtener_cache
+from modules.utils.perfilado import iniciar_perfilado, finalizar_perfilado, medir
+from modules.utils.memoria import iniciar_rastreo, tracemalloc_por_entorno
+from modules.utils.metricas import iniciar_servidor_metricas, publicar_metricas, registrar_rerun
+from modules.api.servidor import iniciar_servidor_api
+
+# Vistas del dashboard: etiqueta -> (módulo, función, necesita los datos del proceso).
+# Cada módulo se importa la primera vez que se abre su vista.
+VISTAS = {
+    "🎯 Dashboard Ejecutivo": ("modules.components.dashboard_ejecutivo", "mostrar_dashboard_ejecutivo", False),
+    "📋 Pendientes": ("modules.components.pendientes", "mostrar_pendientes", True),
+    "📈 Producción Diaria": ("modules.components.produccion_diaria", "mostrar_produccion_diaria", True),
+    "📥 Ingresos Diarios": ("modules.components.ingresos_diarios", "mostrar_ingresos_diarios", True),
+    "🎯 Proyección de Cierre": ("modules.components.proyeccion_cierre", "mostrar_proyeccion_cierre", True),
+    "📊 Evolución Pendientes": ("modules.components.evolucion_pendientes", "mostrar_evolucion_pendientes", True)
+}
 
 def main():
     """
@@ -24,6 +44,23 @@ def main():
         initial_sidebar_state="expanded"
     )
     
+    inicio_rerun = time.perf_counter()
+    
+    # Endpoint de métricas operativas (una sola vez por proceso, si está configurado)
+    iniciar_servidor_metricas()
+    
+    # API JSON sobre los mismos datasets y caché (una sola vez por proceso, si está configurada)
+    iniciar_servidor_api()
+    
+    # Atribución de memoria con tracemalloc (antes de cargar datos)
+    if tracemalloc_por_entorno():
+        iniciar_rastreo()
+    
+    # Perfilado del rerun (oculto salvo que se active)
+    perfilado = perfilado_solicitado()
+    if perfilado:
+        iniciar_perfilado()
+    
     # Título principal
     st.title("📊 Dashboard de Análisis de Procesos")
     
@@ -35,7 +72,61 @@ def main():
         help="Selecciona CCM o PRR para cargar los datos correspondientes"
     )
     
-    # Cargar datos
+    # Navegación: solo se ejecuta la vista activa en cada rerun
+    vista = st.radio(
+        "Vista",
+        list(VISTAS),
+        horizontal=True,
+        key="vista",
+        label_visibility="collapsed"
+    )
+    mostrar_vista, necesita_datos = _cargar_vista(vista)
+    
+    if necesita_datos:
+        with medir("cargar_proceso"):
+            df = _cargar_proceso(proceso)
+        with medir(mostrar_vista.__name__, len(df) if df is not None else None):
+            mostrar_vista(df, proceso)
+    else:
+        with medir(mostrar_vista.__name__):
+            mostrar_vista()
+    
+    # Reporte consolidado (se genera solo al pulsar el botón)
+    boton_reporte_completo()
+    
+    # Estado de la caché de cálculos
+    _mostrar_estado_cache()
+    
+    if perfilado:
+        mostrar_panel_rendimiento(finalizar_perfilado())
+        mostrar_panel_memoria()
+    
+    # Métricas operativas del rerun
+    registrar_rerun(mostrar_vista.__name__, time.perf_counter() - inicio_rerun)
+    publicar_metricas()
+
+def _cargar_vista(vista: str) -> Tuple[Callable, bool]:
+    """
+    Importa el módulo de la vista (solo la primera vez) y retorna su función
+    y si necesita los datos del proceso
+    """
+    modulo, funcion, necesita_datos = VISTAS[vista]
+    return getattr(importlib.import_module(modulo), funcion), necesita_datos
+
+def _cargar_proceso(proceso: str):
+    """
+    Carga los datos del proceso seleccionado y registra el snapshot de pendientes
+
+    En modo snapshot no carga nada y retorna None: las vistas leen los
+    resultados materializados.
+    """
+    snapshot = snapshot_activo()
+    if snapshot is not None:
+        _mostrar_estado_snapshot(snapshot)
+        return None
+    if modo_snapshot():
+        st.sidebar.warning("No hay un snapshot válido; los datos se calculan en vivo.")
+    
     try:
         archivos_proceso = obtener_archivos_proceso()
         archivo = archivos_proceso[proceso]
@@ -50,39 +141,39 @@ def main():
         st.error(f"Error al cargar los datos: {str(e)}")
         st.stop()
     
-    # Navegación por pestañas
-    tab0, tab1, tab2, tab3, tab4, tab5 = st.tabs([
-        "🎯 Dashboard Ejecutivo",
-        "📋 Pendientes",
-        "📈 Producción Diaria", 
-        "📥 Ingresos Diarios",
-        "🎯 Proyección de Cierre",
-        "📊 Evolución Pendientes"
-    ])
-    
-    # Pestaña 0: Dashboard Ejecutivo
-    with tab0:
-        mostrar_dashboard_ejecutivo()
-    
-    # Pestaña 1: Pendientes
-    with tab1:
-        mostrar_pendientes(df, proceso)
-    
-    # Pestaña 2: Producción Diaria
-    with tab2:
-        mostrar_produccion_diaria(df, proceso)
-    
-    # Pestaña 3: Ingresos Diarios
-    with tab3:
-        mostrar_ingresos_diarios(df, proceso)
-    
-    # Pestaña 4: Proyección de Cierre
-    with tab4:
-        mostrar_proyeccion_cierre(df, proceso)
-    
-    # Pestaña 5: Evolución de Pendientes
-    with tab5:
-        mostrar_evolucion_pendientes(df, proceso)
+    # Guardado del histórico de pendientes (una vez por día y versión de datos)
+    tabla = crear_tabla_pendientes(procesar_pendientes(df, proceso), proceso)
+    registrar_snapshot_pendientes(tabla, proceso)
+    
+    return df
+
+def _mostrar_estado_snapshot(snapshot: Snapshot):
+    """
+    Muestra en la barra lateral la versión del snapshot servido y si quedó desactualizado
+    """
+    st.sidebar.info(f"Snapshot del {snapshot.creado:%d/%m/%Y %H:%M} (solo lectura)")
+    modificadas = snapshot.entradas_modificadas()
+    if modificadas:
+        nombres = ", ".join(ruta.split("/")[-1] for ruta in modificadas)
+        st.sidebar.warning(
+            f"Los archivos cambiaron después del snapshot ({nombres}); "
+            "ejecutar genera_snapshots.py para actualizarlo."
+        )
+
+def _mostrar_estado_cache():
+    """
+    Muestra en la barra lateral los contadores de la caché de cálculos
+    """
+    stats = obtener_cache().estadisticas()
+    with st.sidebar.expander("Caché de cálculos"):
+        st.caption(
+            f"Aciertos: {stats['aciertos']:,} · Fallos: {stats['fallos']:,} "
+            f"({stats['tasa_aciertos']:.0%})"
+        )
+        st.caption(
+            f"Entradas: {stats['entradas']:,} · Expulsiones: {stats['expulsiones']:,} · "
+            f"{stats['bytes'] / 1024**2:.1f} / {stats['presupuesto_bytes'] / 1024**2:.0f} MB"
+        )
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
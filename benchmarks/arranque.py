@@ -0,0 +1,57 @@
+"""
+Tiempo de arranque en frío del dashboard con python -X importtime
+
+Importa el módulo en un intérprete nuevo (sin módulos ya cargados) y lee el
+informe de -X importtime, que da el tiempo acumulado de cada importación
+incluyendo sus dependencias.
+
+Uso:
+    python -m benchmarks.arranque [--modulo app] [--top 20]
+"""
+
+import argparse
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict
+
+# Directorio desde el que se importa (la raíz del repositorio)
+RAIZ_REPOSITORIO = Path(__file__).resolve().parent.parent
+
+MODULO_ARRANQUE = 'app'
+
+def tiempos_importacion(modulo: str = MODULO_ARRANQUE) -> Dict[str, float]:
+    """
+    Importa un módulo en un intérprete nuevo y mide cada importación
+
+    Args:
+        modulo: Módulo a importar (por defecto, la aplicación)
+
+    Returns:
+        Segundos acumulados por módulo importado, de mayor a menor
+    """
+    salida = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {modulo}'],
+        cwd=RAIZ_REPOSITORIO, capture_output=True, text=True, check=True
+    ).stderr
+    tiempos = {}
+    for linea in salida.splitlines():
+        partes = linea.removeprefix('import time:').split('|')
+        if len(partes) != 3 or not partes[1].strip().isdigit():
+            # Encabezado del informe
+            continue
+        tiempos[partes[2].strip()] = int(partes[1]) / 1e6
+    return dict(sorted(tiempos.items(), key=lambda t: t[1], reverse=True))
+
+def main():
+    parser = argparse.ArgumentParser(description="Importaciones más costosas del arranque en frío")
+    parser.add_argument("--modulo", default=MODULO_ARRANQUE, help="Módulo a importar")
+    parser.add_argument("--top", type=int, default=20, help="Módulos a mostrar")
+    args = parser.parse_args()
+
+    tiempos = tiempos_importacion(args.modulo)
+    for nombre, segundos in list(tiempos.items())[:args.top]:
+        print(f"{segundos * 1000:9.1f} ms  {nombre}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,18 @@
+"""
+Benchmarks de todos los casos registrados en benchmarks/casos.py
+
+Los ids son grupo-caso, por lo que un grupo se mide con -k (por ejemplo
+pytest benchmarks -k historico).
+"""
+
+import pytest
+from benchmarks.casos import CASOS, casos_de
+
+pytest.importorskip("pytest_benchmark")
+
+GRUPOS = list(dict.fromkeys(c.grupo for c in CASOS))
+
+@pytest.mark.parametrize('caso', [c for grupo in GRUPOS for c in casos_de(grupo)],
+                         ids=lambda c: f"{c.grupo}-{c.nombre}")
+def test_caso(medir_caso, caso):
+    medir_caso(caso)
@@ -0,0 +1,327 @@
+"""
+Casos de benchmark sobre datos sintéticos
+
+Cada caso prepara sus entradas fuera de la medición y devuelve la función a
+medir. Las funciones memoizadas se miden sin caché (sin_cache) y con la
+caché de derivados y la de disco desactivadas, para medir el cálculo y no
+el acierto de caché.
+"""
+
+import contextlib
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Iterator, List, Optional
+
+import pandas as pd
+
+from modules.data.loader import (
+    mascara_pendientes, procesar_pendientes, crear_tabla_pendientes, calcular_sin_asignar,
+    tipificar_consolidado, cargar_historico_pendientes, preparar_historico_pendientes,
+    actualizar_historico_pendientes, obtener_archivos_proceso
+)
+from modules.data.capas_evolucion import CapasEvolucion
+from modules.data.reconstruccion_pendientes import linea_pendientes
+from modules.data.sintetico import (
+    generar_consolidado, generar_historico_pendientes, generar_historico_sin_asignar
+)
+from modules.utils.analytics import agrupar_anios_antiguos, procesar_datos_produccion
+from modules.utils.cache import obtener_cache
+from modules.utils.cache_disco import cargar_artefacto, guardar_artefacto
+from modules.utils.executive_analytics import calcular_kpis_proceso, generar_tendencias_ejecutivas
+from modules.core import evolucion, ingresos, produccion
+from benchmarks.arranque import MODULO_ARRANQUE, tiempos_importacion
+
+# Tamaños por defecto (filas de cada consolidado y del histórico)
+TAMANOS_DEFECTO = (10_000, 100_000)
+
+# Tamaño máximo para el que se escribe y mide el Excel (escribirlo es lento)
+FILAS_EXCEL_DEFECTO = 20_000
+
+COL_OPERADOR, COL_FECHA, COL_TRAMITE = 'OperadorPre', 'FechaPre', 'NumeroTramite'
+
+@dataclass
+class DatosBenchmark:
+    """
+    Datos sintéticos de un tamaño; directorio contiene ARCHIVOS/
+    """
+    n_filas: int
+    directorio: Path
+    ccm: pd.DataFrame
+    prr: pd.DataFrame
+    historico: pd.DataFrame
+
+@dataclass
+class Medicion:
+    """
+    Función a medir y, opcionalmente, preparación (no medida) antes de cada ronda
+
+    preparar devuelve los argumentos posicionales de funcion.
+    """
+    funcion: Callable
+    preparar: Optional[Callable[[], tuple]] = None
+
+@dataclass(frozen=True)
+class Caso:
+    nombre: str
+    grupo: str
+    construir: Callable[[DatosBenchmark], Optional[Medicion]]
+
+CASOS: List[Caso] = []
+
+def tamanos_configurados() -> List[int]:
+    """
+    Tamaños a medir (BENCH_FILAS, separados por comas)
+    """
+    valor = os.environ.get('BENCH_FILAS')
+    return [int(t) for t in valor.split(',')] if valor else list(TAMANOS_DEFECTO)
+
+def filas_excel_maximas() -> int:
+    """
+    Tamaño máximo con lectura de Excel (BENCH_FILAS_EXCEL)
+    """
+    return int(os.environ.get('BENCH_FILAS_EXCEL', FILAS_EXCEL_DEFECTO))
+
+def preparar_entorno() -> None:
+    """
+    Desactiva la caché de derivados y la de disco
+    """
+    cache = obtener_cache()
+    cache.presupuesto_bytes = 0
+    cache.limpiar()
+    os.environ['DASHBOARD_CACHE_DISCO'] = '0'
+
+def preparar_datos(n_filas: int, directorio: Path) -> DatosBenchmark:
+    """
+    Genera los datos de un tamaño y escribe los archivos en directorio/ARCHIVOS
+
+    Args:
+        n_filas: Filas de cada consolidado y del histórico
+        directorio: Directorio de trabajo de los casos
+
+    Returns:
+        DatosBenchmark con los DataFrames ya tipados
+    """
+    archivos = Path(directorio) / 'ARCHIVOS'
+    archivos.mkdir(parents=True, exist_ok=True)
+
+    ccm = generar_consolidado(n_filas, 'CCM')
+    prr = generar_consolidado(n_filas, 'PRR')
+    historico = generar_historico_pendientes(n_filas)
+    historico.to_csv(archivos / 'historico_pendientes_operador.csv', index=False)
+    generar_historico_sin_asignar().to_csv(archivos / 'historico_sin_asignar.csv', index=False)
+    if n_filas <= filas_excel_maximas():
+        ccm.to_excel(archivos / obtener_archivos_proceso()['CCM'], index=False)
+
+    return DatosBenchmark(n_filas, Path(directorio), ccm, prr, historico)
+
+@contextlib.contextmanager
+def en_directorio(directorio: Path) -> Iterator[None]:
+    """
+    Cambia temporalmente de directorio (las rutas de ARCHIVOS/ son relativas)
+    """
+    anterior = os.getcwd()
+    os.chdir(directorio)
+    try:
+        yield
+    finally:
+        os.chdir(anterior)
+
+def caso(grupo: str) -> Callable:
+    """
+    Decorador que registra un caso; su nombre es el de la función decorada
+    """
+    def registrar(construir: Callable[[DatosBenchmark], Optional[Medicion]]):
+        CASOS.append(Caso(construir.__name__, grupo, construir))
+        return construir
+    return registrar
+
+def casos_de(grupo: str) -> List[Caso]:
+    """
+    Casos registrados de un grupo
+    """
+    return [c for c in CASOS if c.grupo == grupo]
+
+# === LOADER ===
+
+@caso('loader')
+def leer_consolidado_excel(d: DatosBenchmark) -> Optional[Medicion]:
+    ruta = d.directorio / 'ARCHIVOS' / obtener_archivos_proceso()['CCM']
+    if not ruta.exists():
+        return None
+    return Medicion(lambda: tipificar_consolidado(pd.read_excel(ruta)))
+
+@caso('loader')
+def tipificar_consolidado_texto(d: DatosBenchmark) -> Medicion:
+    crudo = d.ccm.copy()
+    for columna in ['FechaPre', 'FechaExpendiente']:
+        crudo[columna] = crudo[columna].dt.strftime('%Y-%m-%d')
+    return Medicion(tipificar_consolidado, preparar=lambda: (crudo.copy(),))
+
+@caso('loader')
+def rehidratar_cache_disco(d: DatosBenchmark) -> Medicion:
+    clave = f"benchmark:{d.n_filas}"
+    with _cache_disco_activa():
+        guardar_artefacto(clave, d.ccm)
+
+    def cargar():
+        with _cache_disco_activa():
+            return cargar_artefacto(clave)
+    return Medicion(cargar)
+
+@contextlib.contextmanager
+def _cache_disco_activa() -> Iterator[None]:
+    anterior = os.environ.get('DASHBOARD_CACHE_DISCO')
+    os.environ['DASHBOARD_CACHE_DISCO'] = '1'
+    try:
+        yield
+    finally:
+        if anterior is None:
+            os.environ.pop('DASHBOARD_CACHE_DISCO', None)
+        else:
+            os.environ['DASHBOARD_CACHE_DISCO'] = anterior
+
+# === PENDIENTES ===
+
+@caso('pendientes')
+def mascara_pendientes_ccm(d: DatosBenchmark) -> Medicion:
+    return Medicion(lambda: mascara_pendientes(d.ccm, 'CCM'))
+
+@caso('pendientes')
+def procesar_pendientes_ccm(d: DatosBenchmark) -> Medicion:
+    return Medicion(lambda: procesar_pendientes.sin_cache(d.ccm, 'CCM'))
+
+@caso('pendientes')
+def procesar_pendientes_prr(d: DatosBenchmark) -> Medicion:
+    return Medicion(lambda: procesar_pendientes.sin_cache(d.prr, 'PRR'))
+
+@caso('pendientes')
+def crear_tabla_pendientes_ccm(d: DatosBenchmark) -> Medicion:
+    filtrado = procesar_pendientes.sin_cache(d.ccm, 'CCM')
+    return Medicion(lambda: crear_tabla_pendientes.sin_cache(filtrado, 'CCM'))
+
+@caso('pendientes')
+def calcular_sin_asignar_ccm(d: DatosBenchmark) -> Medicion:
+    filtrado = procesar_pendientes.sin_cache(d.ccm, 'CCM')
+    return Medicion(lambda: calcular_sin_asignar.sin_cache(filtrado))
+
+# === PRODUCCIÓN E INGRESOS ===
+
+@caso('produccion')
+def crear_tabla_produccion(d: DatosBenchmark) -> Medicion:
+    df_20dias = produccion.filtrar_ultimos_20_dias.sin_cache(d.ccm, COL_FECHA)
+    return Medicion(lambda: produccion.crear_tabla_produccion.sin_cache(df_20dias, COL_OPERADOR, COL_FECHA, COL_TRAMITE))
+
+@caso('produccion')
+def crear_tabla_fines_semana(d: DatosBenchmark) -> Medicion:
+    return Medicion(lambda: produccion.crear_tabla_fines_semana.sin_cache(d.ccm, COL_OPERADOR, COL_FECHA, COL_TRAMITE))
+
+@caso('produccion')
+def calcular_resumen_diario(d: DatosBenchmark) -> Medicion:
+    df_20dias = produccion.filtrar_ultimos_20_dias.sin_cache(d.ccm, COL_FECHA)
+    return Medicion(lambda: produccion.calcular_resumen_diario.sin_cache(df_20dias, COL_OPERADOR, COL_FECHA, COL_TRAMITE))
+
+@caso('produccion')
+def procesar_datos_produccion_15_dias(d: DatosBenchmark) -> Medicion:
+    fechas = pd.Index(sorted(d.ccm[COL_FECHA].dropna().dt.strftime('%Y-%m-%d').unique())[-15:])
+    return Medicion(lambda: procesar_datos_produccion.sin_cache(
+        d.ccm, fechas, COL_OPERADOR, COL_FECHA, COL_TRAMITE
+    ))
+
+@caso('produccion')
+def calcular_ingresos_diarios(d: DatosBenchmark) -> Medicion:
+    return Medicion(lambda: ingresos.calcular_ingresos_diarios.sin_cache(d.ccm, 'FechaExpendiente', COL_TRAMITE))
+
+@caso('produccion')
+def calcular_promedio_semanal(d: DatosBenchmark) -> Medicion:
+    return Medicion(lambda: ingresos.calcular_promedio_semanal.sin_cache(d.ccm, 'FechaExpendiente', COL_TRAMITE))
+
+# === HISTÓRICO ===
+
+@caso('historico')
+def cargar_historico(d: DatosBenchmark) -> Medicion:
+    def cargar():
+        with en_directorio(d.directorio):
+            return cargar_historico_pendientes()
+    return Medicion(cargar)
+
+@caso('historico')
+def agrupar_anios(d: DatosBenchmark) -> Medicion:
+    return Medicion(lambda: agrupar_anios_antiguos.sin_cache(d.historico))
+
+@caso('historico')
+def preparar_historico(d: DatosBenchmark) -> Medicion:
+    tabla = crear_tabla_pendientes.sin_cache(procesar_pendientes.sin_cache(d.ccm, 'CCM'), 'CCM')
+    return Medicion(lambda: preparar_historico_pendientes(tabla, 'CCM'))
+
+@caso('historico')
+def actualizar_historico(d: DatosBenchmark) -> Medicion:
+    """Primera foto del día: todas las filas son nuevas respecto del CSV"""
+    ruta = d.directorio / 'ARCHIVOS' / 'historico_pendientes_operador.csv'
+    original = ruta.read_bytes()
+    tabla = crear_tabla_pendientes.sin_cache(procesar_pendientes.sin_cache(d.ccm, 'CCM'), 'CCM')
+    tabla_historico = preparar_historico_pendientes(tabla, 'CCM')
+
+    def preparar():
+        ruta.write_bytes(original)
+        return (tabla_historico,)
+
+    def actualizar(tabla_historico):
+        with en_directorio(d.directorio):
+            actualizar_historico_pendientes(tabla_historico)
+    return Medicion(actualizar, preparar)
+
+@caso('historico')
+def crear_matriz_evolucion(d: DatosBenchmark) -> Medicion:
+    historico = agrupar_anios_antiguos.sin_cache(d.historico)
+    anios = sorted(historico['Año'].unique(), reverse=True)
+    filtro = evolucion.filtrar_datos_historicos.sin_cache(historico, 'CCM', ['Todos'], anios)
+    return Medicion(lambda: evolucion.crear_matriz_evolucion.sin_cache(filtro))
+
+@caso('historico')
+def sincronizar_capas_evolucion(d: DatosBenchmark) -> Medicion:
+    """Día nuevo sobre capas ya sincronizadas con el resto del histórico"""
+    historico = agrupar_anios_antiguos.sin_cache(d.historico)
+    anterior = historico[historico['Fecha'] < historico['Fecha'].max()]
+
+    def preparar():
+        capas = CapasEvolucion('CCM')
+        capas.sincronizar(anterior)
+        return (capas,)
+    return Medicion(lambda capas: capas.sincronizar(historico), preparar)
+
+@caso('historico')
+def matriz_evolucion_capas(d: DatosBenchmark) -> Medicion:
+    capas = CapasEvolucion('CCM')
+    capas.sincronizar(agrupar_anios_antiguos.sin_cache(d.historico))
+    return Medicion(lambda: capas.matriz(['Todos']))
+
+@caso('historico')
+def linea_pendientes_ccm(d: DatosBenchmark) -> Medicion:
+    return Medicion(lambda: linea_pendientes.sin_cache(d.ccm, 'CCM'))
+
+@caso('historico')
+def reconstruir_serie_diaria(d: DatosBenchmark) -> Medicion:
+    """Foto diaria de pendientes de todos los años del consolidado"""
+    linea = linea_pendientes.sin_cache(d.ccm, 'CCM')
+    fechas = pd.date_range(d.ccm['FechaExpendiente'].min(), d.ccm['FechaExpendiente'].max())
+    return Medicion(lambda: linea.historico(fechas))
+
+# === DASHBOARD EJECUTIVO ===
+
+@caso('ejecutivo')
+def calcular_kpis_ccm(d: DatosBenchmark) -> Medicion:
+    return Medicion(lambda: calcular_kpis_proceso.sin_cache(d.ccm, 'CCM'))
+
+@caso('ejecutivo')
+def generar_tendencias(d: DatosBenchmark) -> Medicion:
+    return Medicion(lambda: generar_tendencias_ejecutivas(d.ccm, d.prr, historico=d.historico))
+
+# === ARRANQUE ===
+
+@caso('arranque')
+def importar_app(d: DatosBenchmark) -> Optional[Medicion]:
+    # No depende de los datos: se mide una sola vez, con el tamaño menor
+    if d.n_filas != min(tamanos_configurados()):
+        return None
+    return Medicion(lambda: tiempos_importacion()[MODULO_ARRANQUE])
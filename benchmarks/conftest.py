@@ -0,0 +1,28 @@
+"""
+Fixtures de la suite de benchmarks
+"""
+
+import pytest
+from benchmarks.casos import (
+    Caso, DatosBenchmark, en_directorio, preparar_datos, preparar_entorno, tamanos_configurados
+)
+
+@pytest.fixture(scope='session', params=tamanos_configurados(), ids=lambda n: f"{n}filas")
+def datos(request, tmp_path_factory) -> DatosBenchmark:
+    """Datos sintéticos de cada tamaño configurado, con las cachés desactivadas"""
+    preparar_entorno()
+    return preparar_datos(request.param, tmp_path_factory.mktemp(f"datos_{request.param}"))
+
+@pytest.fixture
+def medir_caso(benchmark, datos):
+    """Mide un caso con pytest-benchmark, omitiéndolo si no aplica al tamaño"""
+    def medir(caso: Caso):
+        with en_directorio(datos.directorio):
+            medicion = caso.construir(datos)
+        if medicion is None:
+            pytest.skip(f"{caso.nombre} no aplica a {datos.n_filas} filas")
+        benchmark.group = f"{caso.grupo}-{datos.n_filas}"
+        if medicion.preparar is None:
+            return benchmark(medicion.funcion)
+        return benchmark.pedantic(medicion.funcion, setup=lambda: (medicion.preparar(), {}), rounds=5)
+    return medir
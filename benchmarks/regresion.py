@@ -0,0 +1,291 @@
+"""
+Comparador de rendimiento contra una línea base
+
+Mide los casos de benchmark (mediana, p95 y pico de memoria por caso y
+tamaño), los guarda como línea base en JSON o los compara con una línea
+base guardada, y termina con código 1 si alguno empeora más de lo tolerado
+o si un caso de la línea base no se midió (renombrado o roto).
+
+Uso:
+    python -m benchmarks.regresion --guardar linea_base.json
+    python -m benchmarks.regresion --comparar linea_base.json --tolerancia 0.15
+
+La línea base solo es comparable en la misma máquina y con el mismo entorno.
+"""
+
+import argparse
+import datetime
+import gc
+import json
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.casos import (
+    CASOS, Caso, DatosBenchmark, en_directorio, preparar_datos, preparar_entorno,
+    tamanos_configurados
+)
+
+REPETICIONES_DEFECTO = 7
+
+# Tolerancias relativas por defecto (0.20 = hasta un 20 % peor)
+TOLERANCIA_TIEMPO = 0.20
+TOLERANCIA_P95 = 0.50
+TOLERANCIA_MEMORIA = 0.25
+
+# Diferencias absolutas por debajo de las cuales no se considera regresión (ruido)
+MINIMO_SEGUNDOS = 0.005
+MINIMO_MB = 1.0
+
+@dataclass
+class Resultado:
+    mediana_s: float
+    p95_s: float
+    memoria_pico_mb: float
+    repeticiones: int
+
+@dataclass
+class Comparacion:
+    clave: str
+    base: Optional[Resultado]
+    nuevo: Optional[Resultado]
+    problemas: List[str]
+    estado: str
+
+def clave_caso(caso: Caso, n_filas: int) -> str:
+    """
+    Clave del resultado en la línea base: grupo/caso/filas
+    """
+    return f"{caso.grupo}/{caso.nombre}/{n_filas}"
+
+def medir_caso(caso: Caso, datos: DatosBenchmark, repeticiones: int) -> Optional[Resultado]:
+    """
+    Mide un caso: una ronda de calentamiento, las rondas cronometradas (con
+    el recolector de basura desactivado, como timeit) y una ronda aparte con
+    tracemalloc para el pico de memoria
+
+    Returns:
+        Resultado, o None si el caso no aplica al tamaño
+    """
+    with en_directorio(datos.directorio):
+        medicion = caso.construir(datos)
+        if medicion is None:
+            return None
+
+        def argumentos() -> tuple:
+            return medicion.preparar() if medicion.preparar is not None else ()
+
+        medicion.funcion(*argumentos())
+
+        tiempos = []
+        for _ in range(repeticiones):
+            args = argumentos()
+            gc.collect()
+            gc.disable()
+            try:
+                inicio = time.perf_counter()
+                medicion.funcion(*args)
+                tiempos.append(time.perf_counter() - inicio)
+            finally:
+                gc.enable()
+
+        args = argumentos()
+        tracemalloc.start()
+        try:
+            medicion.funcion(*args)
+            _, pico = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+    return Resultado(
+        mediana_s=float(np.median(tiempos)),
+        p95_s=float(np.percentile(tiempos, 95)),
+        memoria_pico_mb=pico / 1024 ** 2,
+        repeticiones=repeticiones
+    )
+
+def ejecutar(tamanos: Sequence[int], grupos: Optional[Sequence[str]] = None,
+             repeticiones: int = REPETICIONES_DEFECTO) -> Dict[str, Resultado]:
+    """
+    Mide todos los casos seleccionados en cada tamaño
+
+    Args:
+        tamanos: Filas de los datos sintéticos
+        grupos: Grupos de casos a medir (por defecto todos)
+        repeticiones: Rondas cronometradas por caso
+
+    Returns:
+        Diccionario clave -> Resultado
+    """
+    preparar_entorno()
+    casos = [c for c in CASOS if grupos is None or c.grupo in grupos]
+    resultados: Dict[str, Resultado] = {}
+
+    for n_filas in tamanos:
+        with tempfile.TemporaryDirectory(prefix='bench_') as directorio:
+            datos = preparar_datos(n_filas, Path(directorio))
+            for caso in casos:
+                resultado = medir_caso(caso, datos, repeticiones)
+                if resultado is None:
+                    continue
+                clave = clave_caso(caso, n_filas)
+                resultados[clave] = resultado
+                print(f"  {clave:<60} {resultado.mediana_s * 1000:10.2f} ms", file=sys.stderr)
+
+    return resultados
+
+def guardar_linea_base(resultados: Dict[str, Resultado], ruta: Path) -> None:
+    """
+    Guarda los resultados y el entorno en que se midieron
+    """
+    contenido = {
+        'entorno': _entorno(),
+        'resultados': {clave: asdict(r) for clave, r in sorted(resultados.items())}
+    }
+    ruta.write_text(json.dumps(contenido, indent=2, ensure_ascii=False), encoding='utf-8')
+
+def cargar_linea_base(ruta: Path) -> Dict[str, Resultado]:
+    """
+    Lee los resultados de una línea base
+    """
+    contenido = json.loads(ruta.read_text(encoding='utf-8'))
+    return {clave: Resultado(**valores) for clave, valores in contenido['resultados'].items()}
+
+def comparar(base: Dict[str, Resultado], nuevo: Dict[str, Resultado],
+             tolerancia: float = TOLERANCIA_TIEMPO, tolerancia_p95: float = TOLERANCIA_P95,
+             tolerancia_memoria: float = TOLERANCIA_MEMORIA,
+             admitir_faltantes: bool = False) -> List[Comparacion]:
+    """
+    Compara una ejecución con la línea base
+
+    Un caso empeora si su mediana, su p95 o su pico de memoria superan el de
+    la línea base en más de la tolerancia relativa y de un mínimo absoluto.
+    Un caso de la línea base que no se midió cuenta como problema salvo con
+    admitir_faltantes.
+
+    Returns:
+        Una Comparacion por clave presente en cualquiera de los dos
+    """
+    comparaciones = []
+    for clave in sorted(set(base) | set(nuevo)):
+        b, n = base.get(clave), nuevo.get(clave)
+        problemas = []
+        if b is None:
+            comparaciones.append(Comparacion(clave, b, n, problemas, 'NUEVO'))
+            continue
+        if n is None:
+            if not admitir_faltantes:
+                problemas.append("no se midió")
+            comparaciones.append(Comparacion(clave, b, n, problemas, 'FALTA'))
+            continue
+
+        if _empeora(b.mediana_s, n.mediana_s, tolerancia, MINIMO_SEGUNDOS):
+            problemas.append(f"mediana {_variacion(b.mediana_s, n.mediana_s)}")
+        if _empeora(b.p95_s, n.p95_s, tolerancia_p95, MINIMO_SEGUNDOS):
+            problemas.append(f"p95 {_variacion(b.p95_s, n.p95_s)}")
+        if _empeora(b.memoria_pico_mb, n.memoria_pico_mb, tolerancia_memoria, MINIMO_MB):
+            problemas.append(f"memoria {_variacion(b.memoria_pico_mb, n.memoria_pico_mb)}")
+
+        if problemas:
+            estado = 'REGRESIÓN'
+        elif _empeora(n.mediana_s, b.mediana_s, tolerancia, MINIMO_SEGUNDOS):
+            estado = 'MEJORA'
+        else:
+            estado = 'OK'
+        comparaciones.append(Comparacion(clave, b, n, problemas, estado))
+    return comparaciones
+
+def formatear_informe(comparaciones: List[Comparacion]) -> str:
+    """
+    Informe legible de la comparación, con una fila por caso y tamaño
+    """
+    filas = []
+    for c in comparaciones:
+        filas.append({
+            'Caso': c.clave,
+            'Mediana base (ms)': c.base.mediana_s * 1000 if c.base else None,
+            'Mediana (ms)': c.nuevo.mediana_s * 1000 if c.nuevo else None,
+            'Δ mediana': _variacion(c.base.mediana_s, c.nuevo.mediana_s) if c.base and c.nuevo else '',
+            'p95 (ms)': c.nuevo.p95_s * 1000 if c.nuevo else None,
+            'Memoria (MB)': c.nuevo.memoria_pico_mb if c.nuevo else None,
+            'Δ memoria': _variacion(c.base.memoria_pico_mb, c.nuevo.memoria_pico_mb) if c.base and c.nuevo else '',
+            'Estado': c.estado
+        })
+    tabla = pd.DataFrame(filas).to_string(index=False, float_format=lambda v: f"{v:,.2f}", na_rep='-')
+
+    regresiones = [c for c in comparaciones if c.problemas]
+    detalle = [f"  {c.clave}: {', '.join(c.problemas)}" for c in regresiones]
+    resumen = f"{len(regresiones)} casos con problemas de {len(comparaciones)}"
+    return '\n'.join([tabla, '', resumen] + detalle)
+
+def _empeora(base: float, nuevo: float, tolerancia: float, minimo: float) -> bool:
+    return nuevo > base * (1 + tolerancia) and nuevo - base > minimo
+
+def _variacion(base: float, nuevo: float) -> str:
+    if base <= 0:
+        return 'n/a'
+    return f"{(nuevo - base) / base:+.1%}"
+
+def _entorno() -> Dict[str, str]:
+    return {
+        'fecha': datetime.datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'plataforma': platform.platform(),
+        'procesador': platform.processor() or platform.machine()
+    }
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks con línea base y detección de regresiones")
+    modo = parser.add_mutually_exclusive_group(required=True)
+    modo.add_argument('--guardar', type=Path, help="Guarda los resultados como línea base en este JSON")
+    modo.add_argument('--comparar', type=Path, help="Compara con la línea base de este JSON")
+    parser.add_argument('--tamanos', type=lambda v: [int(t) for t in v.split(',')],
+                        default=None, help="Filas separadas por comas (por defecto BENCH_FILAS)")
+    parser.add_argument('--grupos', type=lambda v: v.split(','), default=None,
+                        help="Grupos de casos: " + ', '.join(dict.fromkeys(c.grupo for c in CASOS)))
+    parser.add_argument('--repeticiones', type=int, default=REPETICIONES_DEFECTO)
+    parser.add_argument('--tolerancia', type=float, default=TOLERANCIA_TIEMPO,
+                        help="Empeoramiento relativo admitido en la mediana")
+    parser.add_argument('--tolerancia-p95', type=float, default=TOLERANCIA_P95)
+    parser.add_argument('--tolerancia-memoria', type=float, default=TOLERANCIA_MEMORIA)
+    parser.add_argument('--admitir-faltantes', action='store_true',
+                        help="No falla si un caso de la línea base no se midió (por ejemplo, al renombrarlo)")
+    parser.add_argument('--salida', type=Path, default=None,
+                        help="En modo comparar, guarda también los resultados nuevos en este JSON")
+    args = parser.parse_args(argv)
+
+    tamanos = args.tamanos or tamanos_configurados()
+    resultados = ejecutar(tamanos, args.grupos, args.repeticiones)
+
+    if args.guardar:
+        guardar_linea_base(resultados, args.guardar)
+        print(f"Línea base guardada en {args.guardar} ({len(resultados)} casos)")
+        return 0
+
+    base = cargar_linea_base(args.comparar)
+    # Solo se comparan los casos de los tamaños y grupos medidos ahora
+    base = {
+        clave: r for clave, r in base.items()
+        if int(clave.rsplit('/', 1)[1]) in tamanos
+        and (args.grupos is None or clave.split('/', 1)[0] in args.grupos)
+    }
+    comparaciones = comparar(base, resultados, args.tolerancia, args.tolerancia_p95,
+                             args.tolerancia_memoria, args.admitir_faltantes)
+    print(formatear_informe(comparaciones))
+    if args.salida:
+        guardar_linea_base(resultados, args.salida)
+
+    return 1 if any(c.problemas for c in comparaciones) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
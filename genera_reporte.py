@@ -0,0 +1,27 @@
+"""
+Genera el reporte completo en Excel (todas las tablas de CCM y PRR) sin abrir el dashboard
+
+Uso:
+    python genera_reporte.py [--salida reporte.xlsx] [--procesos CCM PRR] [--hilos N]
+"""
+
+import argparse
+import time
+from modules.components.reporte_completo import PROCESOS_REPORTE, generar_reporte_completo
+
+def main():
+    parser = argparse.ArgumentParser(description="Genera el reporte completo del dashboard en Excel")
+    parser.add_argument("--salida", default="reporte_completo.xlsx", help="Ruta del archivo a generar")
+    parser.add_argument("--procesos", nargs="+", choices=PROCESOS_REPORTE, default=list(PROCESOS_REPORTE),
+                        help="Procesos a incluir")
+    parser.add_argument("--hilos", type=int, default=None, help="Máximo de hilos para construir las tablas")
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    reporte = generar_reporte_completo(args.procesos, args.hilos)
+    with open(args.salida, "wb") as f:
+        f.write(reporte.getvalue())
+    print(f"Reporte guardado en {args.salida} ({time.perf_counter() - inicio:.1f} s)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+Materializa los resultados de todas las pestañas para el modo snapshot del dashboard
+
+Pensado para ejecutarse al llegar el consolidado del día (por ejemplo desde cron).
+El dashboard los sirve sin recalcular con DASHBOARD_SNAPSHOTS=<directorio>.
+
+Uso:
+    python genera_snapshots.py [--directorio snapshots] [--procesos CCM PRR] [--hilos N]
+                               [--conservar 3] [--forzar] [--sin-historicos]
+"""
+
+import argparse
+import os
+from pathlib import Path
+from modules.core.materializacion import materializar
+from modules.data.loader import obtener_archivos_proceso
+from modules.data.snapshots import DIRECTORIO_DEFECTO, VERSIONES_CONSERVADAS
+
+def main():
+    procesos = list(obtener_archivos_proceso())
+    parser = argparse.ArgumentParser(description="Genera los snapshots materializados del dashboard")
+    parser.add_argument("--directorio", default=os.environ.get('DASHBOARD_SNAPSHOTS', DIRECTORIO_DEFECTO),
+                        help="Directorio de snapshots (por defecto DASHBOARD_SNAPSHOTS o snapshots)")
+    parser.add_argument("--procesos", nargs="+", choices=procesos, default=procesos, help="Procesos a incluir")
+    parser.add_argument("--hilos", type=int, default=None, help="Máximo de hilos para los cálculos")
+    parser.add_argument("--conservar", type=int, default=VERSIONES_CONSERVADAS,
+                        help="Versiones a mantener en el directorio")
+    parser.add_argument("--forzar", action="store_true",
+                        help="Genera un snapshot aunque los archivos de entrada no hayan cambiado")
+    parser.add_argument("--sin-historicos", action="store_true",
+                        help="No registra el día en los históricos de pendientes y sin asignar")
+    args = parser.parse_args()
+
+    resultado = materializar(
+        Path(args.directorio), args.procesos, args.hilos, args.conservar,
+        forzar=args.forzar, actualizar_historicos=not args.sin_historicos
+    )
+    snapshot = resultado.snapshot
+    if not resultado.nuevo:
+        print(f"Sin cambios en las entradas; sigue vigente {snapshot.version} ({resultado.segundos:.1f} s)")
+        return
+
+    tamano = sum(f.stat().st_size for f in snapshot.directorio.iterdir())
+    print(f"Snapshot {snapshot.version}: {len(snapshot.claves())} artefactos, "
+          f"{tamano / 1024**2:.1f} MB en {snapshot.directorio} ({resultado.segundos:.1f} s)")
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 import pandas as pd
+from modules.data.operadores import normalizar_operadores
 
 # Cargar el histórico
 ruta = 'ARCHIVOS/historico_pendientes_operador.csv'
@@ -6,7 +7,7 @@ df = pd.read_csv(ruta, dtype=str)
 
 # Normalizar nombres de operador
 if 'OPERADOR' in df.columns:
-    df['OPERADOR'] = df['OPERADOR'].str.strip().str.upper()
+    df['OPERADOR'] = normalizar_operadores(df['OPERADOR'])
 
 # Ordenar por Fecha (y por el orden de aparición en el archivo)
 df = df.sort_values('Fecha')
@@ -0,0 +1,3 @@
+"""
+API JSON local sobre el núcleo de cálculo
+"""
@@ -0,0 +1,337 @@
+"""
+Recursos de la API JSON
+
+Cada recurso declara de qué archivos depende y construye su contenido con el
+núcleo de cálculo. La ETag de una respuesta se obtiene de las huellas de esos
+archivos (tamaño y fecha de modificación), sin cargar ni hashear los datos.
+"""
+
+import hashlib
+import os
+import pandas as pd
+import numpy as np
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from modules.data.loader import (
+    cargar_datos, obtener_archivos_proceso, cargar_historico_pendientes, huella_archivo
+)
+from modules.data.snapshots import snapshot_activo
+from modules.core.pendientes import calcular_pendientes
+from modules.core.produccion import calcular_produccion
+from modules.core.ingresos import COL_FECHA_INGRESO, COL_TRAMITE_INGRESO, calcular_ingresos
+from modules.utils.executive_analytics import calcular_kpis_ejecutivos
+
+# Cambiarla invalida las ETag emitidas (cambios de formato de las respuestas)
+VERSION_API = '1'
+
+RUTA_HISTORICO = 'ARCHIVOS/historico_pendientes_operador.csv'
+DIAS_HISTORICO_DEFECTO = 30
+
+class SolicitudInvalida(ValueError):
+    """
+    Error de una solicitud, con el código HTTP que le corresponde
+    """
+
+    def __init__(self, mensaje: str, estado: int = 400):
+        super().__init__(mensaje)
+        self.estado = estado
+
+@dataclass(frozen=True)
+class Recurso:
+    """
+    Recurso de la API: nombre, archivos de los que depende y constructor del contenido
+    """
+    nombre: str
+    archivos: Callable[[Dict[str, str]], List[str]]
+    construir: Callable[[Dict[str, str]], Dict[str, Any]]
+
+def resolver(ruta: str) -> Tuple[Recurso, Dict[str, str]]:
+    """
+    Busca el recurso de una ruta
+
+    Args:
+        ruta: Ruta de la solicitud sin parámetros (por ejemplo /api/CCM/pendientes)
+
+    Returns:
+        Tupla (recurso, parámetros de la ruta)
+
+    Raises:
+        SolicitudInvalida: Si la ruta no existe (404)
+    """
+    partes = [p for p in ruta.split('/') if p]
+    if not partes or partes[0] != 'api':
+        raise SolicitudInvalida(f"Ruta no encontrada: {ruta}", 404)
+    partes = partes[1:]
+
+    if not partes:
+        return _RECURSOS_GENERALES['indice'], {}
+    if len(partes) == 1 and partes[0] in _RECURSOS_GENERALES:
+        return _RECURSOS_GENERALES[partes[0]], {}
+    if len(partes) == 2 and partes[1] in _RECURSOS_PROCESO:
+        proceso = partes[0].upper()
+        if proceso not in obtener_archivos_proceso():
+            raise SolicitudInvalida(f"Proceso desconocido: {partes[0]}", 404)
+        return _RECURSOS_PROCESO[partes[1]], {'proceso': proceso}
+    raise SolicitudInvalida(f"Ruta no encontrada: {ruta}", 404)
+
+def calcular_etag(recurso: Recurso, ruta: str, parametros: Dict[str, str]) -> str:
+    """
+    ETag de una respuesta a partir de la ruta, sus parámetros y las huellas
+    de los archivos de los que depende el recurso
+
+    Args:
+        recurso: Recurso resuelto
+        ruta: Ruta de la solicitud
+        parametros: Parámetros de la ruta y de la consulta
+
+    Returns:
+        ETag entre comillas, lista para la cabecera
+    """
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"{VERSION_API}|{ruta}|{sorted(parametros.items())}".encode())
+    snapshot = snapshot_activo()
+    if snapshot is not None:
+        h.update(snapshot.version.encode())
+    for archivo in recurso.archivos(parametros):
+        h.update(_huella_o_ausente(archivo).encode())
+    return f'"{h.hexdigest()}"'
+
+def indice() -> Dict[str, Any]:
+    """
+    Recursos disponibles y huella actual de cada archivo de datos
+    """
+    archivos = {proceso: _ruta_consolidado(proceso) for proceso in obtener_archivos_proceso()}
+    archivos['historico'] = RUTA_HISTORICO
+    return {
+        'recursos': [
+            '/api',
+            '/api/ejecutivo',
+            '/api/historico?proceso=&dias=&desde=&hasta=&operador=',
+            *[f'/api/{{proceso}}/{nombre}' for nombre in _RECURSOS_PROCESO]
+        ],
+        'procesos': list(obtener_archivos_proceso()),
+        'archivos': {clave: _huella_o_ausente(ruta) for clave, ruta in archivos.items()}
+    }
+
+def pendientes(parametros: Dict[str, str]) -> Dict[str, Any]:
+    """
+    Pendientes por operador y año de los últimos 2 años (pestaña Pendientes)
+    """
+    proceso = parametros['proceso']
+    resultado = calcular_pendientes(_cargar_proceso(proceso), proceso)
+    tabla = resultado.tabla.drop('Total', errors='ignore')
+    anios = [c for c in tabla.columns if c != 'Total']
+    return {
+        'proceso': proceso,
+        'total': resultado.total,
+        'sin_asignar': resultado.sin_asignar,
+        'operadores': [
+            {
+                'operador': operador,
+                'total': _valor(fila.get('Total')),
+                'por_anio': {str(anio): _valor(fila[anio]) for anio in anios}
+            }
+            for operador, fila in tabla.iterrows()
+        ]
+    }
+
+def produccion(parametros: Dict[str, str]) -> Dict[str, Any]:
+    """
+    Producción por día y por operador de las últimas 20 fechas (pestaña Producción Diaria)
+    """
+    proceso = parametros['proceso']
+    resultado = calcular_produccion(_cargar_proceso(proceso), proceso)
+    resumen = resultado.resumen_diario
+    tabla = resultado.tabla.drop('Total', errors='ignore')
+    fechas = [c for c in tabla.columns if c != 'Total']
+    return {
+        'proceso': proceso,
+        'por_dia': [
+            {
+                'fecha': _fecha_iso(fecha),
+                'operadores': _valor(operadores),
+                'trabajados': _valor(trabajados),
+                'promedio_por_operador': _valor(promedio)
+            }
+            for fecha, operadores, trabajados, promedio in zip(
+                resumen.index, resumen['cantidad_operadores'], resumen['total_trabajados'],
+                resumen['promedio_por_operador']
+            )
+        ],
+        'por_operador': [
+            {
+                'operador': operador,
+                'total': _valor(fila.get('Total')),
+                'por_fecha': {_fecha_iso(fecha): _valor(fila[fecha]) for fecha in fechas}
+            }
+            for operador, fila in tabla.iterrows()
+        ]
+    }
+
+def ingresos(parametros: Dict[str, str]) -> Dict[str, Any]:
+    """
+    Ingresos diarios de los últimos 60 días y semanales del último año (pestaña Ingresos Diarios)
+    """
+    proceso = parametros['proceso']
+    resultado = calcular_ingresos(_cargar_proceso(proceso), proceso)
+    if resultado is None:
+        raise SolicitudInvalida(f"Los datos de {proceso} no tienen la columna FechaExpendiente", 503)
+    diarios, semanal = resultado.diarios, resultado.semanal
+    return {
+        'proceso': proceso,
+        'diarios': [
+            {'fecha': _fecha_iso(fecha), 'ingresos': _valor(n)}
+            for fecha, n in zip(diarios[COL_FECHA_INGRESO], diarios[COL_TRAMITE_INGRESO])
+        ],
+        'semanal': [
+            {'semana': _fecha_iso(semana), 'total': _valor(total), 'promedio_diario': _valor(promedio)}
+            for semana, total, promedio in zip(
+                semanal['Semana'], semanal['Total ingresos'], semanal['Promedio semanal']
+            )
+        ]
+    }
+
+def ejecutivo(parametros: Dict[str, str]) -> Dict[str, Any]:
+    """
+    KPIs del Dashboard Ejecutivo de ambos procesos y consolidados
+    """
+    kpis = calcular_kpis_ejecutivos(_cargar_proceso('CCM'), _cargar_proceso('PRR'))
+    return {
+        'procesos': {k.proceso: _kpis_proceso(k) for k in (kpis.ccm, kpis.prr)},
+        'consolidado': {
+            'total_pendientes': kpis.total_pendientes,
+            'sin_asignar': kpis.total_sin_asignar,
+            'asignados': kpis.total_asignados,
+            'operadores_activos': kpis.total_operadores,
+            'produccion_diaria': _valor(kpis.produccion_total),
+            'ingresos_diarios': _valor(kpis.ingresos_total),
+            'eficiencia': _valor(kpis.eficiencia_general)
+        }
+    }
+
+def historico(parametros: Dict[str, str]) -> Dict[str, Any]:
+    """
+    Ventana del histórico de pendientes por operador
+
+    Parámetros de consulta (todos opcionales): proceso, operador, desde y
+    hasta (AAAA-MM-DD) o dias (últimos N días con registro, 30 por defecto).
+    """
+    datos = cargar_historico_pendientes()
+    fechas = pd.to_datetime(datos['Fecha'], errors='coerce')
+
+    filtro = pd.Series(True, index=datos.index)
+    if 'proceso' in parametros:
+        filtro &= datos['Proceso'] == parametros['proceso'].upper()
+    if 'operador' in parametros:
+        filtro &= datos['OPERADOR'] == parametros['operador']
+
+    desde, hasta = _fecha_parametro(parametros, 'desde'), _fecha_parametro(parametros, 'hasta')
+    if desde is None and hasta is None:
+        dias = _entero_parametro(parametros, 'dias', DIAS_HISTORICO_DEFECTO)
+        ultimas = fechas[filtro].dropna().drop_duplicates().nlargest(dias)
+        filtro &= fechas.isin(ultimas)
+    else:
+        if desde is not None:
+            filtro &= fechas >= desde
+        if hasta is not None:
+            filtro &= fechas <= hasta
+
+    ventana = datos[filtro]
+    return {
+        'desde': _fecha_iso(fechas[filtro].min()),
+        'hasta': _fecha_iso(fechas[filtro].max()),
+        'registros': [
+            {
+                'fecha': _fecha_iso(fecha),
+                'proceso': proceso,
+                'operador': operador,
+                'anio': str(anio),
+                'pendientes': _valor(n)
+            }
+            for fecha, proceso, operador, anio, n in zip(
+                fechas[filtro], ventana['Proceso'], ventana['OPERADOR'], ventana['Año'], ventana['Pendientes']
+            )
+        ]
+    }
+
+def _ruta_consolidado(proceso: str) -> str:
+    return f"ARCHIVOS/{obtener_archivos_proceso()[proceso]}"
+
+def _cargar_proceso(proceso: str) -> Optional[pd.DataFrame]:
+    # En modo snapshot los cálculos del núcleo no necesitan el consolidado
+    if snapshot_activo() is not None:
+        return None
+    try:
+        return cargar_datos(obtener_archivos_proceso()[proceso])
+    except FileNotFoundError:
+        raise SolicitudInvalida(f"No se encontró el consolidado de {proceso}", 503)
+
+def _huella_o_ausente(ruta: str) -> str:
+    return huella_archivo(ruta) if os.path.exists(ruta) else f"ausente:{ruta}"
+
+def _kpis_proceso(kpis) -> Dict[str, Any]:
+    return {
+        'total_pendientes': kpis.total_pendientes,
+        'sin_asignar': kpis.sin_asignar,
+        'asignados': kpis.asignados,
+        'operadores_activos': kpis.operadores_activos,
+        'produccion_diaria': _valor(kpis.produccion_diaria),
+        'ingresos_diarios': _valor(kpis.ingresos_diarios),
+        'promedio_por_operador': _valor(kpis.promedio_por_operador),
+        'eficiencia': _valor(kpis.eficiencia)
+    }
+
+def _valor(valor: Any) -> Any:
+    """Convierte escalares de numpy/pandas a tipos JSON (NaN e infinitos a null)"""
+    if valor is None or valor is pd.NaT:
+        return None
+    if isinstance(valor, (np.integer, int)) and not isinstance(valor, bool):
+        return int(valor)
+    if isinstance(valor, (np.floating, float)):
+        return float(valor) if np.isfinite(valor) else None
+    return valor
+
+def _fecha_iso(valor: Any) -> Optional[str]:
+    """Fecha en formato AAAA-MM-DD (acepta Timestamp o texto dd/mm/aaaa)"""
+    if isinstance(valor, str):
+        valor = pd.to_datetime(valor, format='%d/%m/%Y', errors='coerce')
+    if valor is None or pd.isna(valor):
+        return None
+    return pd.Timestamp(valor).strftime('%Y-%m-%d')
+
+def _fecha_parametro(parametros: Dict[str, str], nombre: str) -> Optional[pd.Timestamp]:
+    if nombre not in parametros:
+        return None
+    fecha = pd.to_datetime(parametros[nombre], format='%Y-%m-%d', errors='coerce')
+    if pd.isna(fecha):
+        raise SolicitudInvalida(f"'{nombre}' debe tener el formato AAAA-MM-DD")
+    return fecha
+
+def _entero_parametro(parametros: Dict[str, str], nombre: str, defecto: int) -> int:
+    try:
+        valor = int(parametros.get(nombre, defecto))
+    except ValueError:
+        valor = 0
+    if valor <= 0:
+        raise SolicitudInvalida(f"'{nombre}' debe ser un entero positivo")
+    return valor
+
+def _archivos_proceso(parametros: Dict[str, str]) -> List[str]:
+    return [_ruta_consolidado(parametros['proceso'])]
+
+def _archivos_todos(parametros: Dict[str, str]) -> List[str]:
+    return [_ruta_consolidado(proceso) for proceso in obtener_archivos_proceso()] + [RUTA_HISTORICO]
+
+_RECURSOS_PROCESO = {
+    'pendientes': Recurso('pendientes', _archivos_proceso, pendientes),
+    'produccion': Recurso('produccion', _archivos_proceso, produccion),
+    'ingresos': Recurso('ingresos', _archivos_proceso, ingresos)
+}
+
+_RECURSOS_GENERALES = {
+    'ejecutivo': Recurso(
+        'ejecutivo', lambda p: [_ruta_consolidado(proceso) for proceso in obtener_archivos_proceso()], ejecutivo
+    ),
+    'historico': Recurso('historico', lambda p: [RUTA_HISTORICO], historico),
+    'indice': Recurso('indice', _archivos_todos, lambda p: indice())
+}
@@ -0,0 +1,132 @@
+"""
+Servidor HTTP de la API JSON
+
+Sirve los recursos de modules.api.recursos con solicitudes condicionales:
+cada respuesta lleva una ETag derivada de las huellas de sus archivos de
+datos, y una solicitud con If-None-Match vigente recibe un 304 sin cargar
+ni recalcular nada. Los cuerpos ya serializados se guardan en la caché de
+artefactos derivados bajo su ETag.
+
+Se puede levantar dentro del proceso de Streamlit (DASHBOARD_API_PUERTO),
+compartiendo datasets y caché con el dashboard, o aparte con servidor_api.py.
+"""
+
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import parse_qsl, urlsplit
+from modules.api.recursos import SolicitudInvalida, calcular_etag, resolver
+from modules.utils.cache import obtener_cache
+from modules.utils.metricas import registrar_solicitud_api
+
+TIPO_CONTENIDO = 'application/json; charset=utf-8'
+
+PUERTO_DEFECTO = 8600
+
+def crear_servidor(host: str = '127.0.0.1', puerto: int = PUERTO_DEFECTO) -> ThreadingHTTPServer:
+    """
+    Crea el servidor de la API sin ponerlo en marcha
+
+    Args:
+        host: Interfaz en la que escuchar
+        puerto: Puerto (0 para uno libre)
+
+    Returns:
+        Servidor listo para serve_forever
+    """
+    servidor = ThreadingHTTPServer((host, puerto), _ManejadorApi)
+    servidor.daemon_threads = True
+    return servidor
+
+def iniciar_servidor_api() -> Optional[ThreadingHTTPServer]:
+    """
+    Levanta una sola vez por proceso la API si DASHBOARD_API_PUERTO está
+    definido (DASHBOARD_API_HOST para escuchar en otra interfaz)
+
+    Returns:
+        Servidor en ejecución, o None si no hay puerto configurado
+    """
+    global _servidor
+    puerto = os.environ.get('DASHBOARD_API_PUERTO')
+    if not puerto:
+        return None
+    with _lock_servidor:
+        if _servidor is None:
+            _servidor = crear_servidor(os.environ.get('DASHBOARD_API_HOST', '127.0.0.1'), int(puerto))
+            threading.Thread(target=_servidor.serve_forever, name='api', daemon=True).start()
+    return _servidor
+
+def coincide_etag(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Indica si la cabecera If-None-Match incluye la ETag (comparación débil)
+
+    Args:
+        if_none_match: Valor de la cabecera, o None si no se envió
+        etag: ETag actual del recurso
+
+    Returns:
+        True si el cliente ya tiene la versión vigente
+    """
+    if not if_none_match:
+        return False
+    candidatas = [c.strip() for c in if_none_match.split(',')]
+    return '*' in candidatas or etag in (c[2:] if c.startswith('W/') else c for c in candidatas)
+
+class _ManejadorApi(BaseHTTPRequestHandler):
+    def do_GET(self) -> None:
+        self._responder(con_cuerpo=True)
+
+    def do_HEAD(self) -> None:
+        self._responder(con_cuerpo=False)
+
+    def _responder(self, con_cuerpo: bool) -> None:
+        inicio = time.perf_counter()
+        url = urlsplit(self.path)
+        nombre = 'desconocido'
+        try:
+            recurso, parametros_ruta = resolver(url.path)
+            nombre = recurso.nombre
+            # Los parámetros de la ruta mandan sobre los de la consulta
+            parametros = {**dict(parse_qsl(url.query)), **parametros_ruta}
+            etag = calcular_etag(recurso, url.path.rstrip('/'), parametros)
+            if coincide_etag(self.headers.get('If-None-Match'), etag):
+                estado, cuerpo = 304, b''
+            else:
+                estado, cuerpo = 200, _cuerpo(recurso, parametros, etag)
+        except SolicitudInvalida as e:
+            estado, cuerpo, etag = e.estado, _json({'error': str(e)}), None
+        except Exception as e:
+            estado, cuerpo, etag = 500, _json({'error': f"{type(e).__name__}: {e}"}), None
+
+        self.send_response(estado)
+        if etag is not None:
+            self.send_header('ETag', etag)
+            self.send_header('Cache-Control', 'no-cache')
+        if estado != 304:
+            self.send_header('Content-Type', TIPO_CONTENIDO)
+            self.send_header('Content-Length', str(len(cuerpo)))
+        self.end_headers()
+        if con_cuerpo and cuerpo:
+            self.wfile.write(cuerpo)
+        registrar_solicitud_api(nombre, estado, time.perf_counter() - inicio)
+
+    def log_message(self, *args) -> None:
+        pass
+
+_servidor: Optional[ThreadingHTTPServer] = None
+_lock_servidor = threading.Lock()
+
+def _cuerpo(recurso, parametros: dict, etag: str) -> bytes:
+    """Cuerpo serializado del recurso, reutilizado mientras la ETag no cambie"""
+    clave = f"api:{etag}"
+    encontrado, cuerpo = obtener_cache().obtener(clave)
+    if not encontrado:
+        cuerpo = _json(recurso.construir(parametros))
+        obtener_cache().guardar(clave, cuerpo, f"{__name__}.{recurso.nombre}")
+    return cuerpo
+
+def _json(contenido: dict) -> bytes:
+    return json.dumps(contenido, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
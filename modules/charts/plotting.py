@@ -1,14 +1,133 @@
 """
 Módulo para generar gráficos y visualizaciones
+
+Los constructores de figuras son funciones puras de sus datos agregados y
+están memoizados por la huella de sus entradas: en un rerun sin cambios la
+figura se reutiliza en lugar de reconstruirse. Las figuras devueltas son
+compartidas y no deben modificarse.
+
+plotly.express solo se importa al construir el gráfico que lo usa: su carga
+(y la de sus dependencias) no forma parte del arranque del dashboard.
 """
 
-import plotly.express as px
 import plotly.graph_objects as go
-import plotly.figure_factory as ff
 import pandas as pd
 import numpy as np
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Sequence, Union
+from modules.utils.cache import memoizar
+
+# A partir de este número de puntos las trazas se dibujan con WebGL
+UMBRAL_WEBGL = 1000
+
+# Máximo de puntos enviados al navegador por traza (el resto se reduce con LTTB)
+PUNTOS_MAXIMOS = 1500
+
+def indices_lttb(x: np.ndarray, y: np.ndarray, n_puntos: int) -> np.ndarray:
+    """
+    Selecciona los puntos a conservar con Largest-Triangle-Three-Buckets
+    
+    Además del primer y último punto conserva siempre el mínimo y el máximo
+    de la serie, para que la reducción no oculte picos.
+    
+    Args:
+        x: Valores numéricos del eje X (ordenados)
+        y: Valores del eje Y
+        n_puntos: Número aproximado de puntos a conservar
+        
+    Returns:
+        Índices ordenados de los puntos conservados
+    """
+    n = len(y)
+    if n_puntos >= n or n_puntos < 3:
+        return np.arange(n)
+    
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    validos = ~np.isnan(y)
+    if not validos.any():
+        return np.arange(n)
+    y_calculo = np.where(validos, y, np.nanmean(y))
+    
+    # Cubetas entre el primer y el último punto
+    limites = np.linspace(1, n - 1, n_puntos - 1).astype(np.int64)
+    indices = np.empty(n_puntos, dtype=np.int64)
+    indices[0] = 0
+    indices[-1] = n - 1
+    
+    anterior = 0
+    for i in range(n_puntos - 2):
+        inicio, fin = limites[i], limites[i + 1]
+        fin_siguiente = limites[i + 2] if i + 2 < len(limites) else n
+        x_prom = x[fin:fin_siguiente].mean()
+        y_prom = y_calculo[fin:fin_siguiente].mean()
+        
+        # Área del triángulo (anterior, candidato, promedio de la cubeta siguiente)
+        areas = np.abs(
+            (x[anterior] - x_prom) * (y_calculo[inicio:fin] - y_calculo[anterior])
+            - (x[anterior] - x[inicio:fin]) * (y_prom - y_calculo[anterior])
+        )
+        anterior = inicio + int(areas.argmax())
+        indices[i + 1] = anterior
+    
+    extremos = [int(np.nanargmin(y)), int(np.nanargmax(y))]
+    return np.union1d(indices, extremos)
 
+def crear_traza_linea(x: Sequence, y: Sequence, texto: Optional[Sequence[str]] = None,
+                      colores_marcador: Optional[Sequence[str]] = None,
+                      datos_hover: Optional[Sequence] = None,
+                      umbral_webgl: int = UMBRAL_WEBGL, puntos_maximos: int = PUNTOS_MAXIMOS,
+                      **kwargs) -> Union[go.Scatter, go.Scattergl]:
+    """
+    Crea una traza de línea adecuada para series largas
+    
+    Por encima de puntos_maximos la serie se reduce con LTTB, y por encima de
+    umbral_webgl se usa una traza WebGL. Las etiquetas, los colores de
+    marcador y los datos de hover se recortan a los puntos conservados.
+    
+    Args:
+        x: Valores del eje X (fechas, números o categorías)
+        y: Valores del eje Y
+        texto: Etiqueta por punto (opcional)
+        colores_marcador: Color del marcador por punto (opcional)
+        datos_hover: customdata por punto (opcional)
+        umbral_webgl: Número de puntos a partir del cual se usa Scattergl
+        puntos_maximos: Número máximo de puntos a dibujar
+        **kwargs: Resto de propiedades de la traza (mode, name, line, ...)
+        
+    Returns:
+        Traza go.Scatter o go.Scattergl
+    """
+    x = np.asarray(x)
+    y = np.asarray(y)
+    n = len(y)
+    
+    if n > puntos_maximos:
+        if np.issubdtype(x.dtype, np.datetime64):
+            x_num = x.astype('datetime64[ns]').astype(np.int64)
+        elif np.issubdtype(x.dtype, np.number):
+            x_num = x
+        else:
+            x_num = np.arange(n)
+        indices = indices_lttb(x_num, y, puntos_maximos)
+        x, y = x[indices], y[indices]
+        if texto is not None:
+            texto = np.asarray(texto)[indices]
+        if colores_marcador is not None:
+            colores_marcador = np.asarray(colores_marcador)[indices]
+        if datos_hover is not None:
+            datos_hover = np.asarray(datos_hover)[indices]
+    
+    if texto is not None:
+        kwargs['text'] = texto
+    if colores_marcador is not None:
+        kwargs['marker'] = {**kwargs.get('marker', {}), 'color': colores_marcador}
+    if datos_hover is not None:
+        kwargs['customdata'] = datos_hover
+    
+    tipo_traza = go.Scattergl if n > umbral_webgl else go.Scatter
+    return tipo_traza(x=x, y=y, **kwargs)
+
+@memoizar
 def crear_grafico_totales_tendencia(totales: pd.Series) -> go.Figure:
     """
     Crea un gráfico de evolución de totales con línea de tendencia
@@ -22,12 +141,12 @@ def crear_grafico_totales_tendencia(totales: pd.Series) -> go.Figure:
     fig_totales = go.Figure()
     
     # Línea principal con etiquetas
-    fig_totales.add_trace(go.Scatter(
-        x=totales.index,
-        y=totales.values,
+    fig_totales.add_trace(crear_traza_linea(
+        totales.index,
+        totales.values,
+        texto=totales.astype(str).values,
         mode='lines+markers+text',
         name='Total de pendientes',
-        text=[str(v) for v in totales.values],
         textposition="top center"
     ))
     
@@ -57,6 +176,7 @@ def crear_grafico_totales_tendencia(totales: pd.Series) -> go.Figure:
     
     return fig_totales
 
+@memoizar
 def crear_grafico_dispersión_eficiencia(evolucion: pd.DataFrame) -> go.Figure:
     """
     Crea un gráfico de dispersión de tendencia vs producción promedio
@@ -67,6 +187,8 @@ def crear_grafico_dispersión_eficiencia(evolucion: pd.DataFrame) -> go.Figure:
     Returns:
         Figura de Plotly con el gráfico de dispersión
     """
+    import plotly.express as px
+
     fig_scatter = px.scatter(
         evolucion,
         x='Produccion_Promedio',
@@ -83,46 +205,220 @@ def crear_grafico_dispersión_eficiencia(evolucion: pd.DataFrame) -> go.Figure:
     
     return fig_scatter
 
-def crear_grafico_produccion_diaria(df_produccion: pd.DataFrame, proceso: str) -> go.Figure:
+@memoizar
+def crear_grafico_produccion_diaria(resumen: pd.DataFrame, columna: str, nombre: str,
+                                    titulo: str, titulo_y: str, formato_texto: str = '{:.1f}',
+                                    dias: Optional[str] = None) -> go.Figure:
     """
-    Crea un gráfico de producción diaria
+    Crea un gráfico de producción diaria con línea de tendencia
     
     Args:
-        df_produccion: DataFrame con datos de producción
-        proceso: Tipo de proceso
+        resumen: Resumen diario (índice con fechas 'dd/mm/aaaa')
+        columna: Columna a graficar ('promedio_por_operador' o 'total_trabajados')
+        nombre: Nombre de la serie
+        titulo: Título del gráfico
+        titulo_y: Título del eje Y
+        formato_texto: Formato de las etiquetas de cada punto
+        dias: 'habiles' (lunes a viernes), 'fines_semana' o None (todos)
         
     Returns:
         Figura de Plotly con el gráfico de producción
     """
-    # Implementar según los datos específicos de producción diaria
-    # Esta función necesitará ser completada según la lógica específica
-    pass
+    datos = resumen.copy()
+    datos.index = pd.to_datetime(datos.index, format='%d/%m/%Y')
+    if dias == 'habiles':
+        datos = datos[datos.index.weekday < 5]
+    elif dias == 'fines_semana':
+        datos = datos[datos.index.weekday >= 5]
+    
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=datos.index,
+        y=datos[columna],
+        mode='lines+markers+text',
+        name=nombre,
+        text=[formato_texto.format(v) for v in datos[columna]],
+        textposition="top center"
+    ))
+    
+    # Línea de tendencia
+    x_numeric = np.arange(len(datos.index))
+    y = datos[columna].values
+    if len(x_numeric) > 1:
+        z = np.polyfit(x_numeric, y, 1)
+        tendencia = z[0] * x_numeric + z[1]
+        fig.add_trace(go.Scatter(
+            x=datos.index,
+            y=tendencia,
+            mode='lines',
+            name='Tendencia',
+            line=dict(dash='dash', color='orange')
+        ))
+    
+    fig.update_layout(
+        title=titulo,
+        xaxis_title='Fecha',
+        yaxis_title=titulo_y,
+        legend_title='Métrica',
+        hovermode='x unified'
+    )
+    
+    return fig
 
-def crear_grafico_ingresos_diarios(df_ingresos: pd.DataFrame, proceso: str) -> go.Figure:
+@memoizar
+def crear_grafico_ingresos_diarios(ingresos_diarios: pd.DataFrame, col_fecha_ing: str,
+                                   col_tramite_ing: str) -> go.Figure:
     """
-    Crea un gráfico de ingresos diarios
+    Crea el gráfico de ingresos diarios con línea de tendencia
     
     Args:
-        df_ingresos: DataFrame con datos de ingresos
-        proceso: Tipo de proceso
+        ingresos_diarios: Conteo de ingresos por fecha
+        col_fecha_ing: Columna de fecha
+        col_tramite_ing: Columna con el conteo de trámites
         
     Returns:
         Figura de Plotly con el gráfico de ingresos
     """
-    # Implementar según los datos específicos de ingresos diarios
-    # Esta función necesitará ser completada según la lógica específica
-    pass
+    fig = go.Figure()
+    
+    # Línea y puntos
+    fig.add_trace(go.Scatter(
+        x=ingresos_diarios[col_fecha_ing],
+        y=ingresos_diarios[col_tramite_ing],
+        mode='lines+markers+text',
+        name='NumeroTramite',
+        text=[str(v) for v in ingresos_diarios[col_tramite_ing]],
+        textposition="top center",
+        line=dict(color='royalblue'),
+        fill='tozeroy',
+        fillcolor='rgba(65,105,225,0.1)'
+    ))
+    
+    # Línea de tendencia
+    x_numeric = np.arange(len(ingresos_diarios))
+    y_vals = ingresos_diarios[col_tramite_ing].values
+    if len(x_numeric) > 1:
+        z = np.polyfit(x_numeric, y_vals, 1)
+        tendencia = z[0] * x_numeric + z[1]
+        fig.add_trace(go.Scatter(
+            x=ingresos_diarios[col_fecha_ing],
+            y=tendencia,
+            mode='lines',
+            name='Tendencia',
+            line=dict(dash='dash', color='red', width=3)
+        ))
+    
+    # Formato de fechas en eje X
+    fig.update_xaxes(
+        tickformat="%d %b",
+        tickangle=0
+    )
+    fig.update_layout(
+        title='',
+        xaxis_title='',
+        yaxis_title='',
+        legend_title='',
+        hovermode='x unified',
+        margin=dict(l=20, r=20, t=40, b=20)
+    )
+    
+    return fig
 
+@memoizar
+def crear_grafico_promedio_semanal(ingresos_semanal: pd.DataFrame, semana_actual: pd.Timestamp,
+                                   anio_actual: int) -> go.Figure:
+    """
+    Crea el gráfico de promedio semanal de ingresos diarios
+    
+    Args:
+        ingresos_semanal: Promedios por semana (Semana, Fecha, Promedio semanal, Rango de fechas)
+        semana_actual: Inicio de la semana en curso (se resalta en rojo)
+        anio_actual: Año para la línea de tendencia
+        
+    Returns:
+        Figura de Plotly con el gráfico semanal
+    """
+    es_semana_actual = ingresos_semanal['Semana'] == semana_actual
+    
+    fig = go.Figure()
+    fig.add_trace(crear_traza_linea(
+        ingresos_semanal['Fecha'],
+        ingresos_semanal['Promedio semanal'],
+        colores_marcador=es_semana_actual.map({True: 'red', False: 'blue'}),
+        datos_hover=ingresos_semanal['Rango de fechas'],
+        mode='lines+markers',
+        name='Promedio semanal',
+        showlegend=False,
+        hovertemplate=(
+            'Fecha=%{x}<br>Promedio semanal de ingresos=%{y}<br>'
+            'Rango de fechas=%{customdata}<extra></extra>'
+        )
+    ))
+    fig.update_layout(
+        title='Promedio semanal de ingresos diarios (último año)',
+        xaxis_title='Fecha',
+        yaxis_title='Promedio semanal de ingresos'
+    )
+    
+    # Línea de tendencia para el año actual
+    sem_actual = ingresos_semanal[ingresos_semanal['Semana'].dt.year == anio_actual].reset_index(drop=True)
+    
+    if len(sem_actual) > 1:
+        x_numeric_sem = np.arange(len(sem_actual))
+        y_vals_sem = sem_actual['Promedio semanal'].values
+        z_sem = np.polyfit(x_numeric_sem, y_vals_sem, 1)
+        tendencia_sem = z_sem[0] * x_numeric_sem + z_sem[1]
+        fig.add_scatter(
+            x=sem_actual['Fecha'],
+            y=tendencia_sem,
+            mode='lines',
+            name='Tendencia año en curso',
+            line=dict(dash='dash', color='orange')
+        )
+    
+    fig.update_xaxes(tickangle=45)
+    return fig
+
+@memoizar
 def crear_grafico_proyeccion_cierre(datos_proyeccion: Dict[str, Any]) -> go.Figure:
     """
     Crea un gráfico de proyección de cierre
     
     Args:
-        datos_proyeccion: Diccionario con datos de proyección
+        datos_proyeccion: Diccionario con pendientes_actuales_totales,
+            balance_diario_proyectado y dias_para_cero_pendientes
         
     Returns:
         Figura de Plotly con el gráfico de proyección
     """
-    # Implementar según los datos específicos de proyección
-    # Esta función necesitará ser completada según la lógica específica
-    pass 
\ No newline at end of file
+    balance = datos_proyeccion['balance_diario_proyectado']
+    dias_para_cero = datos_proyeccion['dias_para_cero_pendientes']
+    
+    max_dias_grafico = 180
+    if balance > 0 and dias_para_cero != float('inf'):
+        max_dias_grafico = min(max_dias_grafico, int(dias_para_cero) + 30)
+    
+    dias_proy = list(range(0, max_dias_grafico + 1))
+    
+    # Calcular pendientes proyectados
+    pendientes_proyectados = [
+        max(0, datos_proyeccion['pendientes_actuales_totales'] - balance * d)
+        for d in dias_proy
+    ]
+    
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=dias_proy,
+        y=pendientes_proyectados,
+        mode='lines+markers',
+        name='Pendientes Proyectados'
+    ))
+    
+    fig.update_layout(
+        title='Evolución Estimada del Total de Pendientes',
+        xaxis_title='Días desde Hoy',
+        yaxis_title='Cantidad de Pendientes',
+        hovermode='x unified'
+    )
+    
+    return fig
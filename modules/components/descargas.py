@@ -0,0 +1,35 @@
+"""
+Componente para los botones de descarga de tablas en Excel
+"""
+
+import io
+import streamlit as st
+import pandas as pd
+from typing import Callable
+from modules.utils.excel_export import excel_bytes
+
+MIME_XLSX = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+def boton_descarga_excel(label: str, tabla: pd.DataFrame,
+                         exportador: Callable[[pd.DataFrame], io.BytesIO],
+                         file_name: str) -> None:
+    """
+    Muestra un botón que genera el Excel solo cuando el usuario lo pulsa
+    
+    El libro se construye en el clic (no en cada rerun) y queda en la caché
+    de artefactos por la huella de la tabla, de modo que las descargas
+    repetidas de los mismos datos no vuelven a serializarlo.
+    
+    Args:
+        label: Texto del botón
+        tabla: DataFrame a exportar
+        exportador: Función to_excel_* a usar
+        file_name: Nombre del archivo descargado
+    """
+    st.download_button(
+        label=label,
+        data=lambda: excel_bytes(tabla, exportador),
+        file_name=file_name,
+        mime=MIME_XLSX,
+        on_click="ignore"
+    )
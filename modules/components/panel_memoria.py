@@ -0,0 +1,56 @@
+"""
+Componente del panel de memoria (oculto por defecto)
+
+Se muestra junto al panel de rendimiento (DASHBOARD_PERFILADO=1 o ?perfilado=1).
+El inventario por columna se calcula solo al pulsar el botón.
+"""
+
+import tracemalloc
+import streamlit as st
+from typing import Optional
+from modules.utils.memoria import (
+    atribuir_asignaciones, cargas_registradas, inventario_memoria, pico_rss_mb, rss_actual_mb
+)
+
+def mostrar_panel_memoria() -> None:
+    """
+    Muestra en la barra lateral la memoria del proceso, de las cargas de
+    datos y, a pedido, el inventario de datasets y artefactos cacheados
+    """
+    with st.sidebar.expander("🧠 Memoria"):
+        rss, pico = rss_actual_mb(), pico_rss_mb()
+        st.caption(
+            f"RSS actual: {_mb(rss)} · pico del proceso: {_mb(pico)}"
+            + (" · tracemalloc activo" if tracemalloc.is_tracing() else "")
+        )
+
+        cargas = cargas_registradas()
+        if not cargas.empty:
+            st.dataframe(cargas, hide_index=True, use_container_width=True)
+
+        if not st.button("Calcular inventario de memoria", key="inventario_memoria"):
+            return
+
+        with st.spinner("Midiendo datasets y artefactos..."):
+            inventario = inventario_memoria()
+        artefactos = inventario['artefactos']
+        st.caption(
+            f"Total: {artefactos['Memoria (MB)'].sum():,.1f} MB · ahorro proyectado "
+            f"categórica {artefactos['Ahorro categórica (MB)'].sum():,.1f} MB, "
+            f"Arrow {artefactos['Ahorro Arrow (MB)'].sum():,.1f} MB"
+        )
+        st.dataframe(artefactos, hide_index=True, use_container_width=True)
+        st.dataframe(
+            inventario['columnas'].sort_values('Memoria (MB)', ascending=False),
+            hide_index=True,
+            use_container_width=True,
+            height=300
+        )
+
+        asignaciones = atribuir_asignaciones()
+        if not asignaciones.empty:
+            st.caption("Memoria viva por función (tracemalloc)")
+            st.dataframe(asignaciones, hide_index=True, use_container_width=True)
+
+def _mb(valor: Optional[float]) -> str:
+    return "n/d" if valor is None else f"{valor:,.0f} MB"
@@ -0,0 +1,46 @@
+"""
+Componente del panel de rendimiento (oculto por defecto)
+
+Se activa con DASHBOARD_PERFILADO=1 o, para una sesión, abriendo la
+aplicación con el parámetro ?perfilado=1 en la URL.
+"""
+
+import streamlit as st
+from typing import Optional
+from modules.utils.perfilado import Tramo, perfilado_por_entorno, resumen_llama, resumen_por_tramo
+
+def perfilado_solicitado() -> bool:
+    """
+    Indica si el rerun actual debe perfilarse
+    """
+    return perfilado_por_entorno() or st.query_params.get('perfilado') == '1'
+
+def mostrar_panel_rendimiento(raiz: Optional[Tramo]) -> None:
+    """
+    Muestra en la barra lateral el desglose del último rerun
+
+    Args:
+        raiz: Tramo raíz devuelto por finalizar_perfilado
+    """
+    if raiz is None:
+        return
+
+    tramos = [tramo for _, tramo in raiz.recorrer()]
+    aciertos = sum(t.aciertos_cache for t in tramos)
+    fallos = sum(t.fallos_cache for t in tramos)
+
+    with st.sidebar.expander("⏱️ Performance", expanded=True):
+        st.caption(
+            f"Último rerun: {raiz.duracion * 1000:,.0f} ms · "
+            f"caché: {aciertos:,} aciertos, {fallos:,} fallos"
+        )
+        st.dataframe(
+            resumen_por_tramo(raiz),
+            hide_index=True,
+            use_container_width=True,
+            column_config={
+                'Total (ms)': st.column_config.NumberColumn(format="%.1f"),
+                'Propio (ms)': st.column_config.NumberColumn(format="%.1f")
+            }
+        )
+        st.code(resumen_llama(raiz), language=None)
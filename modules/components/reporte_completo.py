@@ -0,0 +1,134 @@
+"""
+Componente para el reporte consolidado en Excel (todas las tablas de CCM y PRR)
+"""
+
+import io
+import streamlit as st
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, Optional, Tuple
+from modules.data.loader import (
+    cargar_datos, obtener_archivos_proceso, procesar_pendientes,
+    crear_tabla_pendientes, cargar_historico_pendientes
+)
+from modules.utils.analytics import agrupar_anios_antiguos
+from modules.utils.cache import memoizar
+from modules.utils.excel_export import escribir_hoja
+from modules.core.produccion import (
+    columnas_produccion, filtrar_ultimos_20_dias, crear_tabla_produccion, filtrar_tabla_produccion,
+    crear_tabla_fines_semana, calcular_resumen_diario
+)
+from modules.core.evolucion import calcular_evolucion
+from modules.components.descargas import MIME_XLSX
+
+PROCESOS_REPORTE = ("CCM", "PRR")
+
+# Hojas de cada proceso, en el orden en que aparecen en el libro
+HOJAS_REPORTE = ("Pendientes", "Produccion", "FinDeSemana", "ResumenDiario", "Evolucion")
+
+# Hojas con fila y columna Total resaltadas
+HOJAS_CON_TOTALES = ("Pendientes",)
+
+def boton_reporte_completo() -> None:
+    """
+    Muestra en la barra lateral el botón del reporte completo
+
+    El libro se genera solo al pulsar el botón.
+    """
+    st.sidebar.download_button(
+        label="Descargar reporte completo (CCM y PRR)",
+        data=lambda: generar_reporte_completo().getvalue(),
+        file_name="reporte_completo.xlsx",
+        mime=MIME_XLSX,
+        on_click="ignore"
+    )
+
+def generar_reporte_completo(procesos: Iterable[str] = PROCESOS_REPORTE,
+                             max_hilos: Optional[int] = None) -> io.BytesIO:
+    """
+    Genera un único libro con todas las tablas de los procesos indicados
+
+    Las tablas se obtienen en paralelo de las mismas funciones memoizadas que
+    usan las pestañas, por lo que lo ya calculado en la aplicación no se
+    vuelve a derivar. Las hojas se escriben en streaming (modo write-only).
+
+    Args:
+        procesos: Procesos a incluir ('CCM', 'PRR')
+        max_hilos: Máximo de hilos para construir las tablas
+
+    Returns:
+        BytesIO con el archivo Excel
+    """
+    tablas = construir_tablas_reporte(procesos, max_hilos)
+    return io.BytesIO(_escribir_libro_reporte(tablas))
+
+def construir_tablas_reporte(procesos: Iterable[str] = PROCESOS_REPORTE,
+                             max_hilos: Optional[int] = None) -> Dict[Tuple[str, str], pd.DataFrame]:
+    """
+    Construye en paralelo las tablas del reporte
+
+    Args:
+        procesos: Procesos a incluir
+        max_hilos: Máximo de hilos (por defecto, el de ThreadPoolExecutor)
+
+    Returns:
+        Diccionario ordenado (proceso, hoja) -> tabla; se omiten las tablas vacías
+    """
+    procesos = list(procesos)
+    archivos = obtener_archivos_proceso()
+    historico = agrupar_anios_antiguos(cargar_historico_pendientes())
+
+    with ThreadPoolExecutor(max_workers=max_hilos) as ejecutor:
+        datos = dict(zip(procesos, ejecutor.map(lambda p: cargar_datos(archivos[p]), procesos)))
+        futuros = {
+            (proceso, hoja): ejecutor.submit(_CONSTRUCTORES[hoja], datos[proceso], proceso, historico)
+            for proceso in procesos
+            for hoja in HOJAS_REPORTE
+        }
+        tablas = {clave: futuro.result() for clave, futuro in futuros.items()}
+
+    return {clave: tabla for clave, tabla in tablas.items() if tabla is not None and not tabla.empty}
+
+@memoizar
+def _escribir_libro_reporte(tablas: Dict[Tuple[str, str], pd.DataFrame]) -> bytes:
+    """
+    Escribe las tablas del reporte en un libro, memoizado por la huella de las tablas
+    """
+    from openpyxl import Workbook
+
+    libro = Workbook(write_only=True)
+    for (proceso, hoja), tabla in tablas.items():
+        escribir_hoja(libro, f"{proceso} {hoja}", tabla, resaltar_totales=hoja in HOJAS_CON_TOTALES)
+
+    output = io.BytesIO()
+    libro.save(output)
+    return output.getvalue()
+
+def _tabla_pendientes(df: pd.DataFrame, proceso: str, historico: pd.DataFrame) -> pd.DataFrame:
+    return crear_tabla_pendientes(procesar_pendientes(df, proceso), proceso)
+
+def _tabla_produccion(df: pd.DataFrame, proceso: str, historico: pd.DataFrame) -> pd.DataFrame:
+    col_operador, col_fecha, col_tramite = columnas_produccion(df)
+    df_20dias = filtrar_ultimos_20_dias(df, col_fecha)
+    return filtrar_tabla_produccion(crear_tabla_produccion(df_20dias, col_operador, col_fecha, col_tramite))
+
+def _tabla_fines_semana(df: pd.DataFrame, proceso: str, historico: pd.DataFrame) -> pd.DataFrame:
+    return crear_tabla_fines_semana(df, *columnas_produccion(df))
+
+def _tabla_resumen_diario(df: pd.DataFrame, proceso: str, historico: pd.DataFrame) -> pd.DataFrame:
+    col_operador, col_fecha, col_tramite = columnas_produccion(df)
+    df_20dias = filtrar_ultimos_20_dias(df, col_fecha)
+    return calcular_resumen_diario(df_20dias, col_operador, col_fecha, col_tramite)
+
+def _tabla_evolucion(df: pd.DataFrame, proceso: str, historico: pd.DataFrame) -> Optional[pd.DataFrame]:
+    # Misma selección por defecto que la pestaña ('Todos' los años)
+    resultado = calcular_evolucion(historico, proceso, ['Todos'])
+    return resultado.matriz if resultado is not None else None
+
+_CONSTRUCTORES: Dict[str, Callable[[pd.DataFrame, str, pd.DataFrame], Optional[pd.DataFrame]]] = {
+    "Pendientes": _tabla_pendientes,
+    "Produccion": _tabla_produccion,
+    "FinDeSemana": _tabla_fines_semana,
+    "ResumenDiario": _tabla_resumen_diario,
+    "Evolucion": _tabla_evolucion
+}
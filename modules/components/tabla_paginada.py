@@ -0,0 +1,81 @@
+"""
+Componente para mostrar tablas grandes por páginas
+
+Solo la página visible (y, en las matrices por fecha, la ventana de fechas
+elegida) se envía al navegador y se estiliza, de modo que el tamaño de lo
+que se renderiza no crece con el histórico.
+"""
+
+import math
+import streamlit as st
+import pandas as pd
+from typing import Iterable, Optional
+
+FILAS_POR_PAGINA = 50
+
+@st.fragment
+def mostrar_tabla_paginada(tabla: pd.DataFrame, clave: str,
+                           filas_por_pagina: int = FILAS_POR_PAGINA,
+                           columnas_recientes: Optional[int] = None,
+                           filas_fijas: Iterable = (),
+                           colores_filas: Optional[pd.Series] = None,
+                           height: Optional[int] = None) -> None:
+    """
+    Muestra una tabla paginada por filas y, opcionalmente, con ventana de columnas
+
+    Es un fragmento: cambiar de página o de ventana solo vuelve a ejecutar la tabla.
+
+    Args:
+        tabla: DataFrame a mostrar
+        clave: Prefijo único para las claves de los widgets
+        filas_por_pagina: Filas por página
+        columnas_recientes: Si se indica, muestra por defecto solo las últimas
+            N columnas (por ejemplo, las fechas más recientes de una matriz)
+        filas_fijas: Etiquetas de filas que se muestran en todas las páginas (p. ej. 'TOTAL')
+        colores_filas: Color de fondo por fila ('' sin color), alineado con el índice
+        height: Alto de la tabla en píxeles
+    """
+    fijas = tabla.index.isin(list(filas_fijas))
+    cuerpo = tabla[~fijas]
+    n_paginas = max(1, math.ceil(len(cuerpo) / filas_por_pagina))
+    columnas = tabla.columns
+
+    col_pagina, col_ventana = st.columns([1, 3])
+
+    pagina = 1
+    if n_paginas > 1:
+        pagina = col_pagina.number_input(
+            f"Página (de {n_paginas})", min_value=1, max_value=n_paginas, value=1,
+            step=1, key=f"{clave}_pagina"
+        )
+
+    if columnas_recientes is not None and len(columnas) > columnas_recientes:
+        desde, hasta = col_ventana.select_slider(
+            "Columnas visibles",
+            options=list(columnas),
+            value=(columnas[-columnas_recientes], columnas[-1]),
+            key=f"{clave}_ventana"
+        )
+        columnas = columnas[columnas.get_loc(desde):columnas.get_loc(hasta) + 1]
+
+    inicio = (pagina - 1) * filas_por_pagina
+    vista = pd.concat([cuerpo.iloc[inicio:inicio + filas_por_pagina], tabla[fijas]])[columnas]
+
+    if colores_filas is not None:
+        vista = _aplicar_colores_filas(vista, colores_filas)
+
+    opciones = {'height': height} if height is not None else {}
+    st.dataframe(vista, use_container_width=True, **opciones)
+    st.caption(
+        f"Filas {inicio + 1 if len(cuerpo) else 0}–{min(inicio + filas_por_pagina, len(cuerpo))} "
+        f"de {len(cuerpo)} · {len(columnas)} de {len(tabla.columns)} columnas"
+    )
+
+def _aplicar_colores_filas(vista: pd.DataFrame, colores_filas: pd.Series):
+    """Aplica el color de fondo por fila con un único mapa de estilos vectorizado"""
+    colores = colores_filas.reindex(vista.index).fillna('')
+    css = ('background-color: ' + colores).where(colores != '', '')
+    estilos = pd.DataFrame(
+        {columna: css.to_numpy() for columna in vista.columns}, index=vista.index
+    )
+    return vista.style.apply(lambda _: estilos, axis=None)
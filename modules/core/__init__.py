@@ -0,0 +1,3 @@
+"""
+Núcleo de cálculo de las pestañas, independiente de Streamlit
+"""
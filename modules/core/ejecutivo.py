@@ -0,0 +1,109 @@
+"""
+Cálculos del Dashboard Ejecutivo
+
+Los paneles se calculan como tareas independientes en un pool de hilos: los
+KPIs de cada proceso (lectura del consolidado incluida) y el resumen del
+histórico de pendientes no dependen entre sí, por lo que la vista tarda lo
+que el más lento y no la suma de todos. Solo la tendencia de sin asignar
+espera a los KPIs de ambos procesos, porque primero se registran en su
+histórico.
+"""
+
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+from modules.data.loader import cargar_datos, obtener_archivos_proceso, cargar_historico_pendientes
+from modules.data.historico_sin_asignar import (
+    actualizar_historico_sin_asignar, calcular_tendencia_sin_asignar
+)
+from modules.data.snapshots import snapshot_activo
+from modules.utils.executive_analytics import KPIsEjecutivos, KPIsProceso, calcular_kpis_proceso
+from modules.utils.perfilado import en_hilo, perfilar
+
+# Días del gráfico de evolución de pendientes
+DIAS_EVOLUCION = 60
+
+@dataclass(frozen=True)
+class ResultadoEjecutivo:
+    """
+    Datos de todos los paneles del Dashboard Ejecutivo
+    """
+    kpis: KPIsEjecutivos
+    # Deltas por proceso ('ccm', 'prr') respecto de la fecha anterior de cada histórico
+    tendencias: Dict[str, Dict[str, int]] = field(repr=False, compare=False)
+    # Pendientes por fecha y proceso de los últimos DIAS_EVOLUCION días
+    # (None si no hay histórico de pendientes)
+    evolucion: Optional[pd.DataFrame] = field(repr=False, compare=False)
+
+@perfilar
+def calcular_ejecutivo(max_hilos: Optional[int] = None) -> ResultadoEjecutivo:
+    """
+    Calcula en paralelo los paneles del Dashboard Ejecutivo
+
+    En vivo lee los consolidados y registra el día en el histórico de sin
+    asignar; en modo snapshot toma los KPIs materializados y no escribe
+    (de eso se encarga genera_snapshots.py).
+
+    Args:
+        max_hilos: Máximo de hilos (por defecto, el de ThreadPoolExecutor)
+
+    Returns:
+        ResultadoEjecutivo con los datos de todos los paneles
+    """
+    en_vivo = snapshot_activo() is None
+
+    with ThreadPoolExecutor(max_workers=max_hilos) as ejecutor:
+        futuro_ccm = ejecutor.submit(en_hilo(_kpis_proceso, '_kpis_proceso[CCM]'), 'CCM', en_vivo)
+        futuro_prr = ejecutor.submit(en_hilo(_kpis_proceso, '_kpis_proceso[PRR]'), 'PRR', en_vivo)
+        futuro_historico = ejecutor.submit(en_hilo(_resumen_historico_pendientes))
+        kpis = KPIsEjecutivos(ccm=futuro_ccm.result(), prr=futuro_prr.result())
+        deltas_pendientes, evolucion = futuro_historico.result()
+
+    # El histórico de sin asignar se actualiza antes de calcular su tendencia
+    if en_vivo:
+        actualizar_historico_sin_asignar(kpis.ccm.sin_asignar, kpis.prr.sin_asignar)
+    tendencias_sin_asignar = calcular_tendencia_sin_asignar(kpis.ccm.sin_asignar, kpis.prr.sin_asignar)
+
+    tendencias = {
+        proceso: {
+            **deltas_pendientes[proceso],
+            'delta_sin_asignar': tendencias_sin_asignar[proceso],
+            'delta_produccion': 0  # Se puede calcular si hay histórico de producción
+        }
+        for proceso in ('ccm', 'prr')
+    }
+    return ResultadoEjecutivo(kpis=kpis, tendencias=tendencias, evolucion=evolucion)
+
+def _kpis_proceso(proceso: str, en_vivo: bool) -> KPIsProceso:
+    """KPIs de un proceso, leyendo antes su consolidado si se calcula en vivo"""
+    df = cargar_datos(obtener_archivos_proceso()[proceso]) if en_vivo else None
+    return calcular_kpis_proceso(df, proceso)
+
+def _resumen_historico_pendientes() -> Tuple[Dict[str, Dict[str, int]], Optional[pd.DataFrame]]:
+    """
+    Deltas de pendientes y de operadores entre las dos últimas fechas de cada
+    proceso, y pendientes por fecha y proceso de los últimos días
+    """
+    deltas = {proceso: {'delta_pendientes': 0, 'delta_operadores': 0} for proceso in ('ccm', 'prr')}
+    historico = cargar_historico_pendientes()
+    if historico.empty:
+        return deltas, None
+
+    historico['Fecha'] = pd.to_datetime(historico['Fecha'])
+    for proceso, nombre in [('ccm', 'CCM'), ('prr', 'PRR')]:
+        hist_proceso = historico[historico['Proceso'] == nombre].sort_values('Fecha')
+        ultimas_fechas = hist_proceso['Fecha'].unique()[-2:]
+        if len(ultimas_fechas) < 2:
+            continue
+        anterior = hist_proceso.loc[hist_proceso['Fecha'] == ultimas_fechas[0], 'Pendientes']
+        actual = hist_proceso.loc[hist_proceso['Fecha'] == ultimas_fechas[1], 'Pendientes']
+        deltas[proceso] = {
+            'delta_pendientes': actual.sum() - anterior.sum(),
+            # Operadores con pendientes en cada fecha (simplificado)
+            'delta_operadores': actual.count() - anterior.count()
+        }
+
+    reciente = historico[historico['Fecha'] >= historico['Fecha'].max() - pd.Timedelta(days=DIAS_EVOLUCION)]
+    evolucion = reciente.groupby(['Fecha', 'Proceso'])['Pendientes'].sum().reset_index()
+    return deltas, evolucion
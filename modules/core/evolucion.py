@@ -0,0 +1,223 @@
+"""
+Cálculos de la pestaña de Evolución de Pendientes
+"""
+
+import pandas as pd
+from dataclasses import dataclass, field
+from typing import Any, List, Optional, Sequence
+from modules.utils.analytics import (
+    preparar_tabla_operadores_periodo, procesar_datos_produccion, procesar_evolucion_pendientes
+)
+from modules.data.capas_evolucion import matriz_por_capas
+from modules.data.motores import tabla_dinamica
+from modules.data.snapshots import datos_proceso, snapshot_activo
+from modules.utils.cache import huella_dataframe, memoizar
+
+# Periodos del ranking: días más recientes de la matriz o todo el periodo
+PERIODOS_RANKING = (7, 15, 30, 'Todo el periodo')
+PERIODO_RANKING_DEFECTO = 15
+
+@dataclass(frozen=True)
+class ResultadoEvolucion:
+    """
+    Matriz de evolución de pendientes (operador x fecha) de un proceso
+    """
+    proceso: str
+    anios: List[str]
+    matriz: pd.DataFrame = field(repr=False, compare=False)
+
+    @property
+    def totales(self) -> pd.Series:
+        """Total de pendientes por fecha (fila TOTAL de la matriz)"""
+        return self.matriz.loc['TOTAL'].astype(int)
+
+@dataclass(frozen=True)
+class RankingEvolucion:
+    """
+    Ranking de evolución por operador en un periodo, con su resumen por estado
+    """
+    periodo: Any
+    evolucion: pd.DataFrame = field(repr=False, compare=False)
+    resumen_estado: pd.DataFrame = field(repr=False, compare=False)
+
+def anios_disponibles(historico: pd.DataFrame, proceso: str) -> List[str]:
+    """
+    Años del histórico de un proceso, con ANTIGUOS primero y luego del más reciente al más antiguo
+
+    Args:
+        historico: Histórico con los años antiguos agrupados (agrupar_anios_antiguos)
+        proceso: Tipo de proceso ('CCM' o 'PRR')
+    """
+    anios = historico[historico['Proceso'] == proceso]['Año'].unique().tolist()
+    return sorted(set(anios), reverse=True, key=lambda x: (x != 'ANTIGUOS', x))
+
+def calcular_evolucion(historico: pd.DataFrame, proceso: str,
+                       anios_sel: Sequence[str] = ('Todos',)) -> Optional[ResultadoEvolucion]:
+    """
+    Calcula la matriz de evolución para los años seleccionados
+
+    Con 'Todos' o varios años solo se incluyen las fechas presentes en todos ellos.
+    La matriz se arma con las capas por año mantenidas de forma incremental
+    (modules/data/capas_evolucion.py), por lo que tras registrar un día solo
+    se procesan las filas nuevas. En modo snapshot la selección 'Todos' se
+    sirve materializada.
+
+    Args:
+        historico: Histórico con los años antiguos agrupados (agrupar_anios_antiguos)
+        proceso: Tipo de proceso ('CCM' o 'PRR')
+        anios_sel: Años seleccionados ('Todos' para todos)
+
+    Returns:
+        ResultadoEvolucion, o None si no hay datos para la selección
+    """
+    if 'Todos' in anios_sel or not anios_sel:
+        snapshot = snapshot_activo()
+        if snapshot is not None:
+            encontrado, campos = snapshot.obtener(f"{proceso}/evolucion")
+            if encontrado:
+                return ResultadoEvolucion(**campos) if campos is not None else None
+
+    tabla = matriz_evolucion(historico, proceso, tuple(anios_sel))
+    if tabla is None:
+        return None
+    return ResultadoEvolucion(proceso=proceso, anios=anios_disponibles(historico, proceso), matriz=tabla)
+
+def calcular_ranking(matriz: pd.DataFrame, df: Optional[pd.DataFrame],
+                     periodo: Any = PERIODO_RANKING_DEFECTO,
+                     proceso: Optional[str] = None) -> Optional[RankingEvolucion]:
+    """
+    Calcula el ranking de evolución de pendientes por operador en un periodo
+
+    En modo snapshot, el ranking de la matriz materializada se sirve
+    materializado; para otras matrices se calcula cargando el consolidado.
+
+    Args:
+        matriz: Matriz de evolución (ResultadoEvolucion.matriz)
+        df: DataFrame con los datos del proceso, para la producción (None en modo snapshot)
+        periodo: Días más recientes a analizar o 'Todo el periodo'
+        proceso: Tipo de proceso; necesario si df es None
+
+    Returns:
+        RankingEvolucion, o None si no hay datos suficientes
+    """
+    snapshot = snapshot_activo()
+    if (snapshot is not None and proceso is not None
+            and huella_dataframe(matriz) == snapshot.huella(f"{proceso}/evolucion", 'matriz')):
+        encontrado, campos = snapshot.obtener(f"{proceso}/ranking/{periodo}")
+        if encontrado:
+            return RankingEvolucion(**campos) if campos is not None else None
+
+    # Solo operadores (sin TOTAL)
+    tabla_operadores = matriz.drop('TOTAL', errors='ignore')
+    if len(tabla_operadores.columns) == 0:
+        return None
+
+    # Definir periodo
+    if periodo == 'Todo el periodo':
+        cols_periodo = tabla_operadores.columns
+    else:
+        cols_periodo = tabla_operadores.columns[-periodo:]
+
+    # Preparar datos para análisis
+    pendientes_long = preparar_tabla_operadores_periodo(tabla_operadores, periodo, cols_periodo)
+    if len(pendientes_long) == 0:
+        return None
+
+    # Obtener datos de producción
+    df = datos_proceso(df, proceso)
+    col_operador = 'OperadorPre' if 'OperadorPre' in df.columns else 'OPERADOR'
+    prod_promedio = procesar_datos_produccion(df, cols_periodo, col_operador, 'FechaPre', 'NumeroTramite')
+
+    # Calcular métricas de evolución
+    evolucion = procesar_evolucion_pendientes(pendientes_long, prod_promedio, col_operador)
+
+    resumen_estado = evolucion.groupby('Eficiencia').agg({
+        'OPERADOR_NORM': 'count',
+        'Pendientes_Final': 'sum',
+        'Produccion_Promedio': 'mean'
+    }).round(2)
+
+    return RankingEvolucion(periodo=periodo, evolucion=evolucion, resumen_estado=resumen_estado)
+
+@memoizar
+def filtrar_datos_historicos(historico: pd.DataFrame, proceso: str, anios_sel: list,
+                             anios_disp: list) -> pd.DataFrame:
+    """
+    Filtra los datos históricos según la selección de años
+    """
+    if 'Todos' in anios_sel or not anios_sel:
+        # Mostrar solo fechas que existen en todos los años
+        anios_validos = [a for a in anios_disp if a != 'Todos']
+        fechas_por_anio = [
+            set(historico[(historico['Proceso'] == proceso) & (historico['Año'] == anio)]['Fecha'].unique())
+            for anio in anios_validos
+        ]
+        if fechas_por_anio:
+            fechas_comunes = set.intersection(*fechas_por_anio)
+        else:
+            fechas_comunes = set()
+        df_filtro = historico[
+            (historico['Proceso'] == proceso) &
+            (historico['Fecha'].isin(fechas_comunes))
+        ].copy()
+    elif len(anios_sel) > 1:
+        # Mostrar solo fechas que existen en todos los años seleccionados
+        fechas_por_anio = [
+            set(historico[(historico['Proceso'] == proceso) & (historico['Año'] == anio)]['Fecha'].unique())
+            for anio in anios_sel
+        ]
+        if fechas_por_anio:
+            fechas_comunes = set.intersection(*fechas_por_anio)
+        else:
+            fechas_comunes = set()
+        df_filtro = historico[
+            (historico['Proceso'] == proceso) &
+            (historico['Año'].isin(anios_sel)) &
+            (historico['Fecha'].isin(fechas_comunes))
+        ].copy()
+    else:
+        df_filtro = historico[
+            (historico['Proceso'] == proceso) &
+            (historico['Año'].isin(anios_sel))
+        ].copy()
+
+    return df_filtro
+
+@memoizar(persistente=True)
+def matriz_evolucion(historico: pd.DataFrame, proceso: str, anios_sel: tuple) -> Optional[pd.DataFrame]:
+    """
+    Matriz de evolución de los años seleccionados a partir de las capas incrementales
+
+    Equivale a crear_matriz_evolucion sobre filtrar_datos_historicos.
+
+    Returns:
+        Matriz ordenada y con la fila TOTAL, o None si la selección no tiene datos
+    """
+    tabla_matriz = matriz_por_capas(historico, proceso, anios_sel)
+    return _ordenar_y_totalizar(tabla_matriz) if tabla_matriz is not None else None
+
+@memoizar(persistente=True)
+def crear_matriz_evolucion(df_filtro: pd.DataFrame) -> pd.DataFrame:
+    """
+    Crea la matriz de evolución de pendientes pivoteando todo el histórico filtrado
+    """
+    # Pivotear: filas=OPERADOR, columnas=Fecha, valores=Pendientes
+    tabla_matriz = tabla_dinamica(df_filtro, 'OPERADOR', 'Fecha', 'Pendientes', funcion='sum')
+    return _ordenar_y_totalizar(tabla_matriz)
+
+def _ordenar_y_totalizar(tabla_matriz: pd.DataFrame) -> pd.DataFrame:
+    """Ordena las fechas y los operadores (por la última fecha) y agrega la fila TOTAL"""
+    # Ordenar columnas por fecha
+    tabla_matriz = tabla_matriz.reindex(sorted(tabla_matriz.columns), axis=1)
+
+    # Ordenar filas de mayor a menor según la última fecha disponible
+    if len(tabla_matriz.columns) > 0:
+        ultima_fecha = tabla_matriz.columns[-1]
+        tabla_matriz = tabla_matriz.sort_values(by=ultima_fecha, ascending=False)
+
+    # Agregar fila TOTAL
+    total_row = tabla_matriz.sum(axis=0)
+    total_row.name = 'TOTAL'
+    tabla_matriz = pd.concat([tabla_matriz, pd.DataFrame([total_row])])
+
+    return tabla_matriz
@@ -0,0 +1,101 @@
+"""
+Cálculos de la pestaña de Ingresos Diarios
+"""
+
+import pandas as pd
+from dataclasses import dataclass, field
+from typing import Optional
+from modules.data.motores import agregar
+from modules.data.snapshots import desde_snapshot
+from modules.utils.cache import memoizar
+
+COL_FECHA_INGRESO = 'FechaExpendiente'
+COL_TRAMITE_INGRESO = 'NumeroTramite'
+
+@dataclass(frozen=True)
+class ResultadoIngresos:
+    """
+    Series de ingresos de expedientes de un proceso
+    """
+    proceso: str
+    diarios: pd.DataFrame = field(repr=False, compare=False)
+    ultimos_15_dias: pd.DataFrame = field(repr=False, compare=False)
+    semanal: pd.DataFrame = field(repr=False, compare=False)
+
+@desde_snapshot('ingresos', ResultadoIngresos)
+def calcular_ingresos(df: pd.DataFrame, proceso: str) -> Optional[ResultadoIngresos]:
+    """
+    Calcula los ingresos diarios de los últimos 60 días, la tabla de los
+    últimos 15 y el promedio semanal del último año
+
+    Args:
+        df: DataFrame con los datos, fechas ya tipadas por el loader (None en modo snapshot)
+        proceso: Tipo de proceso ('CCM' o 'PRR')
+
+    Returns:
+        ResultadoIngresos, o None si los datos no tienen la columna FechaExpendiente
+    """
+    if COL_FECHA_INGRESO not in df.columns:
+        return None
+
+    diarios = calcular_ingresos_diarios(df, COL_FECHA_INGRESO, COL_TRAMITE_INGRESO)
+    return ResultadoIngresos(
+        proceso=proceso,
+        diarios=diarios,
+        ultimos_15_dias=tabla_ultimos_dias(diarios),
+        semanal=calcular_promedio_semanal(df, COL_FECHA_INGRESO, COL_TRAMITE_INGRESO)
+    )
+
+def tabla_ultimos_dias(ingresos_diarios: pd.DataFrame, dias: int = 15) -> pd.DataFrame:
+    """
+    Tabla de ingresos de los últimos días con la fecha como texto
+
+    Args:
+        ingresos_diarios: Serie de ingresos por fecha (calcular_ingresos_diarios)
+        dias: Días a incluir
+
+    Returns:
+        DataFrame con las columnas Fecha e Ingresos
+    """
+    tabla = ingresos_diarios.tail(dias).copy()
+    tabla[COL_FECHA_INGRESO] = tabla[COL_FECHA_INGRESO].dt.strftime('%d/%m/%Y')
+    return tabla.rename(columns={COL_FECHA_INGRESO: 'Fecha', COL_TRAMITE_INGRESO: 'Ingresos'})
+
+@memoizar
+def calcular_ingresos_diarios(df: pd.DataFrame, col_fecha_ing: str,
+                              col_tramite_ing: str, dias: int = 60) -> pd.DataFrame:
+    """
+    Cuenta los ingresos por fecha en los últimos días
+    """
+    fecha_max = df[col_fecha_ing].max()
+    fecha_min = fecha_max - pd.Timedelta(days=dias)
+
+    # Agrupar por fecha y contar NumeroTramite (ya ordenado por fecha)
+    return agregar(
+        df, [col_fecha_ing], col_tramite_ing,
+        filtros=[(col_fecha_ing, '>=', fecha_min), (col_fecha_ing, '<=', fecha_max)]
+    )
+
+@memoizar
+def calcular_promedio_semanal(df: pd.DataFrame, col_fecha_ing: str,
+                              col_tramite_ing: str) -> pd.DataFrame:
+    """
+    Agrupa los ingresos del último año por semana
+    """
+    fecha_sem = pd.to_datetime(df[col_fecha_ing], errors='coerce')
+    fecha_max_sem = fecha_sem.max()
+    fecha_min_sem = fecha_max_sem - pd.Timedelta(days=365)
+    en_periodo = (fecha_sem >= fecha_min_sem) & (fecha_sem <= fecha_max_sem)
+
+    # Agrupar por semana
+    semana = fecha_sem[en_periodo].dt.to_period('W').dt.start_time.rename('Semana')
+    ingresos_diarios_semanal = df.loc[en_periodo, col_tramite_ing].groupby(semana).count().reset_index()
+    ingresos_diarios_semanal = ingresos_diarios_semanal.rename(columns={col_tramite_ing: 'Total ingresos'})
+    ingresos_diarios_semanal['Promedio semanal'] = ingresos_diarios_semanal['Total ingresos'] / 7
+    ingresos_diarios_semanal['Fecha'] = ingresos_diarios_semanal['Semana'].dt.strftime('%d/%m/%Y')
+    ingresos_diarios_semanal['Rango de fechas'] = (
+        ingresos_diarios_semanal['Semana'].dt.strftime('%d/%m/%Y') + ' - ' +
+        (ingresos_diarios_semanal['Semana'] + pd.Timedelta(days=6)).dt.strftime('%d/%m/%Y')
+    )
+
+    return ingresos_diarios_semanal
@@ -0,0 +1,133 @@
+"""
+Construcción de los snapshots materializados de todas las pestañas
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+import pandas as pd
+from modules.data.loader import (
+    cargar_datos, obtener_archivos_proceso, cargar_historico_pendientes, registrar_snapshot_pendientes
+)
+from modules.data.historico_sin_asignar import actualizar_historico_sin_asignar
+from modules.data.snapshots import (
+    Snapshot, VERSIONES_CONSERVADAS, calculo_en_vivo, cargar_snapshot, escribir_snapshot, huellas_entradas
+)
+from modules.core.pendientes import calcular_pendientes
+from modules.core.produccion import calcular_produccion
+from modules.core.ingresos import calcular_ingresos
+from modules.core.proyeccion import calcular_metricas_base
+from modules.core.evolucion import PERIODOS_RANKING, calcular_evolucion, calcular_ranking
+from modules.utils.analytics import agrupar_anios_antiguos
+from modules.utils.executive_analytics import calcular_kpis_proceso
+
+RUTA_HISTORICO_PENDIENTES = 'ARCHIVOS/historico_pendientes_operador.csv'
+
+@dataclass(frozen=True)
+class ResultadoMaterializacion:
+    """
+    Resultado de una construcción: el snapshot vigente y si se escribió uno nuevo
+    """
+    snapshot: Snapshot
+    nuevo: bool
+    segundos: float
+
+def entradas_snapshot(procesos: Iterable[str]) -> List[str]:
+    """
+    Archivos de los que dependen los snapshots de los procesos indicados
+    """
+    archivos = obtener_archivos_proceso()
+    return [f"ARCHIVOS/{archivos[proceso]}" for proceso in procesos] + [RUTA_HISTORICO_PENDIENTES]
+
+def materializar(directorio: Path, procesos: Iterable[str] = ("CCM", "PRR"),
+                 max_hilos: Optional[int] = None, conservar: int = VERSIONES_CONSERVADAS,
+                 forzar: bool = False, actualizar_historicos: bool = True) -> ResultadoMaterializacion:
+    """
+    Calcula los resultados de todas las pestañas de cada proceso y los
+    escribe como un snapshot nuevo
+
+    Como el dashboard en modo snapshot no escribe, aquí se actualizan antes
+    los históricos de pendientes y de sin asignar del día. Si después de eso
+    el snapshot vigente corresponde a los mismos archivos de entrada, no se
+    escribe uno nuevo (salvo con forzar), por lo que puede ejecutarse
+    periódicamente con poco coste.
+
+    Args:
+        directorio: Directorio de snapshots
+        procesos: Procesos a materializar
+        max_hilos: Máximo de hilos para los cálculos (por defecto uno por tarea)
+        conservar: Versiones a mantener en el directorio
+        forzar: Reconstruir aunque las entradas no hayan cambiado
+        actualizar_historicos: Registrar el día en los históricos antes de calcular
+
+    Returns:
+        ResultadoMaterializacion con el snapshot vigente
+    """
+    inicio = time.perf_counter()
+    procesos = list(procesos)
+    entradas = entradas_snapshot(procesos)
+    directorio.mkdir(parents=True, exist_ok=True)
+
+    with calculo_en_vivo():
+        # Huellas de los consolidados antes de leerlos: si cambian durante la
+        # construcción, el snapshot queda marcado como desactualizado
+        huellas = huellas_entradas(entradas[:-1])
+        archivos = obtener_archivos_proceso()
+        with ThreadPoolExecutor(max_workers=max_hilos) as ejecutor:
+            datos = dict(zip(procesos, ejecutor.map(lambda p: cargar_datos(archivos[p]), procesos)))
+
+        if actualizar_historicos:
+            _actualizar_historicos(datos)
+        huellas.update(huellas_entradas(entradas[-1:]))
+
+        vigente = cargar_snapshot(directorio)
+        if not forzar and vigente is not None and vigente.manifiesto['entradas'] == huellas:
+            return ResultadoMaterializacion(vigente, False, time.perf_counter() - inicio)
+
+        historico = agrupar_anios_antiguos(cargar_historico_pendientes())
+
+        with ThreadPoolExecutor(max_workers=max_hilos) as ejecutor:
+            futuros = [
+                (proceso, ejecutor.submit(tarea))
+                for proceso in procesos
+                for tarea in _tareas_proceso(datos[proceso], proceso, historico)
+            ]
+            artefactos = {}
+            for proceso, futuro in futuros:
+                artefactos.update({f"{proceso}/{clave}": valor for clave, valor in futuro.result().items()})
+
+    snapshot = escribir_snapshot(directorio, artefactos, huellas, conservar)
+    return ResultadoMaterializacion(snapshot, True, time.perf_counter() - inicio)
+
+def _tareas_proceso(df: pd.DataFrame, proceso: str,
+                    historico: pd.DataFrame) -> List[Callable[[], Dict[str, Any]]]:
+    """Tareas independientes de un proceso; cada una devuelve clave -> resultado"""
+    return [
+        lambda: {'pendientes': calcular_pendientes(df, proceso)},
+        lambda: {'produccion': calcular_produccion(df, proceso)},
+        lambda: {'ingresos': calcular_ingresos(df, proceso)},
+        lambda: {'proyeccion': calcular_metricas_base(df, proceso)},
+        lambda: {'kpis': calcular_kpis_proceso(df, proceso)},
+        lambda: _evolucion_y_rankings(df, proceso, historico)
+    ]
+
+def _evolucion_y_rankings(df: pd.DataFrame, proceso: str, historico: pd.DataFrame) -> Dict[str, Any]:
+    """Matriz de evolución con todos los años y su ranking en cada periodo"""
+    evolucion = calcular_evolucion(historico, proceso, ['Todos'])
+    artefactos = {'evolucion': evolucion}
+    if evolucion is not None:
+        for periodo in PERIODOS_RANKING:
+            artefactos[f"ranking/{periodo}"] = calcular_ranking(evolucion.matriz, df, periodo)
+    return artefactos
+
+def _actualizar_historicos(datos: Dict[str, pd.DataFrame]) -> None:
+    """Registra el día en los históricos, como lo haría una visita al dashboard"""
+    for proceso, df in datos.items():
+        registrar_snapshot_pendientes(calcular_pendientes(df, proceso).tabla, proceso)
+    if {'CCM', 'PRR'} <= set(datos):
+        actualizar_historico_sin_asignar(
+            calcular_kpis_proceso(datos['CCM'], 'CCM').sin_asignar,
+            calcular_kpis_proceso(datos['PRR'], 'PRR').sin_asignar
+        )
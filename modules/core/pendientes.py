@@ -0,0 +1,41 @@
+"""
+Cálculos de la pestaña de Pendientes
+"""
+
+import pandas as pd
+from dataclasses import dataclass, field
+from modules.data.loader import procesar_pendientes, crear_tabla_pendientes, calcular_sin_asignar
+from modules.data.snapshots import desde_snapshot
+
+@dataclass(frozen=True)
+class ResultadoPendientes:
+    """
+    Tabla de pendientes por operador y año de un proceso
+    """
+    proceso: str
+    sin_asignar: int
+    tabla: pd.DataFrame = field(repr=False, compare=False)
+
+    @property
+    def total(self) -> int:
+        """Total de pendientes de la tabla (fila y columna Total)"""
+        return int(self.tabla.loc['Total', 'Total']) if 'Total' in self.tabla.index else 0
+
+@desde_snapshot('pendientes', ResultadoPendientes)
+def calcular_pendientes(df: pd.DataFrame, proceso: str) -> ResultadoPendientes:
+    """
+    Calcula la tabla de pendientes y los sin asignar de los últimos 2 años
+
+    Args:
+        df: DataFrame con los datos (None en modo snapshot)
+        proceso: Tipo de proceso ('CCM' o 'PRR')
+
+    Returns:
+        ResultadoPendientes del proceso
+    """
+    df_filtrado = procesar_pendientes(df, proceso)
+    return ResultadoPendientes(
+        proceso=proceso,
+        sin_asignar=int(calcular_sin_asignar(df_filtrado)),
+        tabla=crear_tabla_pendientes(df_filtrado, proceso)
+    )
@@ -0,0 +1,155 @@
+"""
+Cálculos de la pestaña de Producción Diaria
+"""
+
+import pandas as pd
+from dataclasses import dataclass, field
+from typing import Tuple
+from modules.data.loader import OPERADORES_EXCLUIR_PRODUCCION
+from modules.data.motores import tabla_dinamica
+from modules.data.operadores import es_operador
+from modules.data.snapshots import desde_snapshot
+from modules.utils.cache import memoizar
+
+@dataclass(frozen=True)
+class ResultadoProduccion:
+    """
+    Tablas de la pestaña de Producción Diaria de un proceso
+    """
+    proceso: str
+    tabla: pd.DataFrame = field(repr=False, compare=False)
+    fines_semana: pd.DataFrame = field(repr=False, compare=False)
+    resumen_diario: pd.DataFrame = field(repr=False, compare=False)
+
+def columnas_produccion(df: pd.DataFrame) -> Tuple[str, str, str]:
+    """
+    Columnas de operador, fecha y trámite usadas por Producción Diaria
+    """
+    col_operador = 'OperadorPre' if 'OperadorPre' in df.columns else 'OPERADOR'
+    return col_operador, 'FechaPre', 'NumeroTramite'
+
+@desde_snapshot('produccion', ResultadoProduccion)
+def calcular_produccion(df: pd.DataFrame, proceso: str) -> ResultadoProduccion:
+    """
+    Calcula la matriz de producción de las últimas 20 fechas, la de fines de
+    semana de las últimas 5 semanas y el resumen diario
+
+    Args:
+        df: DataFrame con los datos, fechas ya tipadas por el loader (None en modo snapshot)
+        proceso: Tipo de proceso ('CCM' o 'PRR')
+
+    Returns:
+        ResultadoProduccion con las tres tablas
+    """
+    col_operador, col_fecha, col_tramite = columnas_produccion(df)
+    df_20dias = filtrar_ultimos_20_dias(df, col_fecha)
+    tabla = filtrar_tabla_produccion(crear_tabla_produccion(df_20dias, col_operador, col_fecha, col_tramite))
+    return ResultadoProduccion(
+        proceso=proceso,
+        tabla=tabla,
+        fines_semana=crear_tabla_fines_semana(df, col_operador, col_fecha, col_tramite),
+        resumen_diario=calcular_resumen_diario(df_20dias, col_operador, col_fecha, col_tramite)
+    )
+
+@memoizar
+def filtrar_ultimos_20_dias(df: pd.DataFrame, col_fecha: str) -> pd.DataFrame:
+    """
+    Filtra los registros de las últimas 20 fechas con producción
+    """
+    fechas_ordenadas = df[col_fecha].dropna().sort_values().unique()
+    ultimos_20_dias = fechas_ordenadas[-20:]
+    return df[df[col_fecha].isin(ultimos_20_dias)]
+
+@memoizar(persistente=True)
+def crear_tabla_produccion(df_20dias: pd.DataFrame, col_operador: str,
+                           col_fecha: str, col_tramite: str) -> pd.DataFrame:
+    """
+    Crea la tabla dinámica de producción diaria
+    """
+    return tabla_dinamica(df_20dias, col_operador, col_fecha, col_tramite, margenes='Total')
+
+@memoizar(persistente=True)
+def filtrar_tabla_produccion(tabla_prod: pd.DataFrame) -> pd.DataFrame:
+    """
+    Filtra y procesa la tabla de producción
+    """
+    tabla_filtrada = tabla_prod[~es_operador(tabla_prod.index, OPERADORES_EXCLUIR_PRODUCCION)]
+
+    if 'Total' in tabla_prod.index:
+        if tabla_filtrada.shape[0] > 1:
+            tabla_filtrada = tabla_filtrada[
+                (tabla_filtrada['Total'] >= 5) | (tabla_filtrada.index == 'Total')
+            ]
+    else:
+        tabla_filtrada = tabla_filtrada[tabla_filtrada['Total'] >= 5]
+
+    # Recalcular la fila Total después de filtrar
+    tabla_sin_total = tabla_filtrada.drop('Total', errors='ignore')
+    total_row = tabla_sin_total.sum(numeric_only=True)
+    total_row.name = 'Total'
+    tabla_filtrada_corr = pd.concat([tabla_sin_total, pd.DataFrame([total_row])])
+
+    # Formatear las fechas de las columnas
+    fechas_formateadas = [
+        f.strftime('%d/%m/%Y') if not isinstance(f, str) and f != 'Total' else f
+        for f in tabla_filtrada_corr.columns
+    ]
+    tabla_filtrada_corr.columns = fechas_formateadas
+
+    # Ordenar por Total descendente
+    if 'Total' in tabla_filtrada_corr.index:
+        tabla_sin_total = tabla_filtrada_corr.drop('Total')
+        tabla_sin_total = tabla_sin_total.sort_values(by='Total', ascending=False)
+        tabla_filtrada_corr = pd.concat([tabla_sin_total, tabla_filtrada_corr.loc[['Total']]])
+    else:
+        tabla_filtrada_corr = tabla_filtrada_corr.sort_values(by='Total', ascending=False)
+
+    return tabla_filtrada_corr
+
+@memoizar(persistente=True)
+def crear_tabla_fines_semana(df: pd.DataFrame, col_operador: str, col_fecha: str,
+                             col_tramite: str) -> pd.DataFrame:
+    """
+    Crea la tabla de producción de sábados y domingos de las últimas 5 semanas
+    """
+    # Calcular el rango de fechas de las últimas 5 semanas
+    fecha_max = df[col_fecha].max()
+    fecha_min = fecha_max - pd.Timedelta(weeks=5)
+
+    # Crear tabla dinámica de sábados (5) y domingos (6); el motor aplica los filtros
+    tabla_weekend = tabla_dinamica(
+        df, col_operador, col_fecha, col_tramite,
+        filtros=[(col_fecha, '>=', fecha_min), (col_fecha, '<=', fecha_max),
+                 (col_fecha, 'dia_semana_en', [5, 6])],
+        margenes='Total'
+    )
+
+    # Mismo filtrado, recálculo de Total y formato que la tabla principal
+    return filtrar_tabla_produccion(tabla_weekend)
+
+@memoizar(persistente=True)
+def calcular_resumen_diario(df_20dias: pd.DataFrame, col_operador: str, col_fecha: str,
+                            col_tramite: str) -> pd.DataFrame:
+    """
+    Calcula operadores, trámites y promedio por operador para cada fecha
+    """
+    # Filtrar el dataframe de los últimos 20 días
+    df_resumen = df_20dias[~es_operador(df_20dias[col_operador], OPERADORES_EXCLUIR_PRODUCCION)].copy()
+
+    # Calcular el total por operador (en los últimos 20 días)
+    totales_operador = df_resumen.groupby(col_operador)[col_tramite].count()
+    operadores_validos = totales_operador[totales_operador >= 5].index
+    df_resumen = df_resumen[df_resumen[col_operador].isin(operadores_validos)]
+
+    # Calcular cantidad de operadores y total de trámites por fecha
+    resumen = df_resumen.groupby(col_fecha).agg(
+        cantidad_operadores=(col_operador, 'nunique'),
+        total_trabajados=(col_tramite, 'count')
+    )
+    resumen = resumen.sort_index()
+    resumen['promedio_por_operador'] = resumen['total_trabajados'] / resumen['cantidad_operadores']
+
+    # Formatear fechas
+    resumen.index = [f.strftime('%d/%m/%Y') if not isinstance(f, str) else f for f in resumen.index]
+
+    return resumen
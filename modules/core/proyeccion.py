@@ -0,0 +1,239 @@
+"""
+Cálculos de la pestaña de Proyección de Cierre
+"""
+
+import pandas as pd
+import numpy as np
+from dataclasses import dataclass
+from modules.data.loader import mascara_pendientes
+from modules.data.operadores import es_operador
+from modules.data.snapshots import desde_snapshot
+from modules.utils.cache import memoizar
+
+# Operadores que no cuentan para la productividad individual
+OPERADORES_EXCLUIR_PRODUCTIVIDAD = [
+    "Aponte Sanchez, Paola Lita", "Lucero Martinez, Carlos Martin",
+    "USUARIO DE AGENCIA DIGITAL", "MAURICIO ROMERO, HUGO", "Sin asignar"
+]
+
+@dataclass(frozen=True)
+class MetricasProyeccion:
+    """
+    Situación actual de un proceso, base de la simulación de cierre
+
+    productividad_estimada indica que la productividad individual no se pudo
+    calcular (o era cero) y se usa 1 en su lugar.
+    """
+    pendientes_actuales_totales: int
+    pendientes_sin_asignar_actuales: int
+    pendientes_asignados_actuales: int
+    ingresos_diarios_promedio: float
+    productividad_individual_promedio: float
+    productividad_estimada: bool
+    num_operadores_activos_defecto: int
+
+@dataclass(frozen=True)
+class Proyeccion:
+    """
+    Resultado de simular el cierre con una cantidad de personal
+    """
+    personal: int
+    cierres_estimados_diarios_simulacion: float
+    balance_diario_proyectado: float
+    dias_para_cero_pendientes: float
+    personal_eq_flujo: float
+
+@desde_snapshot('proyeccion', MetricasProyeccion)
+@memoizar
+def calcular_metricas_base(df: pd.DataFrame, proceso: str) -> MetricasProyeccion:
+    """
+    Calcula las métricas base para la proyección
+
+    Args:
+        df: DataFrame con los datos (None en modo snapshot)
+        proceso: Tipo de proceso ('CCM' o 'PRR')
+
+    Returns:
+        MetricasProyeccion del proceso
+    """
+    # Pendientes actuales
+    df_pend_calc = df[mascara_pendientes(df, proceso)]
+
+    pendientes_actuales_totales = len(df_pend_calc)
+    pendientes_sin_asignar_actuales = int(df_pend_calc['OPERADOR'].isna().sum())
+    pendientes_asignados_actuales = pendientes_actuales_totales - pendientes_sin_asignar_actuales
+
+    # Ingresos diarios promedio (últimos 60 días)
+    df_copy = df.copy()
+    df_copy['FechaExpendiente'] = pd.to_datetime(df_copy['FechaExpendiente'], errors='coerce')
+    fecha_max_ingresos = df_copy['FechaExpendiente'].max()
+    fecha_min_ingresos = fecha_max_ingresos - pd.Timedelta(days=60)
+    ingresos_ultimos_60d = df_copy[
+        (df_copy['FechaExpendiente'] >= fecha_min_ingresos) &
+        (df_copy['FechaExpendiente'] <= fecha_max_ingresos)
+    ]
+    ingresos_diarios_promedio = ingresos_ultimos_60d.groupby(
+        df_copy['FechaExpendiente'].dt.date
+    )['NumeroTramite'].count().mean()
+
+    if pd.isna(ingresos_diarios_promedio):
+        ingresos_diarios_promedio = 0
+
+    # Productividad individual promedio (1 si no se puede calcular)
+    productividad_individual_promedio = calcular_productividad_individual(df_copy)
+    productividad_estimada = bool(
+        pd.isna(productividad_individual_promedio) or productividad_individual_promedio == 0
+    )
+    if productividad_estimada:
+        productividad_individual_promedio = 1
+
+    # Personal activo por defecto
+    operadores_con_pendientes = df_pend_calc.groupby('OPERADOR').size()
+    operadores_con_min_pendientes = operadores_con_pendientes[operadores_con_pendientes >= 5]
+    num_operadores_activos_defecto = len(operadores_con_min_pendientes)
+    if num_operadores_activos_defecto == 0:
+        num_operadores_activos_defecto = 1
+
+    return MetricasProyeccion(
+        pendientes_actuales_totales=pendientes_actuales_totales,
+        pendientes_sin_asignar_actuales=pendientes_sin_asignar_actuales,
+        pendientes_asignados_actuales=pendientes_asignados_actuales,
+        ingresos_diarios_promedio=float(ingresos_diarios_promedio),
+        productividad_individual_promedio=float(productividad_individual_promedio),
+        productividad_estimada=productividad_estimada,
+        num_operadores_activos_defecto=num_operadores_activos_defecto
+    )
+
+def calcular_productividad_individual(df: pd.DataFrame) -> float:
+    """
+    Calcula la productividad individual promedio (cierres por persona y día
+    en las últimas 20 fechas con producción)
+
+    Args:
+        df: DataFrame con los datos (puede convertir FechaPre a datetime en él)
+
+    Returns:
+        Productividad promedio, 0 si no hay producción válida
+    """
+    col_operador_prod = 'OperadorPre' if 'OperadorPre' in df.columns else 'OPERADOR'
+    col_fecha_prod = 'FechaPre'
+    col_tramite_prod = 'NumeroTramite'
+
+    if not pd.api.types.is_datetime64_any_dtype(df[col_fecha_prod]):
+        df[col_fecha_prod] = pd.to_datetime(df[col_fecha_prod], errors='coerce')
+
+    fechas_ordenadas_prod = df[col_fecha_prod].dropna().sort_values().unique()
+    ultimos_20_dias_prod = fechas_ordenadas_prod[-20:]
+    df_20dias_prod = df[df[col_fecha_prod].isin(ultimos_20_dias_prod)]
+
+    df_20dias_prod = df_20dias_prod[~es_operador(df_20dias_prod[col_operador_prod], OPERADORES_EXCLUIR_PRODUCTIVIDAD)]
+
+    totales_operador_prod = df_20dias_prod.groupby(col_operador_prod)[col_tramite_prod].count()
+    operadores_validos_prod = totales_operador_prod[totales_operador_prod >= 5].index
+    df_20dias_prod = df_20dias_prod[df_20dias_prod[col_operador_prod].isin(operadores_validos_prod)]
+
+    resumen_prod_diaria = df_20dias_prod.groupby(df[col_fecha_prod].dt.date).agg(
+        cantidad_operadores=(col_operador_prod, lambda x: x.nunique()),
+        total_trabajados=(col_tramite_prod, 'count')
+    )
+
+    if (not resumen_prod_diaria.empty and
+        'cantidad_operadores' in resumen_prod_diaria and
+        'total_trabajados' in resumen_prod_diaria):
+        resumen_prod_diaria = resumen_prod_diaria[resumen_prod_diaria['cantidad_operadores'] > 0]
+        resumen_prod_diaria['promedio_por_operador'] = (
+            resumen_prod_diaria['total_trabajados'] / resumen_prod_diaria['cantidad_operadores']
+        )
+        productividad_individual_promedio = resumen_prod_diaria['promedio_por_operador'].mean()
+    else:
+        productividad_individual_promedio = 0
+
+    return productividad_individual_promedio
+
+def proyectar(metricas: MetricasProyeccion, personal_simulacion: int) -> Proyeccion:
+    """
+    Calcula las proyecciones basadas en las métricas y personal configurado
+
+    Args:
+        metricas: Métricas base del proceso
+        personal_simulacion: Personal activo simulado
+
+    Returns:
+        Proyeccion con el balance diario, los días hasta cero pendientes
+        (inf si no se agotan) y el personal de equilibrio (0 si no es calculable)
+    """
+    cierres_estimados_diarios_simulacion = (
+        metricas.productividad_individual_promedio * personal_simulacion
+    )
+    balance_diario_proyectado = (
+        cierres_estimados_diarios_simulacion - metricas.ingresos_diarios_promedio
+    )
+
+    # Calcular días para cero pendientes
+    if balance_diario_proyectado > 0:
+        dias_para_cero_pendientes = metricas.pendientes_actuales_totales / balance_diario_proyectado
+    else:
+        dias_para_cero_pendientes = float('inf')
+
+    # Personal para equilibrio
+    if metricas.productividad_individual_promedio > 0:
+        personal_eq_flujo = float(np.ceil(
+            metricas.ingresos_diarios_promedio / metricas.productividad_individual_promedio
+        ))
+    else:
+        personal_eq_flujo = 0
+
+    return Proyeccion(
+        personal=personal_simulacion,
+        cierres_estimados_diarios_simulacion=cierres_estimados_diarios_simulacion,
+        balance_diario_proyectado=balance_diario_proyectado,
+        dias_para_cero_pendientes=dias_para_cero_pendientes,
+        personal_eq_flujo=personal_eq_flujo
+    )
+
+def resumen_proyeccion(metricas: MetricasProyeccion, proyeccion: Proyeccion) -> pd.DataFrame:
+    """
+    Tabla de resumen de la situación actual, la simulación y el equilibrio
+
+    Args:
+        metricas: Métricas base del proceso
+        proyeccion: Resultado de proyectar
+
+    Returns:
+        DataFrame con las columnas Métrica y Valor (texto)
+    """
+    balance = proyeccion.balance_diario_proyectado
+    if balance > 0:
+        texto_balance = f"Superávit de {balance:.2f} expedientes/día. (Pendientes tienden a disminuir)"
+    elif balance < 0:
+        texto_balance = f"Déficit de {abs(balance):.2f} expedientes/día. (Pendientes tienden a aumentar)"
+    else:
+        texto_balance = "Equilibrio: 0 expedientes/día. (Pendientes tienden a mantenerse estables)"
+
+    if proyeccion.dias_para_cero_pendientes != float('inf'):
+        texto_dias = f"{proyeccion.dias_para_cero_pendientes:.1f} días (si el ritmo se mantiene)"
+    else:
+        texto_dias = "No se agotarán los pendientes actuales con este ritmo."
+
+    if proyeccion.personal_eq_flujo > 0:
+        texto_equilibrio = f"{int(proyeccion.personal_eq_flujo)} personas"
+    else:
+        texto_equilibrio = "No calculable (productividad individual es cero o no disponible)"
+
+    filas = [
+        ("**SITUACIÓN ACTUAL**", ""),
+        ("Pendientes Totales Actuales", f"{metricas.pendientes_actuales_totales}"),
+        ("Pendientes Asignados", f"{metricas.pendientes_asignados_actuales}"),
+        ("Pendientes Sin Asignar", f"{metricas.pendientes_sin_asignar_actuales}"),
+        ("Ingresos Diarios Promedio (últimos 60 días)", f"{metricas.ingresos_diarios_promedio:.2f}"),
+        ("Productividad Individual Promedio (cierres/persona/día, últimos 20 días)",
+         f"{metricas.productividad_individual_promedio:.2f}"),
+        ("**SIMULACIÓN CON PERSONAL CONFIGURADO**", ""),
+        ("Personal Activo en Simulación", f"{proyeccion.personal}"),
+        ("Cierres Diarios Estimados (total equipo)", f"{proyeccion.cierres_estimados_diarios_simulacion:.2f}"),
+        ("Balance Diario Proyectado (Cierres Estimados - Ingresos Promedio)", texto_balance),
+        ("Proyección de Agotamiento de Pendientes Actuales", texto_dias),
+        ("**ANÁLISIS DE EQUILIBRIO DE FLUJO (Ingresos = Cierres)**", ""),
+        ("Personal Necesario para Equilibrio de Flujo (aprox.)", texto_equilibrio)
+    ]
+    return pd.DataFrame(filas, columns=['Métrica', 'Valor'])
@@ -0,0 +1,212 @@
+"""
+Capas de la matriz de evolución de pendientes, mantenidas de forma incremental
+
+El histórico de pendientes crece una fecha por día y proceso, pero la matriz
+operador x fecha se armaba pivoteando todo el histórico en cada cambio. Aquí
+cada proceso guarda una capa por año del histórico, y cada capa una columna
+por fecha: los pendientes de esa fecha y año sumados por operador, como
+arrays de posiciones de operador y valores.
+
+Al sincronizar con el histórico se compara una firma de las filas de cada
+(año, fecha) con la guardada y solo se recalculan las columnas nuevas o
+modificadas: registrar el día agrega una columna, corregir un valor rehace
+la columna de esa fecha y año, y las fechas que desaparecen se quitan. La
+selección de años combina las capas ya calculadas, sin volver a recorrer el
+histórico.
+
+Las capas se guardan en la caché en disco (DASHBOARD_CACHE_DIR) y se
+rehidratan tras un reinicio, por lo que el primer render después de
+registrar el día solo procesa las filas de ese día.
+"""
+
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from modules.utils.cache import huella_dataframe
+from modules.utils.cache_disco import cargar_artefacto, guardar_artefacto
+
+class CapasEvolucion:
+    """
+    Columnas operador -> pendientes de un proceso, por año y fecha del histórico
+    """
+
+    def __init__(self, proceso: str):
+        self.proceso = proceso
+        self.huella: Optional[str] = None
+        # Firma de las filas de cada (año, fecha) sincronizado
+        self.firmas: Dict[Tuple[str, str], int] = {}
+        # Operadores vistos alguna vez, en orden de aparición
+        self.operadores: List[str] = []
+        self._posiciones: Dict[str, int] = {}
+        # año -> fecha -> (posiciones de los operadores, pendientes)
+        self.capas: Dict[str, Dict[str, Tuple[np.ndarray, np.ndarray]]] = {}
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        estado = self.__dict__.copy()
+        del estado['_lock']
+        return estado
+
+    def __setstate__(self, estado):
+        self.__dict__.update(estado)
+        self._lock = threading.Lock()
+
+    def anios(self) -> List[str]:
+        """Años con alguna fecha en las capas"""
+        return list(self.capas)
+
+    def fechas(self, anio: str) -> List[str]:
+        """Fechas de un año (vacío si el año no existe)"""
+        return list(self.capas.get(anio, {}))
+
+    def sincronizar(self, historico: pd.DataFrame) -> int:
+        """
+        Pone las capas al día con el histórico recalculando solo lo que cambió
+
+        Args:
+            historico: Histórico de pendientes (con los años antiguos agrupados)
+
+        Returns:
+            Columnas (año, fecha) agregadas, recalculadas o quitadas
+        """
+        huella = huella_dataframe(historico)
+        with self._lock:
+            if huella == self.huella:
+                return 0
+            filas = historico.loc[historico['Proceso'].to_numpy() == self.proceso,
+                                  ['Año', 'Fecha', 'OPERADOR', 'Pendientes']]
+            grupos, claves = _grupos(filas)
+            firmas = _firmas(filas, grupos, claves)
+            cambiadas = [i for i, clave in enumerate(claves)
+                         if clave in firmas and self.firmas.get(clave) != firmas[clave]]
+            quitadas = [clave for clave in self.firmas if clave not in firmas]
+
+            for anio, fecha in quitadas:
+                del self.capas[anio][fecha]
+                if not self.capas[anio]:
+                    del self.capas[anio]
+            if cambiadas:
+                sub = filas[np.isin(grupos, cambiadas)]
+                for (anio, fecha), grupo in sub.groupby(['Año', 'Fecha']):
+                    sumas = grupo.groupby('OPERADOR')['Pendientes'].sum()
+                    self.capas.setdefault(anio, {})[fecha] = (self._registrar(sumas.index), sumas.to_numpy())
+
+            self.firmas = firmas
+            self.huella = huella
+            return len(cambiadas) + len(quitadas)
+
+    def guardar(self) -> bool:
+        """Persiste las capas en la caché en disco"""
+        with self._lock:
+            return guardar_artefacto(_clave_artefacto(self.proceso), self)
+
+    def matriz(self, anios_sel: Iterable[str]) -> Optional[pd.DataFrame]:
+        """
+        Pendientes por operador y fecha de los años seleccionados
+
+        Con 'Todos' o varios años solo se incluyen las fechas presentes en
+        todos ellos y se suman los años; equivale a pivotear el histórico
+        filtrado con filtrar_datos_historicos.
+
+        Args:
+            anios_sel: Años seleccionados ('Todos' o vacío para todos)
+
+        Returns:
+            Tabla operador x fecha sin ordenar ni totalizar, o None si la
+            selección no tiene fechas
+        """
+        anios_sel = list(anios_sel)
+        with self._lock:
+            anios = self.anios() if 'Todos' in anios_sel or not anios_sel else anios_sel
+            fechas = set(self.fechas(anios[0])) if anios else set()
+            for anio in anios[1:]:
+                fechas &= set(self.fechas(anio))
+            if not fechas:
+                return None
+            fechas = sorted(fechas)
+            columnas = [[self.capas[anio][fecha] for anio in anios] for fecha in fechas]
+            nombres = np.array(self.operadores, dtype=object)
+
+        tipo = np.result_type(*(valores.dtype for columna in columnas for _, valores in columna))
+        matriz = np.zeros((len(nombres), len(fechas)), dtype=tipo)
+        presentes = np.zeros(len(nombres), dtype=bool)
+        for j, columna in enumerate(columnas):
+            for posiciones, valores in columna:
+                matriz[posiciones, j] += valores
+                presentes[posiciones] = True
+
+        # Como en la tabla dinámica: solo los operadores con filas en la
+        # selección, ordenados por nombre, y sin las fechas sin operadores
+        filas = np.flatnonzero(presentes)
+        filas = filas[np.argsort(nombres[filas], kind='stable')]
+        con_datos = [j for j, columna in enumerate(columnas) if any(len(p) for p, _ in columna)]
+        if not con_datos:
+            return None
+        return pd.DataFrame(
+            matriz[np.ix_(filas, con_datos)],
+            index=pd.Index(nombres[filas], name='OPERADOR'),
+            columns=pd.Index([fechas[j] for j in con_datos], name='Fecha')
+        )
+
+    def _registrar(self, nombres: pd.Index) -> np.ndarray:
+        """Posiciones de los operadores, agregando los que no se habían visto"""
+        for nombre in nombres:
+            if nombre not in self._posiciones:
+                self._posiciones[nombre] = len(self.operadores)
+                self.operadores.append(nombre)
+        return np.array([self._posiciones[n] for n in nombres], dtype=np.intp)
+
+def obtener_capas(proceso: str) -> CapasEvolucion:
+    """
+    Capas compartidas por todo el proceso del servidor (se rehidratan de disco al primer uso)
+    """
+    with _lock_capas:
+        if proceso not in _capas:
+            encontrado, capas = cargar_artefacto(_clave_artefacto(proceso))
+            _capas[proceso] = capas if encontrado and isinstance(capas, CapasEvolucion) else CapasEvolucion(proceso)
+        return _capas[proceso]
+
+def matriz_por_capas(historico: pd.DataFrame, proceso: str,
+                     anios_sel: Iterable[str]) -> Optional[pd.DataFrame]:
+    """
+    Sincroniza las capas del proceso con el histórico y arma la matriz de la selección
+
+    Args:
+        historico: Histórico de pendientes (con los años antiguos agrupados)
+        proceso: Tipo de proceso ('CCM' o 'PRR')
+        anios_sel: Años seleccionados ('Todos' para todos)
+
+    Returns:
+        Tabla operador x fecha sin ordenar ni totalizar, o None si no hay datos
+    """
+    capas = obtener_capas(proceso)
+    if capas.sincronizar(historico):
+        capas.guardar()
+    return capas.matriz(anios_sel)
+
+_capas: Dict[str, CapasEvolucion] = {}
+_lock_capas = threading.Lock()
+
+def _clave_artefacto(proceso: str) -> str:
+    return f"capas_evolucion:{proceso}"
+
+def _grupos(filas: pd.DataFrame) -> Tuple[np.ndarray, List[Tuple[str, str]]]:
+    """Código de grupo (año, fecha) de cada fila (-1 si alguno es nulo) y las claves de los códigos"""
+    codigos_anio, anios = pd.factorize(filas['Año'])
+    codigos_fecha, fechas = pd.factorize(filas['Fecha'])
+    grupos = codigos_anio * len(fechas) + codigos_fecha
+    grupos[(codigos_anio < 0) | (codigos_fecha < 0)] = -1
+    claves = [(anio, fecha) for anio in anios for fecha in fechas]
+    return grupos, claves
+
+def _firmas(filas: pd.DataFrame, grupos: np.ndarray,
+            claves: List[Tuple[str, str]]) -> Dict[Tuple[str, str], int]:
+    """Firma de las filas de cada (año, fecha): suma de los hashes de operador y pendientes"""
+    hashes = pd.util.hash_pandas_object(filas[['OPERADOR', 'Pendientes']], index=False).to_numpy()
+    validas = grupos >= 0
+    sumas = np.zeros(len(claves), dtype=np.uint64)
+    np.add.at(sumas, grupos[validas], hashes[validas])
+    filas_por_grupo = np.bincount(grupos[validas], minlength=len(claves))
+    return {claves[i]: int(sumas[i]) for i in np.flatnonzero(filas_por_grupo)}
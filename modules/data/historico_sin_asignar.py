@@ -7,8 +7,10 @@ import pandas as pd
 import pytz
 import datetime
 import os
-from modules.data.loader import procesar_pendientes, calcular_sin_asignar
+from modules.utils.perfilado import perfilar
+from modules.utils.metricas import metrica_historico, registrar_escritura_historico
 
+@perfilar
 def cargar_historico_sin_asignar() -> pd.DataFrame:
     """
     Carga el histórico de casos sin asignar
@@ -22,25 +24,20 @@ def cargar_historico_sin_asignar() -> pd.DataFrame:
     except FileNotFoundError:
         return pd.DataFrame(columns=['fecha', 'proceso', 'sin_asignar'])
 
-def actualizar_historico_sin_asignar(df_ccm: pd.DataFrame, df_prr: pd.DataFrame) -> None:
+@perfilar
+@metrica_historico('sin_asignar')
+def actualizar_historico_sin_asignar(sin_asignar_ccm: int, sin_asignar_prr: int) -> None:
     """
     Actualiza el histórico de casos sin asignar solo si los datos han cambiado
     
     Args:
-        df_ccm: DataFrame de CCM
-        df_prr: DataFrame de PRR
+        sin_asignar_ccm: Casos sin asignar actuales CCM (ya calculados en los KPIs)
+        sin_asignar_prr: Casos sin asignar actuales PRR (ya calculados en los KPIs)
     """
     # Obtener fecha local
     tz = pytz.timezone('America/Lima')
     fecha_hoy = datetime.datetime.now(tz).strftime('%Y-%m-%d')
     
-    # Calcular sin asignar actuales
-    df_ccm_filt = procesar_pendientes(df_ccm, "CCM")
-    sin_asignar_ccm = calcular_sin_asignar(df_ccm_filt)
-    
-    df_prr_filt = procesar_pendientes(df_prr, "PRR")
-    sin_asignar_prr = calcular_sin_asignar(df_prr_filt)
-    
     # Cargar histórico existente
     historico = cargar_historico_sin_asignar()
     
@@ -83,6 +80,7 @@ def actualizar_historico_sin_asignar(df_ccm: pd.DataFrame, df_prr: pd.DataFrame)
     # Guardar
     ruta_historico = 'ARCHIVOS/historico_sin_asignar.csv'
     historico_actualizado.to_csv(ruta_historico, index=False)
+    registrar_escritura_historico('sin_asignar', len(historico_actualizado))
 
 def calcular_tendencia_sin_asignar(sin_asignar_actual_ccm: int, sin_asignar_actual_prr: int) -> dict:
     """
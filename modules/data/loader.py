@@ -5,22 +5,118 @@ Módulo para cargar y procesar datos del dashboard
 import streamlit as st
 import pandas as pd
 import datetime
+import hashlib
+import os
 import pytz
+import threading
 from pathlib import Path
 from typing import Dict, Optional
+from modules.data.motores import tabla_dinamica
+from modules.data.operadores import es_operador, normalizar_operadores
+from modules.utils.cache import huella_dataframe, marcar_huella, memoizar
+from modules.utils.cache_disco import cargar_artefacto, guardar_artefacto
+from modules.utils.memoria import medir_carga, registrar_dataset
+from modules.utils.metricas import (
+    CARGA_DATASET, ERRORES_CARGA, metrica_historico, registrar_escritura_historico
+)
+from modules.utils.perfilado import perfilar
 
-@st.cache_data
+# Etapas que definen un pendiente PRR
+ETAPAS_PRR = [
+    'ACTUALIZAR DATOS BENEFICIARIO - F',
+    'ACTUALIZAR DATOS BENEFICIARIO - I',
+    'ASOCIACION BENEFICIARIO - F',
+    'ASOCIACION BENEFICIARIO - I',
+    'CONFORMIDAD SUB-DIREC.INMGRA. - I',
+    'PAGOS, FECHA Y NRO RD. - F',
+    'PAGOS, FECHA Y NRO RD. - I',
+    'RECEPCIÓN DINM - F'
+]
+
+# Operadores que no se muestran en la tabla de pendientes
+OPERADORES_EXCLUIR_PENDIENTES = {
+    "CCM": ["MAURICIO ROMERO, HUGO", "Sin asignar"],
+    "PRR": ["Sin asignar"]
+}
+
+# Operadores que no cuentan para la producción diaria
+OPERADORES_EXCLUIR_PRODUCCION = [
+    "Aponte Sanchez, Paola Lita",
+    "Lucero Martinez, Carlos Martin",
+    "USUARIO DE AGENCIA DIGITAL"
+]
+
+@perfilar
 def cargar_datos(archivo: str) -> pd.DataFrame:
     """
     Carga los datos desde un archivo Excel
     
+    El DataFrame devuelto queda marcado con la huella del archivo, que es la
+    clave que usan las funciones memoizadas para no volver a hashearlo. Es
+    compartido entre sesiones, por lo que debe tratarse como de solo lectura.
+    
     Args:
         archivo: Nombre del archivo a cargar
         
     Returns:
         DataFrame con los datos cargados
     """
-    return pd.read_excel(f"ARCHIVOS/{archivo}")
+    try:
+        huella = huella_archivo(f"ARCHIVOS/{archivo}")
+        df = marcar_huella(_leer_datos(archivo, huella), huella)
+    except Exception:
+        ERRORES_CARGA.incrementar(proceso=_proceso_de_archivo(archivo))
+        raise
+    registrar_dataset(archivo, df)
+    return df
+
+@st.cache_resource(max_entries=4)
+def _leer_datos(archivo: str, huella: str) -> pd.DataFrame:
+    """
+    Lee el consolidado tipado, desde la caché en disco si ya fue procesado
+    
+    La huella forma parte de la clave para invalidar si cambia el archivo.
+    La memoria del proceso durante la lectura queda en el informe de memoria.
+    """
+    clave = f"dataset:{huella}"
+    with medir_carga(archivo) as carga:
+        encontrado, df = cargar_artefacto(clave)
+        if not encontrado:
+            df = tipificar_consolidado(pd.read_excel(f"ARCHIVOS/{archivo}"))
+            guardar_artefacto(clave, df)
+        carga.filas = len(df)
+    CARGA_DATASET.observar(carga.segundos, proceso=_proceso_de_archivo(archivo),
+                           origen='disco' if encontrado else 'excel')
+    return df
+
+def tipificar_consolidado(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Convierte las columnas de fecha del consolidado a datetime
+    
+    Args:
+        df: DataFrame leído del Excel
+        
+    Returns:
+        El mismo DataFrame con las fechas tipadas
+    """
+    for columna in ['FechaPre', 'FechaExpendiente']:
+        if columna in df.columns and not pd.api.types.is_datetime64_any_dtype(df[columna]):
+            df[columna] = pd.to_datetime(df[columna], errors='coerce')
+    return df
+
+def huella_archivo(ruta: str) -> str:
+    """
+    Calcula la huella de un archivo a partir de su nombre, tamaño y fecha de modificación
+    
+    Args:
+        ruta: Ruta del archivo
+        
+    Returns:
+        Huella hexadecimal del archivo
+    """
+    estado = os.stat(ruta)
+    firma = f"{Path(ruta).name}:{estado.st_size}:{estado.st_mtime_ns}"
+    return hashlib.blake2b(firma.encode(), digest_size=16).hexdigest()
 
 def obtener_archivos_proceso() -> Dict[str, str]:
     """
@@ -34,22 +130,47 @@ def obtener_archivos_proceso() -> Dict[str, str]:
         "PRR": "consolidado_final_PRR_personal.xlsx"
     }
 
-def filtrar_pendientes_ccm(df: pd.DataFrame) -> pd.DataFrame:
+def _proceso_de_archivo(archivo: str) -> str:
+    """Proceso al que corresponde un archivo (o el propio nombre si no es de ninguno)"""
+    for proceso, nombre in obtener_archivos_proceso().items():
+        if nombre == archivo:
+            return proceso
+    return archivo
+
+def mascara_pendientes(df: pd.DataFrame, proceso: str) -> pd.Series:
     """
-    Filtra los datos para obtener pendientes de CCM
+    Calcula la máscara booleana de pendientes según el proceso
     
     Args:
         df: DataFrame con los datos
+        proceso: Tipo de proceso ('CCM' o 'PRR')
         
     Returns:
-        DataFrame filtrado con pendientes CCM
+        Serie booleana alineada con df
     """
-    return df[
-        (df['UltimaEtapa'] == 'EVALUACIÓN - I') &
+    if proceso == "CCM":
+        mascara_etapa = df['UltimaEtapa'] == 'EVALUACIÓN - I'
+    else:
+        mascara_etapa = df['UltimaEtapa'].isin(ETAPAS_PRR)
+    
+    return (
+        mascara_etapa &
         (df['EstadoPre'].isna()) &
         (df['EstadoTramite'] == 'PENDIENTE') &
         (df['EQUIPO'] != 'VULNERABLE')
-    ]
+    )
+
+def filtrar_pendientes_ccm(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Filtra los datos para obtener pendientes de CCM
+    
+    Args:
+        df: DataFrame con los datos
+        
+    Returns:
+        DataFrame filtrado con pendientes CCM
+    """
+    return df[mascara_pendientes(df, "CCM")]
 
 def filtrar_pendientes_prr(df: pd.DataFrame) -> pd.DataFrame:
     """
@@ -61,24 +182,9 @@ def filtrar_pendientes_prr(df: pd.DataFrame) -> pd.DataFrame:
     Returns:
         DataFrame filtrado con pendientes PRR
     """
-    etapas_prr = [
-        'ACTUALIZAR DATOS BENEFICIARIO - F',
-        'ACTUALIZAR DATOS BENEFICIARIO - I',
-        'ASOCIACION BENEFICIARIO - F',
-        'ASOCIACION BENEFICIARIO - I',
-        'CONFORMIDAD SUB-DIREC.INMGRA. - I',
-        'PAGOS, FECHA Y NRO RD. - F',
-        'PAGOS, FECHA Y NRO RD. - I',
-        'RECEPCIÓN DINM - F'
-    ]
-    
-    return df[
-        (df['UltimaEtapa'].isin(etapas_prr)) &
-        (df['EstadoPre'].isna()) &
-        (df['EstadoTramite'] == 'PENDIENTE') &
-        (df['EQUIPO'] != 'VULNERABLE')
-    ]
+    return df[mascara_pendientes(df, "PRR")]
 
+@memoizar(persistente=True)
 def procesar_pendientes(df: pd.DataFrame, proceso: str) -> pd.DataFrame:
     """
     Procesa los datos para obtener pendientes según el proceso
@@ -102,6 +208,7 @@ def procesar_pendientes(df: pd.DataFrame, proceso: str) -> pd.DataFrame:
     
     return df_filtrado
 
+@memoizar(persistente=True)
 def crear_tabla_pendientes(df_filtrado: pd.DataFrame, proceso: str) -> pd.DataFrame:
     """
     Crea la tabla dinámica de pendientes
@@ -114,24 +221,13 @@ def crear_tabla_pendientes(df_filtrado: pd.DataFrame, proceso: str) -> pd.DataFr
         Tabla dinámica de pendientes por operador y año
     """
     # Crear tabla dinámica sin totales automáticos
-    tabla = pd.pivot_table(
-        df_filtrado,
-        index='OPERADOR',
-        columns='Anio',
-        values='NumeroTramite',
-        aggfunc='count',
-        fill_value=0
-    )
+    tabla = tabla_dinamica(df_filtrado, 'OPERADOR', 'Anio', 'NumeroTramite')
     
     # Calcular columna Total manualmente
     tabla['Total'] = tabla.sum(axis=1)
     
     # Excluir operadores específicos
-    if proceso == "CCM":
-        operadores_excluir = ["MAURICIO ROMERO, HUGO", "Sin asignar"]
-        tabla = tabla.drop(operadores_excluir, errors='ignore')
-    elif proceso == "PRR":
-        tabla = tabla.drop(["Sin asignar"], errors='ignore')
+    tabla = tabla[~es_operador(tabla.index, OPERADORES_EXCLUIR_PENDIENTES.get(proceso, []))]
     
     # Ordenar por Total descendente
     tabla = tabla.sort_values(by=('Total'), ascending=False)
@@ -143,6 +239,7 @@ def crear_tabla_pendientes(df_filtrado: pd.DataFrame, proceso: str) -> pd.DataFr
     
     return tabla
 
+@memoizar
 def calcular_sin_asignar(df_filtrado: pd.DataFrame) -> int:
     """
     Calcula el total de casos sin asignar en los últimos 2 años
@@ -161,6 +258,7 @@ def calcular_sin_asignar(df_filtrado: pd.DataFrame) -> int:
         (df_filtrado['Anio'].isin(ultimos_2_anios))
     ]['NumeroTramite'].count()
 
+@perfilar
 def cargar_historico_pendientes() -> pd.DataFrame:
     """
     Carga el histórico de pendientes por operador
@@ -215,11 +313,39 @@ def preparar_historico_pendientes(tabla: pd.DataFrame, proceso: str) -> pd.DataF
     tabla_historico = tabla_historico[['Fecha', 'Proceso', 'OPERADOR', 'Año', 'Pendientes']]
     
     # Normalizar claves para evitar duplicados por diferencias de formato
-    tabla_historico['OPERADOR'] = tabla_historico['OPERADOR'].str.strip().str.upper()
+    tabla_historico['OPERADOR'] = normalizar_operadores(tabla_historico['OPERADOR'])
     tabla_historico['Año'] = tabla_historico['Año'].astype(str)
     
     return tabla_historico
 
+# Snapshots del histórico ya escritos por este proceso del servidor
+_snapshots_registrados = set()
+_lock_snapshots = threading.Lock()
+
+@perfilar
+def registrar_snapshot_pendientes(tabla: pd.DataFrame, proceso: str) -> None:
+    """
+    Guarda el snapshot del día en el histórico de pendientes una sola vez
+
+    El histórico solo se reescribe la primera vez que se ve una tabla de
+    pendientes en el día; los reruns posteriores con los mismos datos no
+    vuelven a leer ni comparar el CSV.
+
+    Args:
+        tabla: Tabla de pendientes actual (resultado de crear_tabla_pendientes)
+        proceso: Tipo de proceso
+    """
+    tabla_historico = preparar_historico_pendientes(tabla, proceso)
+    clave = (tabla_historico['Fecha'].iloc[0] if len(tabla_historico) else None,
+             proceso, huella_dataframe(tabla))
+    with _lock_snapshots:
+        if clave in _snapshots_registrados:
+            return
+        actualizar_historico_pendientes(tabla_historico)
+        _snapshots_registrados.add(clave)
+
+@perfilar
+@metrica_historico('pendientes')
 def actualizar_historico_pendientes(tabla_historico: pd.DataFrame) -> None:
     """
     Actualiza el archivo histórico de pendientes
@@ -232,7 +358,7 @@ def actualizar_historico_pendientes(tabla_historico: pd.DataFrame) -> None:
     # Leer histórico existente si existe
     try:
         historico_existente = pd.read_csv(ruta_historico, dtype=str)
-        historico_existente['OPERADOR'] = historico_existente['OPERADOR'].str.strip().str.upper()
+        historico_existente['OPERADOR'] = normalizar_operadores(historico_existente['OPERADOR'])
         historico_existente['Año'] = historico_existente['Año'].astype(str)
     except FileNotFoundError:
         historico_existente = pd.DataFrame(columns=tabla_historico.columns)
@@ -241,7 +367,7 @@ def actualizar_historico_pendientes(tabla_historico: pd.DataFrame) -> None:
     claves = ['Fecha', 'Proceso', 'OPERADOR', 'Año']
     
     if not historico_existente.empty:
-        # Hacer merge para comparar valores existentes y nuevos
+        # Hacer merge para comparar valores existentes y nuevos (el CSV se lee como texto)
         comparacion = tabla_historico.merge(
             historico_existente,
             on=claves,
@@ -254,7 +380,7 @@ def actualizar_historico_pendientes(tabla_historico: pd.DataFrame) -> None:
         nuevos_o_cambiados = comparacion[
             (comparacion['_merge'] == 'left_only') |
             ((comparacion['_merge'] == 'both') & 
-             (comparacion['Pendientes_nuevo'] != comparacion['Pendientes_existente']))
+             (comparacion['Pendientes_nuevo'].astype(str) != comparacion['Pendientes_existente']))
         ]
         
         if not nuevos_o_cambiados.empty:
@@ -285,6 +411,8 @@ def actualizar_historico_pendientes(tabla_historico: pd.DataFrame) -> None:
             
             # Guardar el histórico actualizado
             historico_existente.to_csv(ruta_historico, index=False)
+            registrar_escritura_historico('pendientes', len(historico_existente))
     else:
         # Si no existe histórico, guardar directamente
-        tabla_historico.to_csv(ruta_historico, index=False) 
\ No newline at end of file
+        tabla_historico.to_csv(ruta_historico, index=False)
+        registrar_escritura_historico('pendientes', len(tabla_historico)) 
\ No newline at end of file
@@ -0,0 +1,302 @@
+"""
+Motores de cálculo para las agregaciones sobre los consolidados
+
+Las tablas dinámicas de pendientes, producción, ingresos y evolución se
+arman en dos pasos: una agregación (filtrar, agrupar y contar o sumar) que
+recorre todas las filas, y el paso a formato ancho, que solo toca los
+grupos. La agregación se delega en un motor elegido con DASHBOARD_MOTOR:
+
+- pandas (por defecto): en memoria y en un solo hilo, como siempre
+- polars: un LazyFrame en el que los filtros y la agregación se optimizan
+  juntos y se ejecutan en varios hilos
+- duckdb: la misma consulta en SQL sobre el DataFrame, también en varios hilos
+
+polars y duckdb son dependencias opcionales; si el motor elegido no está
+instalado, o no puede leer las columnas, se usa pandas. Todos los motores
+devuelven exactamente la misma tabla. Sus paquetes se importan al hacer la
+primera agregación con ellos, para no alargar el arranque del dashboard.
+"""
+
+import importlib
+import importlib.util
+import os
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from modules.utils.perfilado import perfilar
+
+MOTOR_DEFECTO = 'pandas'
+
+# Filtro sobre una columna: (columna, operador, valor)
+Filtro = Tuple[str, str, Any]
+
+# Operadores de filtro; 'dia_semana_en' usa la numeración de pandas (0 = lunes)
+OPERADORES_FILTRO = ('==', '!=', '>=', '<=', 'en', 'no_en', 'dia_semana_en')
+
+AGREGACIONES = ('count', 'sum')
+
+class ColumnasNoSoportadas(ValueError):
+    """
+    El motor no puede leer alguna de las columnas de entrada (por ejemplo,
+    objetos de tipos mezclados); la agregación se repite con pandas
+    """
+
+class Motor(ABC):
+    """
+    Interfaz de los motores: filtrar, agrupar y agregar una columna
+    """
+    nombre = ''
+
+    @abstractmethod
+    def agregar(self, df: pd.DataFrame, por: List[str], valor: str, funcion: str,
+                filtros: Sequence[Filtro]) -> pd.DataFrame:
+        """
+        Agrega valor por las columnas de por sobre las filas que cumplen los filtros
+
+        Los grupos con alguna clave nula se descartan y 'count' cuenta los
+        valores no nulos, como groupby de pandas.
+
+        Returns:
+            DataFrame largo con las columnas de por y valor (sin ordenar)
+
+        Raises:
+            ColumnasNoSoportadas: Si el motor no puede leer las columnas
+        """
+
+class MotorPandas(Motor):
+    nombre = 'pandas'
+
+    def agregar(self, df, por, valor, funcion, filtros):
+        if filtros:
+            df = df[_mascara_pandas(df, filtros)]
+        agrupado = df.groupby(por)[valor]
+        resultado = agrupado.count() if funcion == 'count' else agrupado.sum()
+        return resultado.reset_index()
+
+class MotorPolars(Motor):
+    nombre = 'polars'
+
+    def agregar(self, df, por, valor, funcion, filtros):
+        pl = _modulo('polars')
+        try:
+            consulta = pl.from_pandas(df[_columnas(por, valor, filtros)]).lazy()
+        except (TypeError, ValueError, pl.exceptions.PolarsError) as e:
+            raise ColumnasNoSoportadas(str(e)) from e
+        for columna, operador, objetivo in filtros:
+            consulta = consulta.filter(_expresion_polars(columna, operador, objetivo))
+        agregado = pl.col(valor).count() if funcion == 'count' else pl.col(valor).sum()
+        return consulta.drop_nulls(por).group_by(por).agg(agregado).collect().to_pandas()
+
+class MotorDuckDB(Motor):
+    nombre = 'duckdb'
+
+    def agregar(self, df, por, valor, funcion, filtros):
+        condiciones, parametros = [], []
+        for columna, operador, objetivo in filtros:
+            condicion, parametro = _condicion_sql(columna, operador, objetivo)
+            condiciones.append(condicion)
+            parametros.append(parametro)
+        condiciones += [f"{_identificador(c)} IS NOT NULL" for c in por]
+        claves = ', '.join(_identificador(c) for c in por)
+        consulta = (
+            f"SELECT {claves}, {funcion}({_identificador(valor)}) AS {_identificador(valor)} "
+            f"FROM datos WHERE {' AND '.join(condiciones)} GROUP BY {claves}"
+        )
+        # Una conexión por llamada: las conexiones de DuckDB no se comparten entre hilos
+        duckdb = _modulo('duckdb')
+        with duckdb.connect() as conexion:
+            conexion.register('datos', df[_columnas(por, valor, filtros)])
+            try:
+                return conexion.execute(consulta, parametros).df()
+            except (duckdb.ConversionException, duckdb.InvalidInputException) as e:
+                # DuckDB lee el DataFrame al ejecutar la consulta
+                raise ColumnasNoSoportadas(str(e)) from e
+
+def motores_disponibles() -> List[str]:
+    """
+    Motores que se pueden usar en este entorno
+    """
+    return [nombre for nombre in _MOTORES if _instalado(nombre)]
+
+def obtener_motor(nombre: Optional[str] = None) -> Motor:
+    """
+    Devuelve el motor indicado o el configurado con DASHBOARD_MOTOR
+
+    Args:
+        nombre: 'pandas', 'polars' o 'duckdb' (por defecto, el configurado)
+
+    Returns:
+        El motor pedido, o el de pandas si su paquete no está instalado
+    """
+    nombre = (nombre or os.environ.get('DASHBOARD_MOTOR') or MOTOR_DEFECTO).lower()
+    if nombre not in _MOTORES:
+        raise ValueError(f"Motor desconocido: {nombre} (opciones: {', '.join(_MOTORES)})")
+    if not _instalado(nombre):
+        nombre = MOTOR_DEFECTO
+    return _MOTORES[nombre]
+
+@perfilar
+def agregar(df: pd.DataFrame, por: Sequence[str], valor: str, funcion: str = 'count',
+            filtros: Sequence[Filtro] = (), motor: Optional[str] = None) -> pd.DataFrame:
+    """
+    Filtra, agrupa y agrega con el motor configurado
+
+    Args:
+        df: DataFrame de entrada (no se modifica)
+        por: Columnas de agrupación
+        valor: Columna a agregar
+        funcion: 'count' (valores no nulos) o 'sum'
+        filtros: Filtros (columna, operador, valor) que deben cumplirse todos
+        motor: Motor a usar (por defecto, el configurado)
+
+    Returns:
+        DataFrame largo con las columnas de por y valor, ordenado por por
+    """
+    por = list(por)
+    if funcion not in AGREGACIONES:
+        raise ValueError(f"Agregación no soportada: {funcion}")
+    for _, operador, _ in filtros:
+        if operador not in OPERADORES_FILTRO:
+            raise ValueError(f"Operador de filtro no soportado: {operador}")
+
+    elegido = obtener_motor(motor)
+    if elegido is not _MOTORES['pandas']:
+        try:
+            return _normalizar(elegido.agregar(df, por, valor, funcion, filtros), df, por, valor, funcion)
+        except ColumnasNoSoportadas:
+            pass
+    return _MOTORES['pandas'].agregar(df, por, valor, funcion, filtros)
+
+def tabla_dinamica(df: pd.DataFrame, filas: str, columnas: str, valor: str,
+                   funcion: str = 'count', filtros: Sequence[Filtro] = (),
+                   margenes: Optional[str] = None) -> pd.DataFrame:
+    """
+    Tabla dinámica filas x columnas con ceros donde no hay datos
+
+    Equivale a pd.pivot_table(..., aggfunc=funcion, fill_value=0) sobre las
+    filas que cumplen los filtros, con la agregación hecha por el motor.
+
+    Args:
+        df: DataFrame de entrada
+        filas: Columna para el índice
+        columnas: Columna para las columnas
+        valor: Columna a agregar
+        funcion: 'count' o 'sum'
+        filtros: Filtros previos a la agregación
+        margenes: Nombre de la fila y columna de totales (sin totales si es None)
+
+    Returns:
+        Tabla dinámica con índice y columnas ordenados
+    """
+    largo = agregar(df, [filas, columnas], valor, funcion, filtros)
+    tabla = largo.set_index([filas, columnas])[valor].unstack(columnas, fill_value=0)
+    if tabla.empty:
+        tabla = pd.DataFrame(
+            index=pd.Index([], dtype=df[filas].dtype, name=filas),
+            columns=pd.Index([], dtype=df[columnas].dtype, name=columnas),
+            dtype=largo[valor].dtype
+        )
+    if margenes is not None:
+        tabla[margenes] = tabla.sum(axis=1)
+        total = tabla.sum(axis=0)
+        total.name = margenes
+        tabla = pd.concat([tabla, total.to_frame().T])
+        tabla.index.name = filas
+    return tabla
+
+_MOTORES: Dict[str, Motor] = {m.nombre: m for m in (MotorPandas(), MotorPolars(), MotorDuckDB())}
+
+# Resultado de buscar el paquete de cada motor (pandas siempre está)
+_INSTALADOS: Dict[str, bool] = {MOTOR_DEFECTO: True}
+
+def _instalado(nombre: str) -> bool:
+    """Si el paquete del motor está instalado, sin importarlo"""
+    if nombre not in _INSTALADOS:
+        _INSTALADOS[nombre] = importlib.util.find_spec(nombre) is not None
+    return _INSTALADOS[nombre]
+
+def _modulo(nombre: str):
+    """Paquete del motor, importado en su primer uso"""
+    return importlib.import_module(nombre)
+
+def _columnas(por: List[str], valor: str, filtros: Sequence[Filtro]) -> List[str]:
+    """Columnas que necesita la consulta, sin repetir"""
+    return list(dict.fromkeys([*por, valor, *(columna for columna, _, _ in filtros)]))
+
+def _mascara_pandas(df: pd.DataFrame, filtros: Sequence[Filtro]) -> pd.Series:
+    mascara = pd.Series(True, index=df.index)
+    for columna, operador, objetivo in filtros:
+        serie = df[columna]
+        if operador == '==':
+            mascara &= serie == objetivo
+        elif operador == '!=':
+            mascara &= serie != objetivo
+        elif operador == '>=':
+            mascara &= serie >= objetivo
+        elif operador == '<=':
+            mascara &= serie <= objetivo
+        elif operador == 'en':
+            mascara &= serie.isin(objetivo)
+        elif operador == 'no_en':
+            mascara &= ~serie.isin(objetivo)
+        else:
+            mascara &= serie.dt.weekday.isin(objetivo)
+    return mascara
+
+def _expresion_polars(columna: str, operador: str, objetivo: Any) -> "pl.Expr":
+    col = _modulo('polars').col(columna)
+    if operador == '==':
+        return col == objetivo
+    if operador == '!=':
+        # En pandas un nulo es distinto de cualquier valor
+        return (col != objetivo).fill_null(True)
+    if operador == '>=':
+        return col >= objetivo
+    if operador == '<=':
+        return col <= objetivo
+    if operador == 'en':
+        return col.is_in(list(objetivo))
+    if operador == 'no_en':
+        return ~col.is_in(list(objetivo)).fill_null(False)
+    # polars numera los días de 1 (lunes) a 7
+    return col.dt.weekday().is_in([d + 1 for d in objetivo])
+
+def _condicion_sql(columna: str, operador: str, objetivo: Any) -> Tuple[str, Any]:
+    col = _identificador(columna)
+    if operador in ('==', '>=', '<='):
+        return f"{col} {'=' if operador == '==' else operador} ?", _parametro_sql(objetivo)
+    if operador == '!=':
+        return f"{col} IS DISTINCT FROM ?", _parametro_sql(objetivo)
+    if operador == 'en':
+        return f"list_contains(?, {col})", [_parametro_sql(v) for v in objetivo]
+    if operador == 'no_en':
+        return f"({col} IS NULL OR NOT list_contains(?, {col}))", [_parametro_sql(v) for v in objetivo]
+    # isodow numera los días de 1 (lunes) a 7
+    return f"list_contains(?, isodow({col}))", [int(d) + 1 for d in objetivo]
+
+def _parametro_sql(valor: Any) -> Any:
+    if isinstance(valor, pd.Timestamp):
+        return valor.to_pydatetime()
+    if isinstance(valor, np.generic):
+        return valor.item()
+    return valor
+
+def _identificador(columna: str) -> str:
+    return '"' + str(columna).replace('"', '""') + '"'
+
+def _normalizar(resultado: pd.DataFrame, df: pd.DataFrame, por: List[str], valor: str,
+                funcion: str) -> pd.DataFrame:
+    """Deja el resultado de otro motor con el orden y los tipos del de pandas"""
+    for columna in por:
+        if resultado[columna].dtype != df[columna].dtype:
+            resultado[columna] = resultado[columna].astype(df[columna].dtype)
+    if funcion == 'count':
+        tipo = np.dtype('int64')
+    elif pd.api.types.is_bool_dtype(df[valor]) or pd.api.types.is_integer_dtype(df[valor]):
+        tipo = np.dtype('int64')
+    else:
+        tipo = df[valor].dtype
+    resultado[valor] = resultado[valor].fillna(0).astype(tipo)
+    return resultado.sort_values(por, ignore_index=True)
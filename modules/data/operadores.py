@@ -0,0 +1,210 @@
+"""
+Dimensión de operadores: IDs enteros y nombres canónicos
+
+Un mismo operador aparece escrito de distintas formas según la columna y el
+archivo (OPERADOR en mayúsculas, OperadorPre con mayúsculas y minúsculas,
+tildes que a veces faltan, espacios de más). Cada grafía se resuelve una sola
+vez a un ID entero comparando su clave plegada (sin tildes, en mayúsculas y
+con los espacios colapsados), de modo que las exclusiones, los cruces y los
+agrupamientos entre columnas no dependen de cómo esté escrito el nombre.
+
+El nombre canónico es la primera grafía registrada en mayúsculas y sin
+espacios de más (conserva las tildes, como el histórico de pendientes).
+Los alias manuales (apellidos cambiados, errores de tipeo) se leen de
+ARCHIVOS/alias_operadores.csv con las columnas alias y operador al crear la
+dimensión; para aplicar cambios en ese archivo hay que reiniciar.
+
+Los IDs y los nombres canónicos dependen del orden en que se ven las
+grafías, por lo que solo son estables dentro de un proceso: no deben
+guardarse en disco. Los nombres que se escriben en los históricos pasan por
+normalizar_operadores, que no depende de ese orden.
+"""
+
+import threading
+import unicodedata
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+RUTA_ALIAS_OPERADORES = 'ARCHIVOS/alias_operadores.csv'
+
+# Código de los valores nulos
+SIN_OPERADOR = -1
+
+class DimensionOperadores:
+    """
+    Registro de operadores: cada grafía se asigna al ID de su clave plegada
+    """
+
+    def __init__(self, alias: Optional[Dict[str, str]] = None):
+        self._lock = threading.Lock()
+        self._nombres: List[str] = []
+        self._claves: List[str] = []
+        self._id_por_clave: Dict[str, int] = {}
+        self._id_por_grafia: Dict[str, int] = {}
+        self._alias = {clave_operador(a): nombre_canonico(o) for a, o in (alias or {}).items()}
+
+    def __len__(self) -> int:
+        return len(self._nombres)
+
+    def codificar(self, valores: Iterable) -> np.ndarray:
+        """
+        Convierte nombres de operador en IDs
+
+        Args:
+            valores: Serie, índice o lista de nombres (admite nulos)
+
+        Returns:
+            Array int32 alineado con valores (SIN_OPERADOR para los nulos)
+        """
+        if not isinstance(valores, (pd.Series, pd.Index, np.ndarray)):
+            valores = pd.Index(list(valores), dtype=object)
+        codigos, unicos = pd.factorize(valores)
+        # El código -1 de los nulos cae en el SIN_OPERADOR agregado al final
+        return np.append(self._ids_unicos(unicos), SIN_OPERADOR).astype(np.int32)[codigos]
+
+    def nombres(self, ids: np.ndarray) -> np.ndarray:
+        """
+        Nombres canónicos de un array de IDs (None para SIN_OPERADOR)
+        """
+        nombres = np.array(self._nombres + [None], dtype=object)
+        return nombres[np.asarray(ids)]
+
+    def canonizar(self, serie: pd.Series) -> pd.Series:
+        """
+        Reemplaza cada nombre por su nombre canónico, conservando los nulos
+
+        Args:
+            serie: Serie con nombres de operador
+
+        Returns:
+            Serie con el mismo índice y nombre
+        """
+        return pd.Series(self.nombres(self.codificar(serie)), index=serie.index, name=serie.name)
+
+    def tabla(self) -> pd.DataFrame:
+        """
+        Operadores registrados con su clave plegada, indexados por ID
+        """
+        with self._lock:
+            return pd.DataFrame(
+                {'operador': self._nombres, 'clave': self._claves},
+                index=pd.RangeIndex(len(self._nombres), name='id')
+            )
+
+    def _ids_unicos(self, unicos: Iterable) -> np.ndarray:
+        """IDs de grafías distintas, registrando las que no se habían visto"""
+        ids = [self._id_por_grafia.get(g) for g in unicos]
+        if None in ids:
+            with self._lock:
+                # Las grafías con más tildes primero, para que den el nombre canónico
+                nuevas = sorted((g for g, i in zip(unicos, ids) if i is None), key=_prioridad_grafia)
+                for grafia in nuevas:
+                    self._registrar(grafia)
+            ids = [self._id_por_grafia[g] for g in unicos]
+        return np.array(ids, dtype=np.int32)
+
+    def _registrar(self, grafia) -> None:
+        if grafia in self._id_por_grafia:
+            return
+        clave = clave_operador(grafia)
+        canonico = self._alias.get(clave)
+        if canonico is not None:
+            clave = clave_operador(canonico)
+        identificador = self._id_por_clave.get(clave)
+        if identificador is None:
+            identificador = len(self._nombres)
+            self._id_por_clave[clave] = identificador
+            self._nombres.append(canonico or nombre_canonico(grafia))
+            self._claves.append(clave)
+        self._id_por_grafia[grafia] = identificador
+
+def clave_operador(nombre) -> str:
+    """
+    Clave de comparación de un nombre: sin tildes, en mayúsculas y con los
+    espacios colapsados
+
+    Args:
+        nombre: Nombre del operador
+
+    Returns:
+        Clave plegada ('ÑUÑEZ  pérez ' -> 'NUNEZ PEREZ')
+    """
+    descompuesto = unicodedata.normalize('NFKD', str(nombre))
+    sin_tildes = ''.join(c for c in descompuesto if not unicodedata.combining(c))
+    return ' '.join(sin_tildes.upper().split())
+
+def nombre_canonico(nombre) -> str:
+    """
+    Nombre en mayúsculas y con los espacios colapsados, conservando las tildes
+    """
+    return ' '.join(str(nombre).upper().split())
+
+def obtener_dimension() -> DimensionOperadores:
+    """
+    Dimensión compartida por todo el proceso (se crea con los alias al primer uso)
+    """
+    global _dimension
+    if _dimension is None:
+        with _lock_dimension:
+            if _dimension is None:
+                _dimension = DimensionOperadores(cargar_alias())
+    return _dimension
+
+def cargar_alias(ruta: str = RUTA_ALIAS_OPERADORES) -> Dict[str, str]:
+    """
+    Lee los alias manuales (columnas alias y operador)
+
+    Returns:
+        Diccionario alias -> nombre del operador (vacío si no hay archivo)
+    """
+    try:
+        alias = pd.read_csv(ruta, dtype=str).dropna(subset=['alias', 'operador'])
+    except FileNotFoundError:
+        return {}
+    return dict(zip(alias['alias'], alias['operador']))
+
+def canonizar(serie: pd.Series) -> pd.Series:
+    """
+    Nombres canónicos de una serie de operadores (atajo de la dimensión compartida)
+    """
+    return obtener_dimension().canonizar(serie)
+
+def normalizar_operadores(serie: pd.Series) -> pd.Series:
+    """
+    Nombres en mayúsculas y sin espacios en los extremos, conservando los nulos
+
+    Es el formato con el que se guardan los operadores en los históricos: a
+    diferencia de canonizar, el resultado solo depende de cada nombre y no de
+    las grafías vistas antes.
+    """
+    return serie.str.strip().str.upper()
+
+def ids_operador(valores: Iterable) -> np.ndarray:
+    """
+    IDs de una serie de operadores (atajo de la dimensión compartida)
+    """
+    return obtener_dimension().codificar(valores)
+
+def es_operador(valores: Iterable, operadores: Iterable[str]) -> np.ndarray:
+    """
+    Indica qué valores corresponden a alguno de los operadores, sin importar
+    tildes, mayúsculas, espacios ni alias
+
+    Args:
+        valores: Serie o índice de nombres
+        operadores: Nombres a buscar (por ejemplo, una lista de exclusión)
+
+    Returns:
+        Array booleano alineado con valores
+    """
+    dimension = obtener_dimension()
+    return np.isin(dimension.codificar(valores), dimension.codificar(list(operadores)))
+
+_dimension: Optional[DimensionOperadores] = None
+_lock_dimension = threading.Lock()
+
+def _prioridad_grafia(grafia) -> tuple:
+    texto = str(grafia)
+    return (-sum(ord(c) > 127 for c in texto), texto)
@@ -0,0 +1,241 @@
+"""
+Reconstrucción de los pendientes de fechas pasadas a partir del consolidado
+
+El histórico de pendientes solo tiene las fechas en que alguien abrió la
+pestaña de Pendientes. Aquí los pendientes por operador y año de cualquier
+fecha se reconstruyen con las fechas del propio consolidado: un expediente
+está pendiente desde su FechaExpendiente hasta su FechaPre (al cierre de la
+fecha del pretrabajo ya no cuenta).
+
+Cada expediente aporta un evento +1 el día de ingreso y, si ya se
+pretrabajó, un -1 el día del pretrabajo. Los eventos se ordenan por
+(operador, año, día) y se acumulan dentro de cada grupo, de modo que los
+pendientes de un grupo en una fecha son la suma acumulada del último evento
+no posterior a ella: la serie diaria de años de histórico sale de una sola
+búsqueda vectorizada sobre los arrays ordenados.
+
+Es una aproximación: el consolidado solo guarda el estado actual de cada
+expediente. Los que hoy son pendientes cuentan desde su ingreso; los
+cerrados, entre ingreso y pretrabajo y con su operador actual; los que no
+son pendientes y no tienen FechaPre se omiten porque no se sabe cuándo
+dejaron de serlo. Al día del consolidado el resultado coincide con la tabla
+de Pendientes.
+"""
+
+import datetime
+from dataclasses import dataclass, field
+from typing import Dict, Iterable
+
+import numpy as np
+import pandas as pd
+import pytz
+from modules.data.loader import OPERADORES_EXCLUIR_PENDIENTES, mascara_pendientes
+from modules.data.operadores import es_operador, normalizar_operadores
+from modules.utils.cache import memoizar
+from modules.utils.metricas import metrica_historico, registrar_escritura_historico
+from modules.utils.perfilado import perfilar
+
+RUTA_HISTORICO_PENDIENTES = 'ARCHIVOS/historico_pendientes_operador.csv'
+
+COLUMNAS_HISTORICO = ['Fecha', 'Proceso', 'OPERADOR', 'Año', 'Pendientes']
+
+# Celdas (fecha, operador, año) que se arman a la vez al reconstruir muchas fechas
+CELDAS_POR_BLOQUE = 2_000_000
+
+@dataclass(frozen=True)
+class LineaPendientes:
+    """
+    Eventos acumulados de pendientes de un proceso, por grupo (operador, año)
+
+    El grupo de un evento es posicion_operador * len(anios) + posicion_anio y
+    su clave, grupo * ancho + día relativo; los días relativos empiezan en 1
+    para que el 0 de un grupo nunca coincida con un evento.
+    """
+    proceso: str
+    operadores: np.ndarray
+    anios: np.ndarray
+    # Día relativo 0 (el anterior al primer evento) y días por grupo
+    origen: np.datetime64
+    ancho: int
+    # Claves ordenadas y pendientes del grupo tras los eventos de cada clave
+    claves: np.ndarray = field(repr=False)
+    acumulado: np.ndarray = field(repr=False)
+
+    def pendientes_en(self, fechas: Iterable) -> np.ndarray:
+        """
+        Pendientes de cada operador y año al cierre de cada fecha
+
+        Args:
+            fechas: Fechas a consultar (cualquier cosa que acepte pd.to_datetime)
+
+        Returns:
+            Array (fechas, operadores, años) de pendientes
+        """
+        dias = pd.to_datetime(pd.Index(fechas)).to_numpy().astype('datetime64[D]')
+        relativos = np.clip((dias - self.origen).astype(np.int64), 0, self.ancho - 1)
+        grupos = np.arange(len(self.operadores) * len(self.anios), dtype=np.int64)
+        consultas = grupos[None, :] * self.ancho + relativos[:, None]
+
+        # Último evento del grupo no posterior a la fecha (o ninguno)
+        posiciones = np.searchsorted(self.claves, consultas, side='right') - 1
+        del_grupo = (posiciones >= 0) & (self.claves[np.maximum(posiciones, 0)] // self.ancho == grupos[None, :])
+        pendientes = np.where(del_grupo, self.acumulado[np.maximum(posiciones, 0)], 0)
+        return pendientes.reshape(len(dias), len(self.operadores), len(self.anios))
+
+    def historico(self, fechas: Iterable) -> pd.DataFrame:
+        """
+        Pendientes de las fechas en el formato del histórico de pendientes
+
+        Reproduce la foto que guarda la pestaña de Pendientes: por cada fecha,
+        los operadores con pendientes (sin los excluidos de la tabla) cruzados
+        con los años con pendientes, incluidos los ceros.
+
+        Args:
+            fechas: Fechas a reconstruir
+
+        Returns:
+            DataFrame con Fecha (AAAA-MM-DD), Proceso, OPERADOR, Año y Pendientes
+        """
+        fechas = pd.to_datetime(pd.Index(fechas))
+        # Las fechas se procesan por bloques para no armar el cubo denso de
+        # todas las fechas a la vez
+        por_bloque = max(1, CELDAS_POR_BLOQUE // max(1, len(self.operadores) * len(self.anios)))
+        bloques = [self._historico_bloque(fechas[i:i + por_bloque]) for i in range(0, len(fechas), por_bloque)]
+        if not bloques:
+            return pd.DataFrame(columns=COLUMNAS_HISTORICO)
+        return pd.concat(bloques, ignore_index=True)
+
+    def _historico_bloque(self, fechas: pd.DatetimeIndex) -> pd.DataFrame:
+        pendientes = self.pendientes_en(fechas)
+        excluidos = es_operador(self.operadores, OPERADORES_EXCLUIR_PENDIENTES.get(self.proceso, []))
+        con_operador = (pendientes.sum(axis=2) > 0) & ~excluidos[None, :]
+        con_anio = pendientes.sum(axis=1) > 0
+        i_fecha, i_operador, i_anio = np.nonzero(con_operador[:, :, None] & con_anio[:, None, :])
+        return pd.DataFrame({
+            'Fecha': fechas.strftime('%Y-%m-%d').to_numpy()[i_fecha],
+            'Proceso': self.proceso,
+            'OPERADOR': self.operadores[i_operador],
+            'Año': self.anios[i_anio],
+            'Pendientes': pendientes[i_fecha, i_operador, i_anio]
+        }, columns=COLUMNAS_HISTORICO)
+
+@memoizar(persistente=True)
+def linea_pendientes(df: pd.DataFrame, proceso: str) -> LineaPendientes:
+    """
+    Construye los eventos de pendientes de un consolidado
+
+    Args:
+        df: Consolidado del proceso
+        proceso: Tipo de proceso ('CCM' o 'PRR')
+
+    Returns:
+        LineaPendientes con los eventos ordenados y acumulados
+    """
+    pendiente_hoy = mascara_pendientes(df, proceso).to_numpy()
+    ingreso = df['FechaExpendiente'].to_numpy().astype('datetime64[D]')
+    pretrabajo = np.where(pendiente_hoy, np.datetime64('NaT'), df['FechaPre'].to_numpy().astype('datetime64[D]'))
+    cerrado = ~np.isnat(pretrabajo)
+
+    validas = (
+        (df['EQUIPO'] != 'VULNERABLE').to_numpy() &
+        df['Anio'].notna().to_numpy() &
+        ~np.isnat(ingreso) &
+        (pendiente_hoy | (cerrado & (pretrabajo > ingreso)))
+    )
+    filas = df.loc[validas, ['OPERADOR', 'Anio']]
+    codigos_operador, operadores = pd.factorize(normalizar_operadores(filas['OPERADOR'].fillna('Sin asignar')))
+    codigos_anio, anios = pd.factorize(filas['Anio'], sort=True)
+    ingreso, pretrabajo, cerrado = ingreso[validas], pretrabajo[validas], cerrado[validas]
+
+    if not len(filas):
+        return LineaPendientes(proceso, np.array([], dtype=object), np.array([], dtype=object),
+                               np.datetime64('1970-01-01'), 1, np.array([], dtype=np.int64),
+                               np.array([], dtype=np.int64))
+
+    origen = ingreso.min() - np.timedelta64(1, 'D')
+    ultimo = np.max(pretrabajo[cerrado]) if cerrado.any() else ingreso.max()
+    ancho = int((max(ultimo, ingreso.max()) - origen).astype(np.int64)) + 1
+    grupos = codigos_operador.astype(np.int64) * len(anios) + codigos_anio
+
+    # +1 al ingresar, -1 al pretrabajar; los eventos de una misma clave se suman
+    claves_evento = np.concatenate([
+        grupos * ancho + (ingreso - origen).astype(np.int64),
+        grupos[cerrado] * ancho + (pretrabajo[cerrado] - origen).astype(np.int64)
+    ])
+    deltas = np.concatenate([np.ones(len(grupos), dtype=np.int64), -np.ones(cerrado.sum(), dtype=np.int64)])
+    claves, posiciones = np.unique(claves_evento, return_inverse=True)
+    netos = np.bincount(posiciones, weights=deltas, minlength=len(claves)).astype(np.int64)
+
+    # Suma acumulada reiniciada al empezar cada grupo
+    acumulado = np.cumsum(netos)
+    inicios = np.flatnonzero(np.diff(claves // ancho, prepend=-1))
+    previo = np.concatenate([[0], acumulado[inicios[1:] - 1]])
+    acumulado -= np.repeat(previo, np.diff(np.append(inicios, len(claves))))
+
+    return LineaPendientes(
+        proceso=proceso,
+        operadores=np.asarray(operadores, dtype=object),
+        anios=pd.Index(anios).astype(str).to_numpy(dtype=object),
+        origen=origen,
+        ancho=ancho,
+        claves=claves,
+        acumulado=acumulado
+    )
+
+def reconstruir_historico_pendientes(df: pd.DataFrame, proceso: str, fechas: Iterable) -> pd.DataFrame:
+    """
+    Pendientes de fechas pasadas en el formato del histórico
+
+    Args:
+        df: Consolidado del proceso
+        proceso: Tipo de proceso ('CCM' o 'PRR')
+        fechas: Fechas a reconstruir
+
+    Returns:
+        DataFrame con Fecha, Proceso, OPERADOR, Año y Pendientes
+    """
+    return linea_pendientes(df, proceso).historico(fechas)
+
+@perfilar
+@metrica_historico('pendientes')
+def completar_historico_pendientes(consolidados: Dict[str, pd.DataFrame], desde, hasta=None,
+                                   ruta: str = RUTA_HISTORICO_PENDIENTES) -> int:
+    """
+    Rellena las fechas que faltan en el histórico de pendientes con la reconstrucción
+
+    Las fechas que ya tienen registros de un proceso no se tocan: la foto
+    tomada ese día es más fiel que la reconstrucción.
+
+    Args:
+        consolidados: Consolidado de cada proceso ('CCM', 'PRR')
+        desde: Primera fecha a completar
+        hasta: Última fecha a completar (por defecto, ayer en hora de Lima)
+        ruta: Archivo del histórico
+
+    Returns:
+        Filas agregadas al histórico
+    """
+    if hasta is None:
+        tz = pytz.timezone('America/Lima')
+        hasta = datetime.datetime.now(tz).date() - datetime.timedelta(days=1)
+    calendario = pd.date_range(pd.Timestamp(desde).normalize(), pd.Timestamp(hasta).normalize())
+
+    try:
+        historico = pd.read_csv(ruta, dtype=str)
+    except FileNotFoundError:
+        historico = pd.DataFrame(columns=COLUMNAS_HISTORICO)
+
+    nuevos = []
+    for proceso, df in consolidados.items():
+        registradas = set(historico.loc[historico['Proceso'] == proceso, 'Fecha'])
+        faltantes = calendario[~calendario.strftime('%Y-%m-%d').isin(registradas)]
+        if len(faltantes):
+            nuevos.append(reconstruir_historico_pendientes(df, proceso, faltantes))
+
+    agregadas = sum(len(n) for n in nuevos)
+    if agregadas:
+        historico = pd.concat([historico, *nuevos], ignore_index=True)
+        historico = historico.sort_values('Fecha', kind='stable')
+        historico.to_csv(ruta, index=False)
+        registrar_escritura_historico('pendientes', len(historico))
+    return agregadas
@@ -0,0 +1,294 @@
+"""
+Módulo de datos sintéticos
+Genera consolidados e históricos con el esquema y las distribuciones de los
+archivos reales, para medir y probar sin los datos de ARCHIVOS/
+
+La generación es determinista: la misma semilla, tamaño y fecha final
+producen siempre el mismo DataFrame.
+"""
+
+import math
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+from modules.data.loader import (
+    ETAPAS_PRR, OPERADORES_EXCLUIR_PENDIENTES, OPERADORES_EXCLUIR_PRODUCCION,
+    obtener_archivos_proceso
+)
+
+# Última fecha de los datos generados (la del histórico real más reciente)
+FECHA_FIN_DEFECTO = pd.Timestamp('2025-05-23')
+
+# Años de expedientes cubiertos por el consolidado
+ANIOS_DEFECTO = 7
+
+# Máximo de filas de datos que admite una hoja de Excel
+MAX_FILAS_EXCEL = 1_048_575
+
+# Etapa de los pendientes CCM y etapas de expedientes ya pretrabajados
+ETAPA_PENDIENTE_CCM = 'EVALUACIÓN - I'
+ETAPAS_POSTERIORES = [
+    'EVALUACIÓN - F',
+    'CONFORMIDAD SUB-DIREC.INMGRA. - F',
+    'NOTIFICACIÓN - I',
+    'NOTIFICACIÓN - F',
+    'ENTREGA DE DOCUMENTO - F'
+]
+
+EQUIPOS = ['EQUIPO 1', 'EQUIPO 2', 'EQUIPO 3', 'EQUIPO 4', 'VULNERABLE']
+PESOS_EQUIPOS = [0.28, 0.26, 0.22, 0.16, 0.08]
+
+ESTADOS_PRE = ['APROBADO', 'DENEGADO', 'OBSERVADO']
+PESOS_ESTADOS_PRE = [0.80, 0.12, 0.08]
+
+ESTADOS_FINALES = ['APROBADO', 'DENEGADO', 'ANULADO']
+PESOS_ESTADOS_FINALES = [0.85, 0.10, 0.05]
+
+# Probabilidades por defecto
+FRACCION_SIN_ASIGNAR = 0.10      # pendientes sin operador
+FRACCION_ESTANCADOS = 0.03       # expedientes que nunca se pretrabajan
+FRACCION_PENDIENTE_TRAS_PRE = 0.15  # pretrabajados aún sin resolución final
+DEMORA_MEDIA_DIAS = 40           # días entre ingreso y pretrabajo
+
+# Peso relativo del ingreso según el día de la semana (lunes a domingo)
+PESOS_DIA_SEMANA = np.array([1.0, 1.0, 1.0, 1.0, 1.0, 0.15, 0.05])
+
+_APELLIDOS = [
+    'QUISPE', 'FLORES', 'SANCHEZ', 'RODRIGUEZ', 'GARCIA', 'ROJAS', 'HUAMAN', 'CHAVEZ',
+    'RAMOS', 'TORRES', 'MENDOZA', 'CASTILLO', 'VARGAS', 'MAMANI', 'ESPINOZA', 'DIAZ',
+    'LOPEZ', 'GONZALES', 'VASQUEZ', 'RAMIREZ', 'CRUZ', 'GUTIERREZ', 'PEREZ', 'SALAZAR'
+]
+_NOMBRES = [
+    'MARIA', 'JOSE', 'LUIS', 'ANA', 'CARLOS', 'ROSA', 'JUAN', 'CARMEN', 'JORGE', 'LUCIA',
+    'MIGUEL', 'ELENA', 'PEDRO', 'SOFIA', 'DIEGO', 'PAOLA', 'RAUL', 'DIANA', 'VICTOR', 'KAREN'
+]
+
+def nombres_operadores(proceso: str, n_operadores: int = 60) -> List[str]:
+    """
+    Nombres de operadores de un proceso, con el formato 'APELLIDO APELLIDO, NOMBRE'
+
+    Dependen solo del proceso, de modo que el consolidado y el histórico
+    generados con distintas semillas comparten operadores.
+
+    Args:
+        proceso: Tipo de proceso ('CCM' o 'PRR')
+        n_operadores: Número de operadores
+
+    Returns:
+        Lista de nombres distintos
+    """
+    r = np.random.default_rng(_indice_proceso(proceso))
+    nombres: List[str] = []
+    vistos = set()
+    while len(nombres) < n_operadores:
+        ap1, ap2 = r.choice(_APELLIDOS, 2, replace=False)
+        nombre = f"{ap1} {ap2}, {r.choice(_NOMBRES)}"
+        if nombre not in vistos:
+            vistos.add(nombre)
+            nombres.append(nombre)
+    return nombres
+
+def _indice_proceso(proceso: str) -> int:
+    return 0 if proceso == 'CCM' else 1
+
+def generar_consolidado(n_filas: int, proceso: str = 'CCM', semilla: int = 0,
+                        fecha_fin: pd.Timestamp = FECHA_FIN_DEFECTO,
+                        anios: int = ANIOS_DEFECTO, n_operadores: int = 60) -> pd.DataFrame:
+    """
+    Genera un consolidado sintético con el esquema del Excel real ya tipado
+
+    Reproduce las reglas que usan las pestañas: los pendientes son los
+    expedientes sin EstadoPre, con EstadoTramite 'PENDIENTE' y en la etapa
+    del proceso; FechaPre y OperadorPre solo existen para los pretrabajados.
+    Los ingresos crecen con los años y se concentran en días hábiles, y la
+    carga por operador es desigual.
+
+    Args:
+        n_filas: Número de expedientes
+        proceso: Tipo de proceso ('CCM' o 'PRR')
+        semilla: Semilla del generador aleatorio
+        fecha_fin: Última fecha de ingreso y de pretrabajo
+        anios: Años de expedientes cubiertos
+        n_operadores: Número de operadores regulares
+
+    Returns:
+        DataFrame con NumeroTramite, UltimaEtapa, EstadoPre, EstadoTramite,
+        EQUIPO, OPERADOR, OperadorPre, Anio, FechaExpendiente y FechaPre
+    """
+    r = np.random.default_rng([semilla, _indice_proceso(proceso)])
+    fecha_fin = pd.Timestamp(fecha_fin).normalize()
+
+    # Ingreso: más expedientes en los años recientes y en días hábiles
+    calendario = pd.date_range(fecha_fin - pd.DateOffset(years=anios) + pd.Timedelta(days=1), fecha_fin)
+    pesos = PESOS_DIA_SEMANA[calendario.dayofweek] * np.linspace(0.5, 1.5, len(calendario))
+    dias_exp = np.sort(r.choice(len(calendario), n_filas, p=pesos / pesos.sum()))
+
+    # Pretrabajo: demora gamma; los que aún no llegan a su fecha siguen pendientes
+    dias_pre = dias_exp + np.rint(r.gamma(2.0, DEMORA_MEDIA_DIAS / 2, n_filas)).astype('int64')
+    # La mayor parte del trabajo que caería en fin de semana pasa a la semana siguiente
+    dia_semana = (calendario[0].dayofweek + dias_pre) % 7
+    al_lunes = np.select([dia_semana == 5, dia_semana == 6], [2, 1], 0)
+    aplazar = (al_lunes > 0) & (r.random(n_filas) < 0.8)
+    dias_pre += np.where(aplazar, al_lunes + r.integers(0, 5, n_filas), 0)
+    trabajado = (dias_pre < len(calendario)) & (r.random(n_filas) >= FRACCION_ESTANCADOS)
+
+    inicio = calendario[0].to_datetime64()
+    fecha_exp = pd.DatetimeIndex(inicio + dias_exp.astype('timedelta64[D]'))
+    fecha_pre = pd.DatetimeIndex(inicio + dias_pre.astype('timedelta64[D]')).where(trabajado)
+
+    # Operadores con carga desigual, más los casos especiales de las reglas
+    operadores = np.array(
+        nombres_operadores(proceso, n_operadores)
+        + OPERADORES_EXCLUIR_PENDIENTES['CCM'][:1] + OPERADORES_EXCLUIR_PRODUCCION,
+        dtype=object
+    )
+    pesos_op = 1 / np.arange(1, len(operadores) + 1) ** 0.6
+    pesos_op[n_operadores:] = pesos_op[n_operadores - 1] * 0.5
+    operador = operadores[r.choice(len(operadores), n_filas, p=pesos_op / pesos_op.sum())]
+    operador[~trabajado & (r.random(n_filas) < FRACCION_SIN_ASIGNAR)] = None
+
+    # Etapa y estados coherentes con el pretrabajo
+    if proceso == 'CCM':
+        etapa_pendiente = np.full(n_filas, ETAPA_PENDIENTE_CCM, dtype=object)
+    else:
+        etapa_pendiente = np.array(ETAPAS_PRR, dtype=object)[r.integers(0, len(ETAPAS_PRR), n_filas)]
+    etapa_otra = np.array(ETAPAS_POSTERIORES, dtype=object)[r.integers(0, len(ETAPAS_POSTERIORES), n_filas)]
+    en_etapa = ~trabajado & (r.random(n_filas) < 0.9)
+    ultima_etapa = np.where(en_etapa, etapa_pendiente, etapa_otra)
+
+    estado_pre = np.where(
+        trabajado, r.choice(np.array(ESTADOS_PRE, dtype=object), n_filas, p=PESOS_ESTADOS_PRE), None
+    )
+    resuelto = trabajado & (r.random(n_filas) >= FRACCION_PENDIENTE_TRAS_PRE)
+    estado_tramite = np.where(
+        resuelto,
+        r.choice(np.array(ESTADOS_FINALES, dtype=object), n_filas, p=PESOS_ESTADOS_FINALES),
+        'PENDIENTE'
+    ).astype(object)
+
+    equipo = np.array(EQUIPOS, dtype=object)[r.choice(len(EQUIPOS), n_filas, p=PESOS_EQUIPOS)]
+    numero = np.array([f"{proceso}-{i:08d}" for i in range(1, n_filas + 1)], dtype=object)
+
+    return pd.DataFrame({
+        'NumeroTramite': numero,
+        'UltimaEtapa': ultima_etapa,
+        'EstadoPre': estado_pre,
+        'EstadoTramite': estado_tramite,
+        'EQUIPO': equipo,
+        'OPERADOR': operador,
+        'OperadorPre': np.where(trabajado, operador, None),
+        'Anio': fecha_exp.year.to_numpy(dtype='int64'),
+        'FechaExpendiente': fecha_exp,
+        'FechaPre': fecha_pre
+    })
+
+def generar_historico_pendientes(n_filas: int, semilla: int = 0,
+                                 fecha_fin: pd.Timestamp = FECHA_FIN_DEFECTO,
+                                 procesos: Sequence[str] = ('CCM', 'PRR'),
+                                 n_operadores: int = 60) -> pd.DataFrame:
+    """
+    Genera un histórico de pendientes por operador con el formato del CSV real
+
+    Hay una foto por día hábil hasta fecha_fin, con una fila por proceso,
+    operador y año (los años anteriores agrupados como 'ANTIGUOS'). Los
+    pendientes de cada combinación siguen un paseo aleatorio, con muchos
+    operadores en cero en los años antiguos.
+
+    Args:
+        n_filas: Número aproximado de filas (se redondea a fotos completas
+            y se recortan las más antiguas)
+        semilla: Semilla del generador aleatorio
+        fecha_fin: Fecha de la foto más reciente
+        procesos: Procesos incluidos
+        n_operadores: Operadores por proceso
+
+    Returns:
+        DataFrame con Fecha, Proceso, OPERADOR, Año y Pendientes
+    """
+    r = np.random.default_rng(semilla)
+    fecha_fin = pd.Timestamp(fecha_fin).normalize()
+    anio_fin = fecha_fin.year
+    anios = ['ANTIGUOS'] + [str(a) for a in range(anio_fin - 3, anio_fin + 1)]
+
+    combinaciones = pd.MultiIndex.from_tuples(
+        [(p, o, a) for p in procesos for o in nombres_operadores(p, n_operadores) for a in anios],
+        names=['Proceso', 'OPERADOR', 'Año']
+    )
+    n_fechas = max(1, math.ceil(n_filas / len(combinaciones)))
+    fechas = pd.bdate_range(end=fecha_fin, periods=n_fechas)
+
+    # Nivel inicial: más carga en el año en curso y en los operadores principales
+    peso_anio = np.array([0.3, 0.5, 0.8, 1.0, 1.4])[
+        pd.Index(anios).get_indexer(combinaciones.get_level_values('Año'))
+    ]
+    nivel = r.gamma(0.8, 120, len(combinaciones)) * peso_anio
+    nivel[r.random(len(combinaciones)) < 0.25] = 0
+
+    variacion = r.normal(0, 0.03, (n_fechas, len(combinaciones))).cumsum(axis=0)
+    pendientes = np.rint(np.clip(nivel * (1 + variacion), 0, None)).astype('int64')
+
+    historico = pd.DataFrame({
+        'Fecha': np.repeat(fechas.strftime('%Y-%m-%d').to_numpy(), len(combinaciones)),
+        'Proceso': np.tile(combinaciones.get_level_values('Proceso').to_numpy(), n_fechas),
+        'OPERADOR': np.tile(combinaciones.get_level_values('OPERADOR').to_numpy(), n_fechas),
+        'Año': np.tile(combinaciones.get_level_values('Año').to_numpy(), n_fechas),
+        'Pendientes': pendientes.ravel()
+    })
+    return historico.iloc[len(historico) - min(n_filas, len(historico)):].reset_index(drop=True)
+
+def generar_historico_sin_asignar(dias: int = 90, semilla: int = 0,
+                                  fecha_fin: pd.Timestamp = FECHA_FIN_DEFECTO) -> pd.DataFrame:
+    """
+    Genera un histórico de casos sin asignar con el formato del CSV real
+
+    Args:
+        dias: Días con registro (el archivo real conserva los últimos 90)
+        semilla: Semilla del generador aleatorio
+        fecha_fin: Fecha del registro más reciente
+
+    Returns:
+        DataFrame con fecha, proceso y sin_asignar
+    """
+    r = np.random.default_rng(semilla)
+    fechas = pd.date_range(end=pd.Timestamp(fecha_fin).normalize(), periods=dias).strftime('%Y-%m-%d')
+    registros = []
+    for proceso, base in (('CCM', 800), ('PRR', 1000)):
+        valores = np.rint(base * (1 + r.normal(0, 0.02, dias).cumsum())).clip(0).astype('int64')
+        registros.append(pd.DataFrame({'fecha': fechas, 'proceso': proceso, 'sin_asignar': valores}))
+    return pd.concat(registros, ignore_index=True).sort_values(['fecha', 'proceso'], ignore_index=True)
+
+def escribir_datos_sinteticos(directorio: str, n_filas: int,
+                              n_filas_historico: Optional[int] = None,
+                              semilla: int = 0) -> Dict[str, Path]:
+    """
+    Escribe un juego completo de archivos sintéticos con los nombres de ARCHIVOS/
+
+    Args:
+        directorio: Directorio de destino (hace las veces de ARCHIVOS/)
+        n_filas: Expedientes por consolidado (como máximo MAX_FILAS_EXCEL)
+        n_filas_historico: Filas del histórico de pendientes (por defecto n_filas)
+        semilla: Semilla del generador aleatorio
+
+    Returns:
+        Diccionario nombre lógico -> ruta escrita
+    """
+    if n_filas > MAX_FILAS_EXCEL:
+        raise ValueError(f"Un consolidado en Excel admite como máximo {MAX_FILAS_EXCEL:,} filas")
+
+    destino = Path(directorio)
+    destino.mkdir(parents=True, exist_ok=True)
+    rutas: Dict[str, Path] = {}
+
+    for i, (proceso, archivo) in enumerate(obtener_archivos_proceso().items()):
+        rutas[proceso] = destino / archivo
+        generar_consolidado(n_filas, proceso, semilla + i).to_excel(rutas[proceso], index=False)
+
+    rutas['historico_pendientes'] = destino / 'historico_pendientes_operador.csv'
+    generar_historico_pendientes(n_filas_historico or n_filas, semilla).to_csv(
+        rutas['historico_pendientes'], index=False
+    )
+    rutas['historico_sin_asignar'] = destino / 'historico_sin_asignar.csv'
+    generar_historico_sin_asignar(semilla=semilla).to_csv(rutas['historico_sin_asignar'], index=False)
+
+    return rutas
@@ -0,0 +1,347 @@
+"""
+Módulo de snapshots materializados
+Resultados de todas las pestañas calculados de antemano (genera_snapshots.py)
+y servidos en modo de solo lectura sin volver a leer el consolidado
+
+Cada snapshot es un directorio versionado con un manifest.json y una tabla
+Arrow IPC por cada DataFrame de cada resultado; los valores escalares van en
+el manifiesto. El archivo ACTUAL apunta a la versión vigente y se reemplaza de
+forma atómica cuando termina una construcción, de modo que el dashboard nunca
+lee un snapshot a medias.
+
+No confundir con el snapshot diario del histórico de pendientes
+(registrar_snapshot_pendientes), que es una fila por operador en el CSV.
+"""
+
+import functools
+import hashlib
+import json
+import os
+import shutil
+import threading
+from contextlib import contextmanager
+from dataclasses import fields, is_dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc as ipc
+
+from modules.data.loader import cargar_datos, obtener_archivos_proceso, huella_archivo
+from modules.utils.cache import marcar_huella
+
+# Cambiarlo invalida los snapshots existentes (cambios del formato en disco)
+FORMATO_SNAPSHOT = 1
+
+DIRECTORIO_DEFECTO = 'snapshots'
+ARCHIVO_ACTUAL = 'ACTUAL'
+MANIFIESTO = 'manifest.json'
+EXTENSION_TABLA = '.arrow'
+VERSIONES_CONSERVADAS = 3
+
+class Snapshot:
+    """
+    Snapshot materializado de solo lectura
+
+    Las tablas se leen del disco la primera vez que se piden y quedan
+    marcadas con una huella estable, para que la memoización y las
+    descargas no tengan que hashearlas.
+    """
+
+    def __init__(self, directorio: Path, manifiesto: Dict[str, Any]):
+        self.directorio = directorio
+        self.manifiesto = manifiesto
+        self.version: str = manifiesto['version']
+        self._campos: Dict[str, Optional[Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def creado(self) -> datetime:
+        return datetime.fromisoformat(self.manifiesto['creado'])
+
+    def claves(self) -> List[str]:
+        """
+        Claves de los artefactos del snapshot (por ejemplo CCM/pendientes)
+        """
+        return list(self.manifiesto['artefactos'])
+
+    def obtener(self, clave: str) -> Tuple[bool, Optional[Dict[str, Any]]]:
+        """
+        Busca un artefacto del snapshot
+
+        Args:
+            clave: Clave del artefacto
+
+        Returns:
+            Tupla (encontrado, campos); campos es None si el resultado
+            materializado era None
+        """
+        descripcion = self.manifiesto['artefactos'].get(clave, False)
+        if descripcion is False:
+            return False, None
+        with self._lock:
+            if clave not in self._campos:
+                try:
+                    self._campos[clave] = self._leer_artefacto(clave, descripcion)
+                except (OSError, pa.ArrowException):
+                    # Versión podada o dañada: se calcula en vivo
+                    return False, None
+            return True, self._campos[clave]
+
+    def huella(self, clave: str, campo: str) -> str:
+        """
+        Huella con la que queda marcada una tabla del snapshot
+        """
+        return f"snapshot:{self.version}/{clave}/{campo}"
+
+    def entradas_modificadas(self) -> List[str]:
+        """
+        Archivos de entrada que cambiaron desde que se construyó el snapshot
+
+        Returns:
+            Rutas cuya huella actual no coincide con la del manifiesto
+        """
+        return [
+            ruta for ruta, huella in self.manifiesto['entradas'].items()
+            if _huella_o_ausente(ruta) != huella
+        ]
+
+    def _leer_artefacto(self, clave: str, descripcion: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        if descripcion is None:
+            return None
+        campos = {}
+        for campo, valor in descripcion.items():
+            if 'tabla' in valor:
+                tabla = _leer_tabla(self.directorio / valor['tabla'], valor)
+                campos[campo] = marcar_huella(tabla, self.huella(clave, campo))
+            else:
+                campos[campo] = valor['valor']
+        return campos
+
+def directorio_snapshots() -> Optional[Path]:
+    """
+    Directorio de snapshots del modo de solo lectura (DASHBOARD_SNAPSHOTS)
+
+    Returns:
+        Ruta configurada, o None si el modo snapshot está desactivado
+    """
+    directorio = os.environ.get('DASHBOARD_SNAPSHOTS')
+    return Path(directorio) if directorio else None
+
+def modo_snapshot() -> bool:
+    """
+    Indica si el dashboard sirve los resultados desde snapshots
+    """
+    return directorio_snapshots() is not None
+
+def snapshot_activo() -> Optional[Snapshot]:
+    """
+    Snapshot vigente del modo de solo lectura
+
+    Relee el puntero ACTUAL en cada llamada (un stat) y solo carga el
+    manifiesto cuando cambia, de modo que una construcción nueva se sirve
+    sin reiniciar el dashboard.
+
+    Returns:
+        Snapshot vigente, o None si el modo está desactivado o no hay un
+        snapshot válido (en ese caso se calcula en vivo)
+    """
+    global _activo
+    directorio = directorio_snapshots()
+    if directorio is None or _en_vivo:
+        return None
+    puntero = directorio / ARCHIVO_ACTUAL
+    try:
+        firma = (str(directorio.resolve()), puntero.stat().st_mtime_ns)
+    except OSError:
+        return None
+    with _lock_activo:
+        if _activo is None or _activo[0] != firma:
+            _activo = (firma, cargar_snapshot(directorio))
+        return _activo[1]
+
+def cargar_snapshot(directorio: Path, version: Optional[str] = None) -> Optional[Snapshot]:
+    """
+    Abre un snapshot de un directorio
+
+    Args:
+        directorio: Directorio de snapshots
+        version: Versión a abrir (por defecto la que indica ACTUAL)
+
+    Returns:
+        Snapshot, o None si no existe o su formato no es el actual
+    """
+    try:
+        if version is None:
+            version = (directorio / ARCHIVO_ACTUAL).read_text(encoding='utf-8').strip()
+        manifiesto = json.loads((directorio / version / MANIFIESTO).read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return None
+    if manifiesto.get('formato') != FORMATO_SNAPSHOT:
+        return None
+    return Snapshot(directorio / version, manifiesto)
+
+def escribir_snapshot(directorio: Path, artefactos: Dict[str, Any], huellas: Dict[str, str],
+                      conservar: int = VERSIONES_CONSERVADAS) -> Snapshot:
+    """
+    Escribe un snapshot nuevo y lo marca como vigente
+
+    Args:
+        directorio: Directorio de snapshots
+        artefactos: Clave -> resultado (dataclass con DataFrames y escalares, o None)
+        huellas: Huella de cada archivo de entrada, tomada antes de leerlos
+            (huellas_entradas)
+        conservar: Versiones a mantener en el directorio (incluida la nueva)
+
+    Returns:
+        Snapshot escrito
+    """
+    creado = datetime.now()
+    resumen = hashlib.blake2b(json.dumps(huellas, sort_keys=True).encode(), digest_size=4).hexdigest()
+    version = f"{creado:%Y%m%d-%H%M%S}-{resumen}"
+
+    temporal = directorio / f".{version}.{os.getpid()}.tmp"
+    temporal.mkdir(parents=True)
+    try:
+        descripciones = {}
+        for n, (clave, resultado) in enumerate(sorted(artefactos.items())):
+            descripciones[clave] = _escribir_artefacto(temporal, f"{n:03d}", resultado)
+        manifiesto = {
+            'formato': FORMATO_SNAPSHOT,
+            'version': version,
+            'creado': creado.isoformat(timespec='seconds'),
+            'entradas': huellas,
+            'artefactos': descripciones
+        }
+        (temporal / MANIFIESTO).write_text(json.dumps(manifiesto, ensure_ascii=False, indent=1), encoding='utf-8')
+        os.replace(temporal, directorio / version)
+    except BaseException:
+        shutil.rmtree(temporal, ignore_errors=True)
+        raise
+
+    puntero = directorio / f".{ARCHIVO_ACTUAL}.{os.getpid()}.tmp"
+    puntero.write_text(version, encoding='utf-8')
+    os.replace(puntero, directorio / ARCHIVO_ACTUAL)
+    _podar_versiones(directorio, conservar)
+    return Snapshot(directorio / version, manifiesto)
+
+def huellas_entradas(entradas: List[str]) -> Dict[str, str]:
+    """
+    Huella actual de cada archivo de entrada (tamaño y fecha de modificación)
+    """
+    return {ruta: _huella_o_ausente(ruta) for ruta in entradas}
+
+@contextmanager
+def calculo_en_vivo() -> Iterator[None]:
+    """
+    Context manager que ignora los snapshots mientras dura (para construirlos)
+    """
+    global _en_vivo
+    with _lock_activo:
+        _en_vivo += 1
+    try:
+        yield
+    finally:
+        with _lock_activo:
+            _en_vivo -= 1
+
+def datos_proceso(df: Optional[pd.DataFrame], proceso: str) -> pd.DataFrame:
+    """
+    Consolidado del proceso: el recibido o, en modo snapshot (donde las
+    vistas no lo cargan), el leído del disco cuando un cálculo no está
+    materializado
+
+    Args:
+        df: DataFrame del proceso, o None
+        proceso: Tipo de proceso ('CCM' o 'PRR')
+    """
+    if df is not None:
+        return df
+    return cargar_datos(obtener_archivos_proceso()[proceso])
+
+def desde_snapshot(artefacto: str, tipo: type) -> Callable:
+    """
+    Decorador para los cálculos (df, proceso) -> resultado del núcleo que
+    devuelve el resultado materializado cuando hay un snapshot activo
+
+    Sin snapshot, o si el snapshot no tiene el artefacto, calcula en vivo
+    (cargando el consolidado si se recibió None).
+
+    Args:
+        artefacto: Nombre del artefacto (la clave es proceso/artefacto)
+        tipo: Clase del resultado, que se reconstruye con sus campos
+    """
+    def decorador(f: Callable) -> Callable:
+        @functools.wraps(f)
+        def envoltura(df: Optional[pd.DataFrame], proceso: str):
+            snapshot = snapshot_activo()
+            if snapshot is not None:
+                encontrado, campos = snapshot.obtener(f"{proceso}/{artefacto}")
+                if encontrado:
+                    return tipo(**campos) if campos is not None else None
+            return f(datos_proceso(df, proceso), proceso)
+        return envoltura
+    return decorador
+
+_activo: Optional[Tuple[Tuple[str, int], Optional[Snapshot]]] = None
+_en_vivo = 0
+_lock_activo = threading.Lock()
+
+def _huella_o_ausente(ruta: str) -> str:
+    return huella_archivo(ruta) if os.path.exists(ruta) else 'ausente'
+
+def _escribir_artefacto(carpeta: Path, prefijo: str, resultado: Any) -> Optional[Dict[str, Any]]:
+    if resultado is None:
+        return None
+    if not is_dataclass(resultado):
+        raise TypeError(f"Solo se materializan dataclasses, no {type(resultado).__name__}")
+    descripcion = {}
+    for campo in fields(resultado):
+        valor = getattr(resultado, campo.name)
+        if isinstance(valor, pd.DataFrame):
+            nombre = f"{prefijo}_{campo.name}{EXTENSION_TABLA}"
+            descripcion[campo.name] = {'tabla': nombre, **_escribir_tabla(carpeta / nombre, valor)}
+        else:
+            descripcion[campo.name] = {'valor': _escalar(valor)}
+    return descripcion
+
+def _escribir_tabla(ruta: Path, df: pd.DataFrame) -> Dict[str, Any]:
+    """
+    Escribe un DataFrame como Arrow IPC y devuelve lo necesario para
+    restaurar las etiquetas que Arrow no conserva (columnas no textuales)
+    """
+    copia = df.copy(deep=False)
+    copia.columns = [str(c) for c in df.columns]
+    tabla = pa.Table.from_pandas(copia, preserve_index=True)
+    with ipc.new_file(str(ruta), tabla.schema) as escritor:
+        escritor.write_table(tabla)
+    return {
+        'columnas': [_escalar(c) for c in df.columns],
+        'nombre_columnas': _escalar(df.columns.name)
+    }
+
+def _leer_tabla(ruta: Path, descripcion: Dict[str, Any]) -> pd.DataFrame:
+    with pa.memory_map(str(ruta)) as origen:
+        df = ipc.open_file(origen).read_all().to_pandas()
+    df.columns = pd.Index(descripcion['columnas'], name=descripcion['nombre_columnas'])
+    return df
+
+def _escalar(valor: Any) -> Any:
+    """Convierte escalares de numpy a tipos de JSON (el resto, a texto si no lo es)"""
+    if hasattr(valor, 'item') and not isinstance(valor, (list, dict)):
+        valor = valor.item()
+    if isinstance(valor, (list, tuple)):
+        return [_escalar(v) for v in valor]
+    if valor is None or isinstance(valor, (bool, int, float, str)):
+        return valor
+    return str(valor)
+
+def _podar_versiones(directorio: Path, conservar: int) -> None:
+    versiones = sorted(
+        (d for d in directorio.iterdir() if d.is_dir() and not d.name.startswith('.')),
+        key=lambda d: d.name
+    )
+    for viejo in versiones[:-conservar] if conservar > 0 else []:
+        shutil.rmtree(viejo, ignore_errors=True)
@@ -4,7 +4,9 @@ Módulo para análisis y cálculos de eficiencia
 
 import pandas as pd
 import numpy as np
-from typing import List, Dict, Any
+from typing import Dict, Any
+from modules.data.operadores import SIN_OPERADOR, canonizar, ids_operador, obtener_dimension
+from modules.utils.cache import memoizar
 
 def calcular_eficiencia_v2(row: pd.Series) -> str:
     """
@@ -41,18 +43,22 @@ def calcular_eficiencia_v2(row: pd.Series) -> str:
     else:  # No produce o produce muy poco y los pendientes aumentan o no bajan
         return 'Baja'
 
-def resaltar_criticos(row: pd.Series) -> List[str]:
+def colores_criticos(evolucion: pd.DataFrame) -> pd.Series:
     """
-    Resalta en rojo los operadores en observación
+    Color de fondo por operador: rojo para los operadores en observación
+    
+    Vectorizada, para usar sobre la página visible
     
     Args:
-        row: Serie con los datos del operador
+        evolucion: DataFrame con la columna 'Eficiencia'
         
     Returns:
-        Lista de estilos CSS para cada columna
+        Serie con el color de cada fila ('' sin color)
     """
-    color = 'red' if row['Eficiencia'] == 'En Observación' else ''
-    return [f'background-color: {color}'] * len(row)
+    return pd.Series(
+        np.where(evolucion['Eficiencia'] == 'En Observación', 'red', ''),
+        index=evolucion.index
+    )
 
 def calcular_cambio_porcentual(row: pd.Series) -> float:
     """
@@ -69,6 +75,7 @@ def calcular_cambio_porcentual(row: pd.Series) -> float:
     else:
         return np.sign(row['Cambio']) * 100.0 if row['Cambio'] != 0 else 0.0
 
+@memoizar
 def procesar_evolucion_pendientes(pendientes_long: pd.DataFrame, prod_promedio: pd.DataFrame, 
                                 col_operador: str) -> pd.DataFrame:
     """
@@ -83,30 +90,32 @@ def procesar_evolucion_pendientes(pendientes_long: pd.DataFrame, prod_promedio:
         DataFrame con métricas de evolución calculadas
     """
     # Agrupar por operador y calcular métricas de pendientes
-    evolucion = pendientes_long.groupby('OPERADOR_NORM').agg({
-        'Pendientes': ['first', 'last', 'count']
-    }).reset_index()
+    evolucion = pendientes_long.groupby('OPERADOR_NORM').agg(
+        ID_OPERADOR=('ID_OPERADOR', 'first'),
+        Pendientes_Inicial=('Pendientes', 'first'),
+        Pendientes_Final=('Pendientes', 'last'),
+        Dias=('Pendientes', 'count')
+    ).reset_index()
     
-    evolucion.columns = ['OPERADOR_NORM', 'Pendientes_Inicial', 'Pendientes_Final', 'Dias']
     evolucion['Cambio'] = evolucion['Pendientes_Final'] - evolucion['Pendientes_Inicial']
     
     # Calcular cambio porcentual evitando inf
     evolucion['Cambio_Porcentual'] = evolucion.apply(calcular_cambio_porcentual, axis=1)
     evolucion['Tendencia_Diaria'] = (evolucion['Cambio'] / evolucion['Dias']).round(2)
     
-    # Unir métricas de pendientes con producción
+    # Unir métricas de pendientes con producción por ID de operador
     evolucion = evolucion.merge(
-        prod_promedio,
-        left_on='OPERADOR_NORM',
-        right_on=col_operador,
+        prod_promedio.drop(columns=[col_operador]),
+        on='ID_OPERADOR',
         how='left'
-    ).drop(columns=[col_operador])
+    ).drop(columns=['ID_OPERADOR'])
     
     # Calcular eficiencia
     evolucion['Eficiencia'] = evolucion.apply(calcular_eficiencia_v2, axis=1)
     
     return evolucion
 
+@memoizar
 def procesar_datos_produccion(df: pd.DataFrame, cols_periodo: pd.Index, 
                             col_operador: str, col_fecha: str, col_tramite: str) -> pd.DataFrame:
     """
@@ -120,7 +129,7 @@ def procesar_datos_produccion(df: pd.DataFrame, cols_periodo: pd.Index,
         col_tramite: Nombre de la columna de trámite
         
     Returns:
-        DataFrame con producción promedio por operador
+        DataFrame con producción promedio por operador (ID y nombre canónico)
     """
     # Convertir fechas a datetime si no lo son
     if not pd.api.types.is_datetime64_any_dtype(df[col_fecha]):
@@ -131,22 +140,25 @@ def procesar_datos_produccion(df: pd.DataFrame, cols_periodo: pd.Index,
     fecha_max = pd.to_datetime(cols_periodo[-1])
     df_prod = df[(df[col_fecha] >= fecha_min) & (df[col_fecha] <= fecha_max)]
     
-    # Calcular producción diaria por operador SOLO para el periodo seleccionado
+    # Calcular producción diaria por operador SOLO para el periodo seleccionado,
+    # agrupando por ID para unir las distintas grafías de un mismo operador
     fechas_periodo = set([str(f) for f in cols_periodo])
-    prod_diaria = df_prod.groupby([col_operador, col_fecha])[col_tramite].count().reset_index()
-    prod_diaria[col_operador] = prod_diaria[col_operador].str.strip().str.upper()
+    id_operador = pd.Series(ids_operador(df_prod[col_operador]), index=df_prod.index, name='ID_OPERADOR')
+    prod_diaria = df_prod.groupby([id_operador, col_fecha])[col_tramite].count().reset_index()
+    prod_diaria = prod_diaria[prod_diaria['ID_OPERADOR'] != SIN_OPERADOR]
     prod_diaria[col_fecha] = prod_diaria[col_fecha].dt.strftime('%Y-%m-%d')
     
     # Filtrar solo fechas del periodo seleccionado
     prod_diaria = prod_diaria[prod_diaria[col_fecha].isin(fechas_periodo)]
     
     # Calcular producción promedio y días de producción solo en el periodo
-    prod_promedio = prod_diaria.groupby(col_operador)[col_tramite].agg(['mean', 'count']).reset_index()
-    prod_promedio.columns = [col_operador, 'Produccion_Promedio', 'Dias_Produccion']
-    prod_promedio[col_operador] = prod_promedio[col_operador].str.strip().str.upper()
+    prod_promedio = prod_diaria.groupby('ID_OPERADOR')[col_tramite].agg(['mean', 'count']).reset_index()
+    prod_promedio.columns = ['ID_OPERADOR', 'Produccion_Promedio', 'Dias_Produccion']
+    prod_promedio.insert(1, col_operador, obtener_dimension().nombres(prod_promedio['ID_OPERADOR']))
     
     return prod_promedio
 
+@memoizar
 def preparar_tabla_operadores_periodo(tabla_operadores: pd.DataFrame, periodo_sel: Any, 
                                     cols_periodo: pd.Index) -> pd.DataFrame:
     """
@@ -181,13 +193,15 @@ def preparar_tabla_operadores_periodo(tabla_operadores: pd.DataFrame, periodo_se
     )
     
     # Normalizar operador y fecha
-    pendientes_long['OPERADOR_NORM'] = pendientes_long['OPERADOR'].str.strip().str.upper()
+    pendientes_long['OPERADOR_NORM'] = canonizar(pendientes_long['OPERADOR'])
+    pendientes_long['ID_OPERADOR'] = ids_operador(pendientes_long['OPERADOR'])
     pendientes_long['Fecha'] = pd.to_datetime(
         pendientes_long['Fecha'], errors='coerce'
     ).dt.strftime('%Y-%m-%d')
     
     return pendientes_long
 
+@memoizar
 def agrupar_anios_antiguos(historico: pd.DataFrame) -> pd.DataFrame:
     """
     Agrupa años menores a 2024 como 'ANTIGUOS'
@@ -0,0 +1,298 @@
+"""
+Módulo de caché para artefactos derivados
+Memoiza las funciones de cálculo puras según la huella del dataset y los parámetros
+
+A diferencia de st.cache_data, los DataFrames no se vuelven a hashear en cada
+rerun (se usa la huella registrada al cargarlos) ni se copian al devolverlos,
+por lo que los resultados memoizados deben tratarse como de solo lectura.
+"""
+
+import functools
+import hashlib
+import os
+import sys
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass, fields, is_dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from modules.utils.cache_disco import cargar_artefacto, guardar_artefacto
+from modules.utils.perfilado import anotar_cache, perfilar
+
+# Configuración por defecto (sobrescribible por variables de entorno)
+PRESUPUESTO_MB_DEFECTO = 512
+TTL_SEGUNDOS_DEFECTO = 6 * 60 * 60
+
+@dataclass
+class _Entrada:
+    valor: Any
+    tamano: int
+    creado: float
+    origen: str = ''
+
+class CacheDerivados:
+    """
+    Caché en memoria con presupuesto de bytes, expulsión LRU y expiración por TTL
+    """
+
+    def __init__(self, presupuesto_bytes: int, ttl_segundos: Optional[float]):
+        self.presupuesto_bytes = presupuesto_bytes
+        self.ttl_segundos = ttl_segundos
+        self._entradas: "OrderedDict[str, _Entrada]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.RLock()
+        self.aciertos = 0
+        self.fallos = 0
+        self.expulsiones = 0
+
+    def obtener(self, clave: str) -> Tuple[bool, Any]:
+        """
+        Busca una clave en la caché
+
+        Returns:
+            Tupla (encontrado, valor)
+        """
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is not None and self._expirada(entrada):
+                self._quitar(clave)
+                entrada = None
+            if entrada is None:
+                self.fallos += 1
+                return False, None
+            self._entradas.move_to_end(clave)
+            self.aciertos += 1
+            return True, entrada.valor
+
+    def guardar(self, clave: str, valor: Any, origen: str = '') -> None:
+        """
+        Guarda un valor y expulsa las entradas menos usadas si se supera el presupuesto
+
+        Args:
+            clave: Clave del valor
+            valor: Valor a guardar
+            origen: Función que produjo el valor (para los informes de memoria)
+        """
+        tamano = estimar_tamano(valor)
+        if tamano > self.presupuesto_bytes:
+            return
+        with self._lock:
+            if clave in self._entradas:
+                self._quitar(clave)
+            self._entradas[clave] = _Entrada(valor, tamano, time.monotonic(), origen)
+            self._bytes += tamano
+            while self._bytes > self.presupuesto_bytes and self._entradas:
+                self._quitar(next(iter(self._entradas)))
+                self.expulsiones += 1
+
+    def limpiar(self) -> None:
+        """
+        Vacía la caché y reinicia los contadores
+        """
+        with self._lock:
+            self._entradas.clear()
+            self._bytes = 0
+            self.aciertos = self.fallos = self.expulsiones = 0
+
+    def estadisticas(self) -> Dict[str, Any]:
+        """
+        Retorna los contadores de uso de la caché
+        """
+        with self._lock:
+            consultas = self.aciertos + self.fallos
+            return {
+                'aciertos': self.aciertos,
+                'fallos': self.fallos,
+                'tasa_aciertos': self.aciertos / consultas if consultas > 0 else 0.0,
+                'expulsiones': self.expulsiones,
+                'entradas': len(self._entradas),
+                'bytes': self._bytes,
+                'presupuesto_bytes': self.presupuesto_bytes
+            }
+
+    def entradas(self) -> List[Tuple[str, str, Any, int]]:
+        """
+        Retorna una copia de las entradas vigentes como (clave, origen, valor, tamaño)
+        """
+        with self._lock:
+            return [(clave, e.origen, e.valor, e.tamano) for clave, e in self._entradas.items()]
+
+    def _expirada(self, entrada: _Entrada) -> bool:
+        return self.ttl_segundos is not None and time.monotonic() - entrada.creado > self.ttl_segundos
+
+    def _quitar(self, clave: str) -> None:
+        entrada = self._entradas.pop(clave)
+        self._bytes -= entrada.tamano
+
+def _crear_cache_desde_entorno() -> CacheDerivados:
+    presupuesto_mb = float(os.environ.get('DASHBOARD_CACHE_MB', PRESUPUESTO_MB_DEFECTO))
+    ttl = float(os.environ.get('DASHBOARD_CACHE_TTL', TTL_SEGUNDOS_DEFECTO))
+    return CacheDerivados(int(presupuesto_mb * 1024 * 1024), ttl if ttl > 0 else None)
+
+_CACHE = _crear_cache_desde_entorno()
+
+def obtener_cache() -> CacheDerivados:
+    """
+    Retorna la caché de artefactos derivados compartida por la aplicación
+    """
+    return _CACHE
+
+def marcar_huella(objeto: Any, huella: str) -> Any:
+    """
+    Registra la huella de un DataFrame o Series para no tener que hashearlo
+
+    La huella solo es válida para el objeto exacto que se marca: las copias y
+    los filtros derivados se vuelven a hashear. El registro guarda una
+    referencia débil al objeto, de modo que otro objeto creado después en la
+    misma dirección de memoria no hereda la huella.
+
+    Args:
+        objeto: DataFrame o Series a marcar
+        huella: Identificador del contenido (por ejemplo, de su archivo de origen)
+
+    Returns:
+        El mismo objeto, para poder encadenar
+    """
+    if isinstance(objeto, (pd.DataFrame, pd.Series)):
+        identificador = id(objeto)
+        referencia = weakref.ref(objeto, functools.partial(_olvidar_huella, identificador))
+        _huellas[identificador] = (referencia, huella)
+    return objeto
+
+def huella_dataframe(objeto: Any) -> str:
+    """
+    Calcula la huella de un DataFrame o Series
+
+    Usa la huella registrada con marcar_huella si existe; en otro caso
+    hashea el contenido y lo registra.
+
+    Args:
+        objeto: DataFrame o Series
+
+    Returns:
+        Huella hexadecimal del contenido
+    """
+    registrada = _huellas.get(id(objeto))
+    if registrada is not None and registrada[0]() is objeto:
+        return registrada[1]
+
+    h = hashlib.blake2b(digest_size=16)
+    h.update(pd.util.hash_pandas_object(objeto, index=True).to_numpy().tobytes())
+    if isinstance(objeto, pd.DataFrame):
+        h.update(repr(list(objeto.columns)).encode())
+        h.update(repr(list(objeto.dtypes.astype(str))).encode())
+    else:
+        h.update(repr((objeto.name, str(objeto.dtype))).encode())
+    huella = h.hexdigest()
+    marcar_huella(objeto, huella)
+    return huella
+
+# Huellas registradas: id del objeto -> (referencia débil, huella)
+# (sin lock: el callback puede correr durante la recolección de basura en
+# cualquier hilo, y una entrada perdida solo obliga a volver a hashear)
+_huellas: Dict[int, Tuple[weakref.ref, str]] = {}
+
+def _olvidar_huella(identificador: int, referencia: weakref.ref) -> None:
+    """Quita la huella de un objeto liberado (si no se registró otro en su lugar)"""
+    if _huellas.get(identificador, (None,))[0] is referencia:
+        _huellas.pop(identificador, None)
+
+def _es_figura(valor: Any) -> bool:
+    """Indica si el valor es una figura de plotly (sin importar plotly si nadie lo hizo)"""
+    plotly = sys.modules.get('plotly.basedatatypes')
+    return plotly is not None and isinstance(valor, plotly.BaseFigure)
+
+def _huella_argumento(valor: Any) -> str:
+    if isinstance(valor, (pd.DataFrame, pd.Series)):
+        return 'df:' + huella_dataframe(valor)
+    if isinstance(valor, pd.Index):
+        return 'idx:' + repr(valor.tolist())
+    if isinstance(valor, np.ndarray):
+        return 'np:' + hashlib.blake2b(valor.tobytes(), digest_size=16).hexdigest()
+    if isinstance(valor, (list, tuple)):
+        return '[' + ','.join(_huella_argumento(v) for v in valor) + ']'
+    if isinstance(valor, dict):
+        return '{' + ','.join(f"{k!r}:{_huella_argumento(v)}" for k, v in sorted(valor.items())) + '}'
+    return repr(valor)
+
+def construir_clave(nombre: str, args: tuple, kwargs: dict) -> str:
+    """
+    Construye la clave de caché (función, huellas de datasets, parámetros)
+    """
+    partes = [nombre]
+    partes.extend(_huella_argumento(a) for a in args)
+    partes.extend(f"{k}={_huella_argumento(v)}" for k, v in sorted(kwargs.items()))
+    return hashlib.blake2b('|'.join(partes).encode(), digest_size=16).hexdigest()
+
+def estimar_tamano(valor: Any) -> int:
+    """
+    Estima el tamaño en memoria de un valor cacheado
+    """
+    if isinstance(valor, pd.DataFrame):
+        return int(valor.memory_usage(deep=True, index=True).sum())
+    if isinstance(valor, (pd.Series, pd.Index)):
+        return int(valor.memory_usage(deep=True))
+    if isinstance(valor, np.ndarray):
+        return int(valor.nbytes)
+    if _es_figura(valor):
+        # Lo que ocupa el JSON que se envía al navegador (los arrays de las
+        # trazas dominan y sys.getsizeof no los ve)
+        return len(valor.to_json())
+    if is_dataclass(valor) and not isinstance(valor, type):
+        return sys.getsizeof(valor) + sum(estimar_tamano(getattr(valor, f.name)) for f in fields(valor))
+    if isinstance(valor, dict):
+        return sys.getsizeof(valor) + sum(estimar_tamano(v) for v in valor.values())
+    if isinstance(valor, (list, tuple)):
+        return sys.getsizeof(valor) + sum(estimar_tamano(v) for v in valor)
+    return sys.getsizeof(valor)
+
+def memoizar(funcion: Optional[Callable] = None, *, nombre: Optional[str] = None,
+             persistente: bool = False) -> Callable:
+    """
+    Decorador que memoiza una función pura en la caché de artefactos derivados
+
+    La clave combina el nombre de la función, la huella de cada DataFrame o
+    Series recibido y la representación del resto de parámetros. Los
+    DataFrames devueltos quedan marcados con la huella de su clave, de modo
+    que las funciones memoizadas encadenadas no vuelven a hashearlos.
+
+    Con el perfilado activo, cada llamada se mide como un tramo que anota
+    si el resultado salió de la caché.
+
+    Args:
+        funcion: Función a memoizar
+        nombre: Nombre lógico para la clave (por defecto módulo.función)
+        persistente: Si es True, el resultado también se guarda en la caché
+            en disco y se rehidrata desde allí tras un reinicio
+    """
+    def decorador(f: Callable) -> Callable:
+        nombre_clave = nombre or f"{f.__module__}.{f.__qualname__}"
+
+        @functools.wraps(f)
+        def envoltura(*args, **kwargs):
+            clave = construir_clave(nombre_clave, args, kwargs)
+            encontrado, valor = _CACHE.obtener(clave)
+            if encontrado:
+                anotar_cache(True)
+                return valor
+            if persistente:
+                encontrado, valor = cargar_artefacto(clave)
+            anotar_cache(encontrado)
+            if not encontrado:
+                valor = f(*args, **kwargs)
+                if persistente:
+                    guardar_artefacto(clave, valor)
+            marcar_huella(valor, clave)
+            _CACHE.guardar(clave, valor, nombre_clave)
+            return valor
+
+        envoltura.sin_cache = f
+        return perfilar(envoltura, nombre=f.__qualname__)
+
+    if funcion is not None:
+        return decorador(funcion)
+    return decorador
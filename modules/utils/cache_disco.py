@@ -0,0 +1,188 @@
+"""
+Módulo de caché persistente en disco
+Guarda artefactos derivados entre reinicios y los rehidrata mediante memory-mapping
+
+Cada artefacto se serializa con pickle (protocolo 5) separando los buffers
+de los arreglos numpy del resto del objeto. Al cargar, el archivo se mapea
+en memoria en modo copy-on-write y los arreglos se reconstruyen sobre ese
+mapa sin copiar los datos, por lo que abrir una tabla grande es casi
+instantáneo. Los archivos solo deben provenir del propio dashboard.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import pickle
+import struct
+import threading
+from pathlib import Path
+from typing import Any, Optional, Tuple
+
+MAGIA = b'DSHCACHE1\n'
+ALINEACION = 64
+EXTENSION = '.art'
+
+DIRECTORIO_DEFECTO = '.cache_dashboard'
+LIMITE_MB_DEFECTO = 2048
+
+_lock = threading.Lock()
+_version_codigo: Optional[str] = None
+
+def directorio_cache() -> Path:
+    """
+    Retorna el directorio de la caché en disco (DASHBOARD_CACHE_DIR)
+    """
+    return Path(os.environ.get('DASHBOARD_CACHE_DIR', DIRECTORIO_DEFECTO))
+
+def cache_disco_habilitada() -> bool:
+    """
+    Indica si la caché en disco está activa (DASHBOARD_CACHE_DISCO=0 la desactiva)
+    """
+    return os.environ.get('DASHBOARD_CACHE_DISCO', '1') != '0'
+
+def version_codigo() -> str:
+    """
+    Calcula la versión del código a partir del contenido de los módulos
+
+    Cualquier cambio en modules/ invalida los artefactos guardados.
+    """
+    global _version_codigo
+    if _version_codigo is None:
+        h = hashlib.blake2b(digest_size=8)
+        raiz = Path(__file__).resolve().parents[1]
+        for ruta in sorted(raiz.rglob('*.py')):
+            h.update(ruta.relative_to(raiz).as_posix().encode())
+            h.update(ruta.read_bytes())
+        _version_codigo = h.hexdigest()
+    return _version_codigo
+
+def _ruta_artefacto(clave: str) -> Path:
+    nombre = hashlib.blake2b(f"{version_codigo()}:{clave}".encode(), digest_size=16).hexdigest()
+    return directorio_cache() / nombre[:2] / (nombre + EXTENSION)
+
+def guardar_artefacto(clave: str, valor: Any) -> bool:
+    """
+    Persiste un artefacto en disco
+
+    Args:
+        clave: Clave del artefacto (huella del dataset y parámetros)
+        valor: Objeto serializable con pickle
+
+    Returns:
+        True si se guardó correctamente
+    """
+    if not cache_disco_habilitada():
+        return False
+
+    buffers = []
+    try:
+        cuerpo = pickle.dumps(valor, protocol=5, buffer_callback=buffers.append)
+        vistas = [b.raw() for b in buffers]
+    except Exception:
+        return False
+
+    posicion = 0
+    desplazamientos = []
+    for vista in vistas:
+        posicion = _alinear(posicion)
+        desplazamientos.append([posicion, vista.nbytes])
+        posicion += vista.nbytes
+
+    cabecera = json.dumps({'pickle': len(cuerpo), 'buffers': desplazamientos}).encode()
+    inicio_datos = _alinear(len(MAGIA) + 8 + len(cabecera) + len(cuerpo))
+
+    ruta = _ruta_artefacto(clave)
+    temporal = ruta.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        ruta.parent.mkdir(parents=True, exist_ok=True)
+        with open(temporal, 'wb') as f:
+            f.write(MAGIA)
+            f.write(struct.pack('<Q', len(cabecera)))
+            f.write(cabecera)
+            f.write(cuerpo)
+            for vista, (desplazamiento, _) in zip(vistas, desplazamientos):
+                f.seek(inicio_datos + desplazamiento)
+                f.write(vista)
+        os.replace(temporal, ruta)
+    except OSError:
+        temporal.unlink(missing_ok=True)
+        return False
+
+    _podar_directorio()
+    return True
+
+def cargar_artefacto(clave: str) -> Tuple[bool, Any]:
+    """
+    Rehidrata un artefacto desde disco mediante memory-mapping
+
+    Args:
+        clave: Clave del artefacto
+
+    Returns:
+        Tupla (encontrado, valor)
+    """
+    if not cache_disco_habilitada():
+        return False, None
+
+    ruta = _ruta_artefacto(clave)
+    try:
+        with open(ruta, 'rb') as f:
+            mapa = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+    except (OSError, ValueError):
+        return False, None
+
+    try:
+        vista = memoryview(mapa)
+        if bytes(vista[:len(MAGIA)]) != MAGIA:
+            return False, None
+        inicio = len(MAGIA)
+        (largo_cabecera,) = struct.unpack('<Q', vista[inicio:inicio + 8])
+        inicio += 8
+        cabecera = json.loads(bytes(vista[inicio:inicio + largo_cabecera]))
+        inicio += largo_cabecera
+        cuerpo = vista[inicio:inicio + cabecera['pickle']]
+        inicio_datos = _alinear(inicio + cabecera['pickle'])
+        buffers = [
+            vista[inicio_datos + desplazamiento:inicio_datos + desplazamiento + largo]
+            for desplazamiento, largo in cabecera['buffers']
+        ]
+        valor = pickle.loads(cuerpo, buffers=buffers)
+    except Exception:
+        return False, None
+
+    # Marcar el artefacto como usado para la poda por antigüedad
+    try:
+        os.utime(ruta)
+    except OSError:
+        pass
+    return True, valor
+
+def limpiar_cache_disco() -> None:
+    """
+    Elimina todos los artefactos guardados en disco
+    """
+    with _lock:
+        for ruta in directorio_cache().glob(f"*/*{EXTENSION}"):
+            ruta.unlink(missing_ok=True)
+
+def _alinear(posicion: int) -> int:
+    return (posicion + ALINEACION - 1) // ALINEACION * ALINEACION
+
+def _podar_directorio() -> None:
+    """Elimina los artefactos menos usados si el directorio supera el límite"""
+    limite = float(os.environ.get('DASHBOARD_CACHE_DISCO_MB', LIMITE_MB_DEFECTO)) * 1024 * 1024
+    with _lock:
+        archivos = []
+        for ruta in directorio_cache().glob(f"*/*{EXTENSION}"):
+            try:
+                estado = ruta.stat()
+            except OSError:
+                continue
+            archivos.append((estado.st_mtime, estado.st_size, ruta))
+        total = sum(tamano for _, tamano, _ in archivos)
+        for _, tamano, ruta in sorted(archivos):
+            if total <= limite:
+                break
+            ruta.unlink(missing_ok=True)
+            total -= tamano
@@ -1,11 +1,110 @@
 """
 Módulo para exportación de datos a Excel con formato
+
+Las tablas se escriben con openpyxl en modo write-only: las filas se
+envían en streaming al archivo y solo las celdas con formato (encabezado,
+índice y totales) se crean como objetos, reutilizando los mismos estilos.
+El resultado reproduce el formato de DataFrame.to_excel.
+
+openpyxl se importa al exportar la primera tabla y no al cargar el módulo,
+ya que las pestañas lo importan solo para ofrecer el botón de descarga.
 """
 
+import datetime
+import functools
 import io
 import pandas as pd
-from openpyxl.styles import Font, PatternFill
-from openpyxl.utils import get_column_letter
+from typing import TYPE_CHECKING, Any, Callable, Dict
+from modules.utils.cache import memoizar
+
+if TYPE_CHECKING:
+    from openpyxl import Workbook
+    from openpyxl.cell.cell import Cell
+
+# Formatos de fecha usados por pandas al escribir Excel
+FORMATO_FECHA_HORA = 'YYYY-MM-DD HH:MM:SS'
+FORMATO_FECHA = 'YYYY-MM-DD'
+
+# Filas convertidas a la vez (acota la memoria con tablas grandes)
+FILAS_POR_BLOQUE = 10000
+
+def escribir_hoja(libro: "Workbook", nombre_hoja: str, tabla: pd.DataFrame,
+                  resaltar_totales: bool = False) -> None:
+    """
+    Escribe una tabla en una hoja nueva de un libro write-only
+    
+    Args:
+        libro: Libro creado con Workbook(write_only=True)
+        nombre_hoja: Nombre de la hoja
+        tabla: DataFrame a escribir (con su índice, como to_excel); el índice
+            y las columnas deben tener un solo nivel
+        resaltar_totales: Si es True, resalta la última fila y la última columna
+    """
+    if isinstance(tabla.index, pd.MultiIndex) or isinstance(tabla.columns, pd.MultiIndex):
+        raise ValueError("escribir_hoja no admite índices ni columnas MultiIndex")
+    
+    hoja = libro.create_sheet(nombre_hoja)
+    n_filas = len(tabla)
+    estilos = _estilos()
+    
+    # Encabezado: nombre del índice y columnas
+    nombre_indice = tabla.index.name
+    encabezado = [_celda(hoja, nombre_indice, estilos['encabezado']) if nombre_indice is not None else None]
+    encabezado.extend(_celda(hoja, columna, estilos['encabezado']) for columna in tabla.columns)
+    hoja.append(encabezado)
+    
+    # Columnas con fechas, que necesitan formato de número
+    cols_fecha = [
+        i for i, dtype in enumerate(tabla.dtypes)
+        if pd.api.types.is_datetime64_any_dtype(dtype) or dtype == object
+    ]
+    
+    for inicio in range(0, n_filas, FILAS_POR_BLOQUE):
+        bloque = tabla.iloc[inicio:inicio + FILAS_POR_BLOQUE]
+        valores = bloque.astype(object).where(bloque.notna(), None).to_numpy().tolist()
+        for desplazamiento, (indice, fila) in enumerate(zip(bloque.index, valores)):
+            es_total = resaltar_totales and inicio + desplazamiento == n_filas - 1
+            for i in cols_fecha:
+                if isinstance(fila[i], (datetime.date, datetime.time)):
+                    fila[i] = _celda(hoja, fila[i], {})
+            if es_total:
+                fila = [_celda(hoja, v, estilos['total']) for v in fila]
+            elif resaltar_totales and fila:
+                fila[-1] = _celda(hoja, fila[-1], estilos['total'])
+            estilo_indice = estilos['encabezado_total'] if es_total else estilos['encabezado']
+            hoja.append([_celda(hoja, indice, estilo_indice)] + fila)
+
+def _celda(hoja, valor: Any, estilo: Dict[str, Any]) -> "Cell":
+    """Crea una celda write-only con estilos compartidos"""
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.cell.cell import Cell
+
+    if isinstance(valor, Cell):
+        celda, valor = valor, valor.value
+    else:
+        if isinstance(valor, pd.Timestamp):
+            valor = valor.to_pydatetime()
+        elif valor is not None and pd.isna(valor):
+            valor = None
+        celda = WriteOnlyCell(hoja, value=valor)
+    for atributo, objeto in estilo.items():
+        setattr(celda, atributo, objeto)
+    if isinstance(valor, datetime.datetime):
+        celda.number_format = FORMATO_FECHA_HORA
+    elif isinstance(valor, datetime.date):
+        celda.number_format = FORMATO_FECHA
+    return celda
+
+def _exportar(nombre_hoja: str, tabla: pd.DataFrame, resaltar_totales: bool = False) -> io.BytesIO:
+    """Escribe una tabla en un libro de una sola hoja y lo retorna en memoria"""
+    from openpyxl import Workbook
+
+    libro = Workbook(write_only=True)
+    escribir_hoja(libro, nombre_hoja, tabla, resaltar_totales)
+    output = io.BytesIO()
+    libro.save(output)
+    output.seek(0)
+    return output
 
 def to_excel_with_format(tabla: pd.DataFrame) -> io.BytesIO:
     """
@@ -17,29 +116,7 @@ def to_excel_with_format(tabla: pd.DataFrame) -> io.BytesIO:
     Returns:
         BytesIO con el archivo Excel formateado
     """
-    output = io.BytesIO()
-    with pd.ExcelWriter(output, engine='openpyxl') as writer:
-        tabla.to_excel(writer, sheet_name='Pendientes')
-        ws = writer.sheets['Pendientes']
-        
-        # Resaltar fila Total
-        total_row = ws.max_row
-        for col in range(1, ws.max_column + 1):
-            ws.cell(row=total_row, column=col).font = Font(bold=True)
-            ws.cell(row=total_row, column=col).fill = PatternFill(
-                start_color='FFFF00', end_color='FFFF00', fill_type='solid'
-            )
-        
-        # Resaltar columna Total
-        total_col = ws.max_column
-        for row in range(2, ws.max_row + 1):
-            ws.cell(row=row, column=total_col).font = Font(bold=True)
-            ws.cell(row=row, column=total_col).fill = PatternFill(
-                start_color='FFFF00', end_color='FFFF00', fill_type='solid'
-            )
-    
-    output.seek(0)
-    return output
+    return _exportar('Pendientes', tabla, resaltar_totales=True)
 
 def to_excel_with_format_prod(tabla: pd.DataFrame) -> io.BytesIO:
     """
@@ -51,11 +128,7 @@ def to_excel_with_format_prod(tabla: pd.DataFrame) -> io.BytesIO:
     Returns:
         BytesIO con el archivo Excel formateado
     """
-    output = io.BytesIO()
-    with pd.ExcelWriter(output, engine='openpyxl') as writer:
-        tabla.to_excel(writer, sheet_name='ProduccionDiaria')
-    output.seek(0)
-    return output
+    return _exportar('ProduccionDiaria', tabla)
 
 def to_excel_with_format_weekend(tabla: pd.DataFrame) -> io.BytesIO:
     """
@@ -67,11 +140,7 @@ def to_excel_with_format_weekend(tabla: pd.DataFrame) -> io.BytesIO:
     Returns:
         BytesIO con el archivo Excel formateado
     """
-    output = io.BytesIO()
-    with pd.ExcelWriter(output, engine='openpyxl') as writer:
-        tabla.to_excel(writer, sheet_name='FinDeSemana')
-    output.seek(0)
-    return output
+    return _exportar('FinDeSemana', tabla)
 
 def to_excel_resumen(tabla: pd.DataFrame) -> io.BytesIO:
     """
@@ -83,11 +152,7 @@ def to_excel_resumen(tabla: pd.DataFrame) -> io.BytesIO:
     Returns:
         BytesIO con el archivo Excel formateado
     """
-    output = io.BytesIO()
-    with pd.ExcelWriter(output, engine='openpyxl') as writer:
-        tabla.to_excel(writer, sheet_name='ResumenIngresos')
-    output.seek(0)
-    return output
+    return _exportar('ResumenIngresos', tabla)
 
 def to_excel_matriz(tabla: pd.DataFrame) -> io.BytesIO:
     """
@@ -99,8 +164,37 @@ def to_excel_matriz(tabla: pd.DataFrame) -> io.BytesIO:
     Returns:
         BytesIO con el archivo Excel
     """
-    output = io.BytesIO()
-    with pd.ExcelWriter(output, engine='openpyxl') as writer:
-        tabla.to_excel(writer, sheet_name='EvolucionPendientes')
-    output.seek(0)
-    return output 
\ No newline at end of file
+    return _exportar('EvolucionPendientes', tabla) 
+
+@memoizar
+def excel_bytes(tabla: pd.DataFrame, exportador: Callable[[pd.DataFrame], io.BytesIO]) -> bytes:
+    """
+    Genera el contenido del Excel de una tabla, memoizado por la huella de la tabla
+    
+    Args:
+        tabla: DataFrame a exportar
+        exportador: Función to_excel_* a usar
+        
+    Returns:
+        Bytes del archivo Excel
+    """
+    return exportador(tabla).getvalue()
+
+@functools.lru_cache(maxsize=None)
+def _estilos() -> Dict[str, Dict[str, Any]]:
+    """Estilos compartidos por todas las celdas con formato (se crean una sola vez)"""
+    from openpyxl.styles import Alignment, Border, Font, PatternFill, Side
+
+    negrita = Font(bold=True)
+    lado_fino = Side(style='thin')
+    relleno_total = PatternFill(start_color='FFFF00', end_color='FFFF00', fill_type='solid')
+    encabezado = {
+        'font': negrita,
+        'border': Border(left=lado_fino, right=lado_fino, top=lado_fino, bottom=lado_fino),
+        'alignment': Alignment(horizontal='center', vertical='top')
+    }
+    return {
+        'encabezado': encabezado,
+        'encabezado_total': {**encabezado, 'fill': relleno_total},
+        'total': {'font': negrita, 'fill': relleno_total}
+    }
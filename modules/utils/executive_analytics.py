@@ -5,43 +5,161 @@ Funciones especializadas para el Dashboard Ejecutivo
 
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Tuple
-from datetime import datetime, timedelta
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+from modules.data.loader import (
+    mascara_pendientes, cargar_historico_pendientes,
+    OPERADORES_EXCLUIR_PENDIENTES, OPERADORES_EXCLUIR_PRODUCCION
+)
+from modules.data.operadores import es_operador
+from modules.data.snapshots import desde_snapshot
+from modules.utils.cache import memoizar
+from modules.utils.perfilado import perfilar
 
-def calcular_kpis_ejecutivos(df_ccm: pd.DataFrame, df_prr: pd.DataFrame) -> Dict:
+@dataclass(frozen=True)
+class KPIsProceso:
+    """
+    KPIs de un proceso calculados en una sola pasada sobre el consolidado
+    """
+    proceso: str
+    total_pendientes: int
+    sin_asignar: int
+    asignados: int
+    operadores_activos: int
+    produccion_diaria: float
+    ingresos_diarios: float
+    ingresos_vs_trabajados: pd.DataFrame = field(repr=False, compare=False)
+    
+    @property
+    def promedio_por_operador(self) -> float:
+        return self.asignados / self.operadores_activos if self.operadores_activos > 0 else 0
+    
+    @property
+    def eficiencia(self) -> float:
+        return self.produccion_diaria / self.ingresos_diarios if self.ingresos_diarios > 0 else 0
+
+@dataclass(frozen=True)
+class KPIsEjecutivos:
+    """
+    KPIs consolidados de CCM y PRR
+    """
+    ccm: KPIsProceso
+    prr: KPIsProceso
+    
+    @property
+    def total_pendientes(self) -> int:
+        return self.ccm.total_pendientes + self.prr.total_pendientes
+    
+    @property
+    def total_sin_asignar(self) -> int:
+        return self.ccm.sin_asignar + self.prr.sin_asignar
+    
+    @property
+    def total_asignados(self) -> int:
+        return self.ccm.asignados + self.prr.asignados
+    
+    @property
+    def total_operadores(self) -> int:
+        return self.ccm.operadores_activos + self.prr.operadores_activos
+    
+    @property
+    def produccion_total(self) -> float:
+        return self.ccm.produccion_diaria + self.prr.produccion_diaria
+    
+    @property
+    def ingresos_total(self) -> float:
+        return self.ccm.ingresos_diarios + self.prr.ingresos_diarios
+    
+    @property
+    def eficiencia_general(self) -> float:
+        return self.produccion_total / self.ingresos_total if self.ingresos_total > 0 else 0
+
+@perfilar
+def calcular_kpis_ejecutivos(df_ccm: pd.DataFrame, df_prr: pd.DataFrame) -> KPIsEjecutivos:
     """
     Calcula KPIs ejecutivos consolidados
     
     Args:
-        df_ccm: DataFrame de CCM
-        df_prr: DataFrame de PRR
+        df_ccm: DataFrame de CCM (None en modo snapshot)
+        df_prr: DataFrame de PRR (None en modo snapshot)
         
     Returns:
-        Diccionario con KPIs ejecutivos
+        KPIsEjecutivos con los KPIs de ambos procesos
     """
-    # Métricas por proceso
-    kpis_ccm = _calcular_kpis_proceso(df_ccm, "CCM")
-    kpis_prr = _calcular_kpis_proceso(df_prr, "PRR")
-    
-    # Consolidación
-    kpis_consolidados = {
-        'pendientes_total': kpis_ccm['pendientes'] + kpis_prr['pendientes'],
-        'produccion_total': kpis_ccm['produccion_diaria'] + kpis_prr['produccion_diaria'],
-        'ingresos_total': kpis_ccm['ingresos_diarios'] + kpis_prr['ingresos_diarios'],
-        'operadores_total': kpis_ccm['operadores_activos'] + kpis_prr['operadores_activos'],
-        'eficiencia_general': _calcular_eficiencia_consolidada(kpis_ccm, kpis_prr),
-        'ccm': kpis_ccm,
-        'prr': kpis_prr
-    }
+    return KPIsEjecutivos(
+        ccm=calcular_kpis_proceso(df_ccm, "CCM"),
+        prr=calcular_kpis_proceso(df_prr, "PRR")
+    )
+
+@desde_snapshot('kpis', KPIsProceso)
+@memoizar(persistente=True)
+def calcular_kpis_proceso(df: pd.DataFrame, proceso: str) -> KPIsProceso:
+    """
+    Calcula todos los KPIs de un proceso con un único agrupamiento por métrica
     
-    return kpis_consolidados
+    Reproduce exactamente las cifras de las pestañas Pendientes y Producción
+    Diaria sin construir la tabla dinámica completa.
+    
+    Args:
+        df: DataFrame con los datos del proceso
+        proceso: Tipo de proceso ('CCM' o 'PRR')
+        
+    Returns:
+        KPIsProceso con las métricas calculadas
+    """
+    col_operador = 'OperadorPre' if 'OperadorPre' in df.columns else 'OPERADOR'
+    col_tramite = 'NumeroTramite'
+    
+    # === PENDIENTES: conteo por operador y año en una sola agrupación ===
+    pendientes = df.loc[mascara_pendientes(df, proceso), ['OPERADOR', 'Anio', col_tramite]]
+    operador = pendientes['OPERADOR'].fillna('Sin asignar')
+    conteo = pendientes.groupby([operador, 'Anio'])[col_tramite].count()
+    
+    # Sin asignar de los últimos 2 años (misma regla que calcular_sin_asignar)
+    anios = sorted(conteo.index.get_level_values('Anio').unique())
+    ultimos_2_anios = anios[-2:]
+    if 'Sin asignar' in conteo.index.get_level_values(0):
+        sin_asignar_por_anio = conteo.xs('Sin asignar', level=0)
+        sin_asignar = int(sin_asignar_por_anio[sin_asignar_por_anio.index.isin(ultimos_2_anios)].sum())
+    else:
+        sin_asignar = 0
+    
+    # Asignados y operadores activos (mismas exclusiones que la tabla de pendientes)
+    por_operador = conteo.groupby(level=0).sum()
+    por_operador = por_operador[~es_operador(por_operador.index, OPERADORES_EXCLUIR_PENDIENTES.get(proceso, []))]
+    asignados = int(por_operador.sum())
+    operadores_activos = len(por_operador)
+    
+    # === PRODUCCIÓN DIARIA (últimas 20 fechas con producción) ===
+    fecha_pre = _como_fecha(df['FechaPre'])
+    ultimos_20_dias = np.sort(fecha_pre.dropna().unique())[-20:]
+    en_ventana = fecha_pre.isin(ultimos_20_dias) & ~es_operador(df[col_operador], OPERADORES_EXCLUIR_PRODUCCION)
+    totales_operador = df.loc[en_ventana].groupby(col_operador)[col_tramite].count()
+    trabajados_20_dias = totales_operador[totales_operador >= 5].sum()
+    produccion_diaria = trabajados_20_dias / len(ultimos_20_dias) if len(ultimos_20_dias) > 0 else 0
+    
+    # === INGRESOS DIARIOS (últimos 30 días) ===
+    fecha_exp = _como_fecha(df['FechaExpendiente'])
+    fecha_limite = fecha_exp.max() - pd.Timedelta(days=30)
+    ingresos_diarios = df.loc[fecha_exp >= fecha_limite, col_tramite].count() / 30
+    
+    return KPIsProceso(
+        proceso=proceso,
+        total_pendientes=asignados + sin_asignar,
+        sin_asignar=sin_asignar,
+        asignados=asignados,
+        operadores_activos=operadores_activos,
+        produccion_diaria=float(produccion_diaria),
+        ingresos_diarios=float(ingresos_diarios),
+        ingresos_vs_trabajados=_calcular_ingresos_vs_trabajados(df[col_tramite], fecha_exp, fecha_pre)
+    )
 
-def generar_alertas_criticas(kpis: Dict) -> List[Dict]:
+def generar_alertas_criticas(kpis: KPIsEjecutivos) -> List[Dict]:
     """
     Genera alertas críticas basadas en umbrales ejecutivos
     
     Args:
-        kpis: Diccionario con KPIs calculados
+        kpis: KPIs ejecutivos calculados
         
     Returns:
         Lista de alertas con nivel de criticidad
@@ -49,56 +167,55 @@ def generar_alertas_criticas(kpis: Dict) -> List[Dict]:
     alertas = []
     
     # Alertas de pendientes
-    if kpis['pendientes_total'] > 2000:
+    if kpis.total_pendientes > 2000:
         alertas.append({
             'nivel': 'critico',
             'tipo': 'pendientes',
-            'mensaje': f"Pendientes totales críticos: {kpis['pendientes_total']:,}",
+            'mensaje': f"Pendientes totales críticos: {kpis.total_pendientes:,}",
             'icono': '🔴'
         })
-    elif kpis['pendientes_total'] > 1500:
+    elif kpis.total_pendientes > 1500:
         alertas.append({
             'nivel': 'warning',
             'tipo': 'pendientes',
-            'mensaje': f"Pendientes totales elevados: {kpis['pendientes_total']:,}",
+            'mensaje': f"Pendientes totales elevados: {kpis.total_pendientes:,}",
             'icono': '🟡'
         })
     
     # Alertas de eficiencia
-    if kpis['eficiencia_general'] < 0.8:
+    if kpis.eficiencia_general < 0.8:
         alertas.append({
             'nivel': 'critico',
             'tipo': 'eficiencia',
-            'mensaje': f"Eficiencia crítica: {kpis['eficiencia_general']*100:.1f}%",
+            'mensaje': f"Eficiencia crítica: {kpis.eficiencia_general*100:.1f}%",
             'icono': '🔴'
         })
-    elif kpis['eficiencia_general'] < 0.9:
+    elif kpis.eficiencia_general < 0.9:
         alertas.append({
             'nivel': 'warning',
             'tipo': 'eficiencia',
-            'mensaje': f"Eficiencia baja: {kpis['eficiencia_general']*100:.1f}%",
+            'mensaje': f"Eficiencia baja: {kpis.eficiencia_general*100:.1f}%",
             'icono': '🟡'
         })
     
     # Alertas por proceso individual
-    for proceso in ['ccm', 'prr']:
-        datos = kpis[proceso]
-        if datos['sin_asignar'] > datos['pendientes'] * 0.2:
+    for datos in [kpis.ccm, kpis.prr]:
+        if datos.sin_asignar > datos.total_pendientes * 0.2:
             alertas.append({
                 'nivel': 'warning',
                 'tipo': 'asignacion',
-                'mensaje': f"{proceso.upper()}: {datos['sin_asignar']} casos sin asignar",
+                'mensaje': f"{datos.proceso}: {datos.sin_asignar} casos sin asignar",
                 'icono': '🟡'
             })
     
     return alertas
 
-def calcular_semaforos_estado(kpis: Dict) -> Dict:
+def calcular_semaforos_estado(kpis: KPIsEjecutivos) -> Dict:
     """
     Calcula estados de semáforo para indicadores clave
     
     Args:
-        kpis: Diccionario con KPIs
+        kpis: KPIs ejecutivos calculados
         
     Returns:
         Diccionario con estados de semáforos
@@ -118,10 +235,9 @@ def calcular_semaforos_estado(kpis: Dict) -> Dict:
     umbrales_asignacion = {'verde': 95, 'amarillo': 85}  # % de casos asignados
     
     # Calcular estados
-    eficiencia = kpis['eficiencia_general']
-    carga_promedio = kpis['pendientes_total'] / kpis['operadores_total'] if kpis['operadores_total'] > 0 else 100
-    porcentaje_asignado = ((kpis['pendientes_total'] - kpis['ccm']['sin_asignar'] - kpis['prr']['sin_asignar']) / 
-                          kpis['pendientes_total'] * 100) if kpis['pendientes_total'] > 0 else 100
+    eficiencia = kpis.eficiencia_general
+    carga_promedio = kpis.total_pendientes / kpis.total_operadores if kpis.total_operadores > 0 else 100
+    porcentaje_asignado = (kpis.total_asignados / kpis.total_pendientes * 100) if kpis.total_pendientes > 0 else 100
     
     semaforos = {
         'eficiencia': {
@@ -144,169 +260,128 @@ def calcular_semaforos_estado(kpis: Dict) -> Dict:
     return semaforos
 
 def generar_tendencias_ejecutivas(df_ccm: pd.DataFrame, df_prr: pd.DataFrame, 
-                                 periodo_dias: int = 30) -> Dict:
+                                 periodo_dias: int = 30,
+                                 historico: Optional[pd.DataFrame] = None) -> Dict:
     """
-    Genera datos de tendencias para gráficos ejecutivos
+    Genera series diarias reales para gráficos ejecutivos
+    
+    El período termina en la última fecha presente en los datos (no en la
+    fecha actual), por lo que el resultado es determinista para una misma
+    versión del consolidado y del histórico.
     
     Args:
         df_ccm: DataFrame de CCM
         df_prr: DataFrame de PRR
         periodo_dias: Número de días para análisis
+        historico: Histórico de pendientes por operador; si no se indica se
+            lee con cargar_historico_pendientes
         
     Returns:
         Diccionario con datos de tendencias
     """
-    # Fechas del período
-    fecha_fin = datetime.now()
-    fecha_inicio = fecha_fin - timedelta(days=periodo_dias)
-    fechas = pd.date_range(start=fecha_inicio, end=fecha_fin, freq='D')
+    if historico is None:
+        historico = cargar_historico_pendientes()
+    
+    fechas_pre = [_como_fecha(df['FechaPre']) for df in (df_ccm, df_prr)]
+    fechas_exp = [_como_fecha(df['FechaExpendiente']) for df in (df_ccm, df_prr)]
+    
+    # Fechas del período, ancladas a la última fecha con datos
+    fecha_fin = max(serie.max() for serie in fechas_pre + fechas_exp)
+    if pd.isna(fecha_fin):
+        fecha_fin = pd.Timestamp.today()
+    fecha_fin = fecha_fin.normalize()
+    fechas = pd.date_range(end=fecha_fin, periods=periodo_dias + 1, freq='D')
+    
+    pendientes = _serie_pendientes_historico(historico, fechas)
     
-    # Simular tendencias basadas en datos reales
     tendencias = {
         'fechas': fechas,
-        'pendientes_ccm': _simular_tendencia_pendientes(df_ccm, fechas, 'CCM'),
-        'pendientes_prr': _simular_tendencia_pendientes(df_prr, fechas, 'PRR'),
-        'produccion_diaria': _simular_tendencia_produccion(df_ccm, df_prr, fechas),
-        'ingresos_diarios': _simular_tendencia_ingresos(df_ccm, df_prr, fechas)
+        'pendientes_ccm': pendientes.get('CCM', pd.Series(np.nan, index=fechas)).to_numpy(),
+        'pendientes_prr': pendientes.get('PRR', pd.Series(np.nan, index=fechas)).to_numpy(),
+        'produccion_diaria': sum(_conteo_diario(serie, fechas) for serie in fechas_pre),
+        'ingresos_diarios': sum(_conteo_diario(serie, fechas) for serie in fechas_exp)
     }
     
     return tendencias
 
-def calcular_metricas_comparativas(kpis: Dict) -> Dict:
+def calcular_metricas_comparativas(kpis: KPIsEjecutivos) -> Dict:
     """
     Calcula métricas comparativas entre CCM y PRR
     
     Args:
-        kpis: Diccionario con KPIs
+        kpis: KPIs ejecutivos calculados
         
     Returns:
         Diccionario con métricas comparativas
     """
-    ccm = kpis['ccm']
-    prr = kpis['prr']
+    ccm = kpis.ccm
+    prr = kpis.prr
     
     comparativas = {
         'pendientes': {
-            'ccm': ccm['pendientes'],
-            'prr': prr['pendientes'],
-            'diferencia': ccm['pendientes'] - prr['pendientes'],
-            'porcentaje_ccm': (ccm['pendientes'] / (ccm['pendientes'] + prr['pendientes']) * 100) 
-                             if (ccm['pendientes'] + prr['pendientes']) > 0 else 0
+            'ccm': ccm.total_pendientes,
+            'prr': prr.total_pendientes,
+            'diferencia': ccm.total_pendientes - prr.total_pendientes,
+            'porcentaje_ccm': (ccm.total_pendientes / kpis.total_pendientes * 100) 
+                             if kpis.total_pendientes > 0 else 0
         },
         'productividad': {
-            'ccm': ccm['produccion_diaria'],
-            'prr': prr['produccion_diaria'],
-            'ratio': ccm['produccion_diaria'] / prr['produccion_diaria'] if prr['produccion_diaria'] > 0 else 0
+            'ccm': ccm.produccion_diaria,
+            'prr': prr.produccion_diaria,
+            'ratio': ccm.produccion_diaria / prr.produccion_diaria if prr.produccion_diaria > 0 else 0
         },
         'eficiencia': {
-            'ccm': ccm['produccion_diaria'] / ccm['ingresos_diarios'] if ccm['ingresos_diarios'] > 0 else 0,
-            'prr': prr['produccion_diaria'] / prr['ingresos_diarios'] if prr['ingresos_diarios'] > 0 else 0
+            'ccm': ccm.eficiencia,
+            'prr': prr.eficiencia
         },
         'carga_operadores': {
-            'ccm': ccm['pendientes'] / ccm['operadores_activos'] if ccm['operadores_activos'] > 0 else 0,
-            'prr': prr['pendientes'] / prr['operadores_activos'] if prr['operadores_activos'] > 0 else 0
+            'ccm': ccm.promedio_por_operador,
+            'prr': prr.promedio_por_operador
         }
     }
     
     return comparativas
 
-def _calcular_kpis_proceso(df: pd.DataFrame, proceso: str) -> Dict:
-    """Calcula KPIs para un proceso específico"""
-    # Implementación similar a la del dashboard ejecutivo pero más robusta
-    if proceso == "CCM":
-        df_pendientes = df[
-            (df['UltimaEtapa'] == 'EVALUACIÓN - I') &
-            (df['EstadoPre'].isna()) &
-            (df['EstadoTramite'] == 'PENDIENTE') &
-            (df['EQUIPO'] != 'VULNERABLE')
-        ]
-    else:
-        etapas_prr = [
-            'ACTUALIZAR DATOS BENEFICIARIO - F', 'ACTUALIZAR DATOS BENEFICIARIO - I',
-            'ASOCIACION BENEFICIARIO - F', 'ASOCIACION BENEFICIARIO - I',
-            'CONFORMIDAD SUB-DIREC.INMGRA. - I', 'PAGOS, FECHA Y NRO RD. - F',
-            'PAGOS, FECHA Y NRO RD. - I', 'RECEPCIÓN DINM - F'
-        ]
-        df_pendientes = df[
-            (df['UltimaEtapa'].isin(etapas_prr)) &
-            (df['EstadoPre'].isna()) &
-            (df['EstadoTramite'] == 'PENDIENTE') &
-            (df['EQUIPO'] != 'VULNERABLE')
-        ]
-    
-    # Cálculos básicos
-    pendientes = len(df_pendientes)
-    sin_asignar = df_pendientes['OPERADOR'].isna().sum()
-    operadores_activos = df_pendientes['OPERADOR'].dropna().nunique()
-    
-    # Productividad (últimos 15 días)
-    col_fecha = 'FechaPre'
-    df[col_fecha] = pd.to_datetime(df[col_fecha], errors='coerce')
-    fecha_limite = df[col_fecha].max() - timedelta(days=15)
-    produccion_reciente = df[df[col_fecha] >= fecha_limite]
-    produccion_diaria = len(produccion_reciente) / 15 if len(produccion_reciente) > 0 else 0
-    
-    # Ingresos (últimos 30 días)
-    df['FechaExpendiente'] = pd.to_datetime(df['FechaExpendiente'], errors='coerce')
-    fecha_limite_ing = df['FechaExpendiente'].max() - timedelta(days=30)
-    ingresos_recientes = df[df['FechaExpendiente'] >= fecha_limite_ing]
-    ingresos_diarios = len(ingresos_recientes) / 30 if len(ingresos_recientes) > 0 else 0
-    
-    return {
-        'pendientes': pendientes,
-        'sin_asignar': sin_asignar,
-        'operadores_activos': operadores_activos,
-        'produccion_diaria': produccion_diaria,
-        'ingresos_diarios': ingresos_diarios,
-        'promedio_por_operador': pendientes / operadores_activos if operadores_activos > 0 else 0
-    }
+def _como_fecha(serie: pd.Series) -> pd.Series:
+    """Convierte una serie a datetime sin modificar el DataFrame de origen"""
+    if pd.api.types.is_datetime64_any_dtype(serie):
+        return serie
+    return pd.to_datetime(serie, errors='coerce')
 
-def _calcular_eficiencia_consolidada(kpis_ccm: Dict, kpis_prr: Dict) -> float:
-    """Calcula eficiencia general consolidada"""
-    produccion_total = kpis_ccm['produccion_diaria'] + kpis_prr['produccion_diaria']
-    ingresos_total = kpis_ccm['ingresos_diarios'] + kpis_prr['ingresos_diarios']
+def _calcular_ingresos_vs_trabajados(tramites: pd.Series, fecha_exp: pd.Series,
+                                     fecha_pre: pd.Series, dias: int = 30) -> pd.DataFrame:
+    """Cuenta ingresos y trabajados por día en la ventana de los últimos días"""
+    fecha_max = max(fecha_exp.max(), fecha_pre.max())
+    if pd.isna(fecha_max):
+        return pd.DataFrame(columns=['fecha', 'ingresos', 'trabajados'])
+    fecha_min = fecha_max - pd.Timedelta(days=dias)
     
-    return produccion_total / ingresos_total if ingresos_total > 0 else 0
-
-def _simular_tendencia_pendientes(df: pd.DataFrame, fechas: pd.DatetimeIndex, proceso: str) -> List[int]:
-    """Simula tendencia de pendientes basada en datos reales"""
-    base = len(df) // 2  # Valor base aproximado
-    tendencia = []
-    
-    for i, fecha in enumerate(fechas):
-        # Simulación con variación realista
-        variacion = np.random.normal(0, base * 0.1)  # 10% de variación
-        valor = max(0, int(base + variacion + (i * np.random.normal(0, 5))))
-        tendencia.append(valor)
-    
-    return tendencia
+    ingresos = tramites[fecha_exp >= fecha_min].groupby(fecha_exp).count().rename('ingresos')
+    trabajados = tramites[fecha_pre >= fecha_min].groupby(fecha_pre).count().rename('trabajados')
+    
+    datos = pd.concat([ingresos, trabajados], axis=1).fillna(0).sort_index()
+    datos.index.name = 'fecha'
+    return datos.reset_index()
 
-def _simular_tendencia_produccion(df_ccm: pd.DataFrame, df_prr: pd.DataFrame, 
-                                fechas: pd.DatetimeIndex) -> List[float]:
-    """Simula tendencia de producción diaria"""
-    base_ccm = len(df_ccm) // 60  # Aproximación de producción diaria
-    base_prr = len(df_prr) // 60
-    base_total = base_ccm + base_prr
-    
-    tendencia = []
-    for fecha in fechas:
-        # Variación según día de la semana
-        factor_dia = 0.7 if fecha.weekday() >= 5 else 1.0  # Menor producción en fines de semana
-        variacion = np.random.normal(1, 0.2)  # 20% de variación
-        valor = max(0, base_total * factor_dia * variacion)
-        tendencia.append(valor)
-    
-    return tendencia
+def _conteo_diario(fechas_evento: pd.Series, fechas: pd.DatetimeIndex) -> np.ndarray:
+    """Cuenta eventos por día sobre el rango de fechas (0 en días sin eventos)"""
+    dias = fechas_evento.dropna().dt.normalize()
+    dias = dias[(dias >= fechas[0]) & (dias <= fechas[-1])]
+    return dias.value_counts().reindex(fechas, fill_value=0).to_numpy()
 
-def _simular_tendencia_ingresos(df_ccm: pd.DataFrame, df_prr: pd.DataFrame, 
-                              fechas: pd.DatetimeIndex) -> List[float]:
-    """Simula tendencia de ingresos diarios"""
-    base_total = (len(df_ccm) + len(df_prr)) // 90  # Aproximación de ingresos diarios
-    
-    tendencia = []
-    for fecha in fechas:
-        variacion = np.random.normal(1, 0.15)  # 15% de variación
-        valor = max(0, base_total * variacion)
-        tendencia.append(valor)
-    
-    return tendencia 
\ No newline at end of file
+def _serie_pendientes_historico(historico: pd.DataFrame, 
+                                fechas: pd.DatetimeIndex) -> pd.DataFrame:
+    """Total de pendientes por día y proceso según las fotos del histórico"""
+    if historico.empty:
+        return pd.DataFrame(index=fechas)
+    
+    fecha = pd.to_datetime(historico['Fecha'], errors='coerce')
+    pendientes = pd.to_numeric(historico['Pendientes'], errors='coerce')
+    en_rango = (fecha >= fechas[0]) & (fecha <= fechas[-1])
+    
+    totales = pendientes[en_rango].groupby(
+        [fecha[en_rango], historico.loc[en_rango, 'Proceso']]
+    ).sum().unstack()
+    
+    # Los días sin foto quedan como NaN en lugar de inventar un valor
+    return totales.reindex(fechas)
@@ -0,0 +1,364 @@
+"""
+Módulo de contabilidad de memoria
+Mide cuánto ocupa cada dataset cargado y cada artefacto de la caché de
+cálculos, por columna, junto con el ahorro que daría convertir las columnas
+de texto a categóricas o a Arrow
+
+También registra el RSS del proceso durante cada carga de datos y, con
+DASHBOARD_TRACEMALLOC=1, atribuye la memoria viva a las funciones del
+dashboard que la asignaron.
+"""
+
+import ast
+import functools
+import os
+import sys
+import threading
+import time
+import tracemalloc
+import weakref
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+import pandas as pd
+
+from modules.utils.cache import estimar_tamano, obtener_cache
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+MB = 1024 ** 2
+
+# Frames guardados por asignación en el modo tracemalloc
+FRAMES_TRACEMALLOC = 25
+
+# Raíz del código del dashboard: las asignaciones se atribuyen a la función
+# más interna de este árbol en la pila
+_RAIZ_MODULOS = str(Path(__file__).resolve().parents[1])
+
+@dataclass
+class CargaDataset:
+    """
+    Memoria del proceso medida durante la carga de un dataset (en MB)
+    """
+    nombre: str
+    filas: Optional[int] = None
+    segundos: float = 0.0
+    rss_antes_mb: Optional[float] = None
+    rss_despues_mb: Optional[float] = None
+    pico_rss_mb: Optional[float] = None
+    pico_tracemalloc_mb: Optional[float] = None
+
+_lock = threading.Lock()
+_datasets: 'weakref.WeakValueDictionary[str, pd.DataFrame]' = weakref.WeakValueDictionary()
+_cargas: Dict[str, CargaDataset] = {}
+
+def tracemalloc_por_entorno() -> bool:
+    """
+    Indica si el modo tracemalloc está activado con DASHBOARD_TRACEMALLOC=1
+    """
+    return os.environ.get('DASHBOARD_TRACEMALLOC', '0').lower() in ('1', 'true', 'si', 'sí')
+
+def iniciar_rastreo(frames: int = FRAMES_TRACEMALLOC) -> None:
+    """
+    Activa tracemalloc si no estaba activo
+
+    Las asignaciones solo se rastrean desde este momento, por lo que conviene
+    llamarla antes de cargar los datos. Hace todo bastante más lento (la
+    lectura del Excel, del orden de 5x).
+    """
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(frames)
+
+def rss_actual_mb() -> Optional[float]:
+    """
+    Memoria residente actual del proceso, o None si no se puede leer
+    """
+    try:
+        with open('/proc/self/statm') as f:
+            paginas = int(f.read().split()[1])
+        return paginas * os.sysconf('SC_PAGE_SIZE') / MB
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+def pico_rss_mb() -> Optional[float]:
+    """
+    Pico de memoria residente del proceso desde su inicio, o None si no se puede leer
+    """
+    if resource is None:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux lo informa en KB y macOS en bytes
+    return pico / MB if sys.platform == 'darwin' else pico / 1024
+
+@contextmanager
+def medir_carga(nombre: str) -> Iterator[CargaDataset]:
+    """
+    Mide la memoria del proceso durante la carga de un dataset
+
+    Registra el RSS antes y después, el pico de RSS del proceso al terminar
+    y, si tracemalloc está activo, el pico de memoria asignada durante la carga.
+
+    Args:
+        nombre: Nombre del dataset
+
+    Returns:
+        Context manager que entrega la CargaDataset (asignar filas al terminar)
+    """
+    carga = CargaDataset(nombre, rss_antes_mb=rss_actual_mb())
+    rastreando = tracemalloc.is_tracing()
+    if rastreando:
+        actual_inicio, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+    inicio = time.perf_counter()
+    try:
+        yield carga
+    finally:
+        carga.segundos = time.perf_counter() - inicio
+        carga.rss_despues_mb = rss_actual_mb()
+        carga.pico_rss_mb = pico_rss_mb()
+        if rastreando and tracemalloc.is_tracing():
+            _, pico = tracemalloc.get_traced_memory()
+            carga.pico_tracemalloc_mb = (pico - actual_inicio) / MB
+        with _lock:
+            _cargas[nombre] = carga
+
+def registrar_dataset(nombre: str, df: pd.DataFrame) -> None:
+    """
+    Registra un dataset cargado para incluirlo en el informe de memoria
+
+    Solo se guarda una referencia débil: el registro no retiene el dataset.
+    """
+    with _lock:
+        _datasets[nombre] = df
+
+def cargas_registradas() -> pd.DataFrame:
+    """
+    Mediciones de la última carga de cada dataset
+
+    Returns:
+        DataFrame con una fila por dataset y los tiempos y memorias en MB
+    """
+    with _lock:
+        cargas = list(_cargas.values())
+    columnas = {
+        'nombre': 'Dataset', 'filas': 'Filas', 'segundos': 'Segundos',
+        'rss_antes_mb': 'RSS antes (MB)', 'rss_despues_mb': 'RSS después (MB)',
+        'pico_rss_mb': 'Pico RSS proceso (MB)', 'pico_tracemalloc_mb': 'Pico asignado (MB)'
+    }
+    tabla = pd.DataFrame([vars(c) for c in cargas], columns=list(columnas))
+    return tabla.rename(columns=columnas)
+
+def uso_por_columna(df: pd.DataFrame, artefacto: str = '') -> pd.DataFrame:
+    """
+    Memoria profunda de cada columna y proyección de conversiones
+
+    Para las columnas de texto (object) se proyecta el tamaño como categórica
+    (códigos más categorías) y, para todas, el tamaño como array de Arrow.
+
+    Args:
+        df: DataFrame a medir
+        artefacto: Nombre del artefacto al que pertenece (columna Artefacto)
+
+    Returns:
+        DataFrame con una fila por columna y los tamaños en MB
+    """
+    return _tabla_columnas(_filas_columnas(df, artefacto))
+
+def inventario_memoria(por_columna: bool = True) -> Dict[str, pd.DataFrame]:
+    """
+    Inventario de los datasets cargados y de los artefactos de la caché de cálculos
+
+    Args:
+        por_columna: Si se calcula también el detalle por columna de cada tabla
+
+    Returns:
+        Diccionario con 'artefactos' (una fila por dataset o artefacto, ordenado
+        por memoria) y 'columnas' (una fila por columna de cada tabla)
+    """
+    resumen = []
+    columnas = []
+
+    with _lock:
+        datasets = list(_datasets.items())
+    for nombre, df in datasets:
+        resumen.append(_resumir('dataset', nombre, df, columnas if por_columna else None))
+
+    for clave, origen, valor, tamano in obtener_cache().entradas():
+        nombre = f"{origen or 'sin nombre'} [{clave[:8]}]"
+        tablas = list(_tablas_de(valor))
+        for sufijo, tabla in tablas:
+            resumen.append(_resumir('derivado', nombre + sufijo, tabla, columnas if por_columna else None))
+        if not tablas:
+            resumen.append({
+                'Tipo': 'derivado', 'Artefacto': nombre, 'Filas': None, 'Columnas': None,
+                'Memoria (MB)': tamano / MB, 'Ahorro categórica (MB)': 0.0, 'Ahorro Arrow (MB)': 0.0
+            })
+
+    artefactos = pd.DataFrame(resumen, columns=[
+        'Tipo', 'Artefacto', 'Filas', 'Columnas', 'Memoria (MB)',
+        'Ahorro categórica (MB)', 'Ahorro Arrow (MB)'
+    ])
+    for columna in ('Filas', 'Columnas'):
+        artefactos[columna] = artefactos[columna].astype('Int64')
+    artefactos = artefactos.sort_values('Memoria (MB)', ascending=False, ignore_index=True)
+
+    return {'artefactos': artefactos, 'columnas': _tabla_columnas(columnas)}
+
+def atribuir_asignaciones(limite: int = 20) -> pd.DataFrame:
+    """
+    Atribuye la memoria viva rastreada por tracemalloc a las funciones del dashboard
+
+    Cada bloque se asigna a la función más interna de modules/ en su pila, de
+    modo que lo que asignan pandas o numpy cuenta para quien los llamó.
+
+    Args:
+        limite: Número máximo de funciones a devolver
+
+    Returns:
+        DataFrame con función, archivo, memoria en MB y bloques, ordenado por
+        memoria (vacío si tracemalloc no está activo)
+    """
+    columnas = ['Función', 'Archivo', 'Memoria (MB)', 'Bloques']
+    if not tracemalloc.is_tracing():
+        return pd.DataFrame(columns=columnas)
+
+    # Lo asignado por el propio informe no cuenta
+    instantanea = tracemalloc.take_snapshot().filter_traces([
+        tracemalloc.Filter(False, __file__, all_frames=True),
+        tracemalloc.Filter(False, tracemalloc.__file__)
+    ])
+    agregado: Dict[tuple, List[int]] = {}
+    for traza in instantanea.traces:
+        # Los frames van del más antiguo al más reciente
+        for frame in reversed(traza.traceback):
+            if frame.filename.startswith(_RAIZ_MODULOS):
+                clave = (frame.filename, _funcion_en_linea(frame.filename, frame.lineno))
+                break
+        else:
+            clave = ('', '(fuera del dashboard)')
+        total = agregado.setdefault(clave, [0, 0])
+        total[0] += traza.size
+        total[1] += 1
+
+    filas = [
+        {
+            'Función': funcion,
+            'Archivo': os.path.relpath(archivo, Path(_RAIZ_MODULOS).parent) if archivo else '',
+            'Memoria (MB)': tamano / MB,
+            'Bloques': bloques
+        }
+        for (archivo, funcion), (tamano, bloques) in agregado.items()
+    ]
+    tabla = pd.DataFrame(filas, columns=columnas)
+    return tabla.sort_values('Memoria (MB)', ascending=False, ignore_index=True).head(limite)
+
+def _filas_columnas(df: pd.DataFrame, artefacto: str) -> List[dict]:
+    filas = []
+    for posicion, nombre in enumerate(df.columns):
+        serie = df.iloc[:, posicion]
+        memoria = serie.memory_usage(deep=True, index=False)
+        categorica = _tamano_categorica(serie)
+        arrow = _tamano_arrow(serie)
+        filas.append({
+            'Artefacto': artefacto,
+            'Columna': str(nombre),
+            'Tipo': str(serie.dtype),
+            'Memoria (MB)': memoria / MB,
+            'Valores únicos': None if categorica is None else serie.nunique(dropna=False),
+            'Categórica (MB)': None if categorica is None else categorica / MB,
+            'Arrow (MB)': None if arrow is None else arrow / MB,
+            'Ahorro categórica (MB)': 0.0 if categorica is None else max(0, memoria - categorica) / MB,
+            'Ahorro Arrow (MB)': 0.0 if arrow is None else max(0, memoria - arrow) / MB
+        })
+    return filas
+
+def _tabla_columnas(filas: List[dict]) -> pd.DataFrame:
+    tabla = pd.DataFrame(filas, columns=[
+        'Artefacto', 'Columna', 'Tipo', 'Memoria (MB)', 'Valores únicos', 'Categórica (MB)',
+        'Arrow (MB)', 'Ahorro categórica (MB)', 'Ahorro Arrow (MB)'
+    ])
+    tabla['Valores únicos'] = tabla['Valores únicos'].astype('Int64')
+    return tabla
+
+def _resumir(tipo: str, nombre: str, df: pd.DataFrame, columnas: Optional[List[dict]]) -> dict:
+    memoria = estimar_tamano(df)
+    fila = {
+        'Tipo': tipo, 'Artefacto': nombre, 'Filas': len(df),
+        'Columnas': df.shape[1] if isinstance(df, pd.DataFrame) else 1,
+        'Memoria (MB)': memoria / MB, 'Ahorro categórica (MB)': 0.0, 'Ahorro Arrow (MB)': 0.0
+    }
+    if columnas is not None:
+        detalle = _filas_columnas(df.to_frame() if isinstance(df, pd.Series) else df, nombre)
+        fila['Ahorro categórica (MB)'] = sum(c['Ahorro categórica (MB)'] for c in detalle)
+        fila['Ahorro Arrow (MB)'] = sum(c['Ahorro Arrow (MB)'] for c in detalle)
+        columnas.extend(detalle)
+    return fila
+
+def _tablas_de(valor: Any, prefijo: str = '') -> Iterator[tuple]:
+    """
+    Tablas (DataFrame o Series) contenidas en un valor cacheado, con su ruta
+    """
+    if isinstance(valor, (pd.DataFrame, pd.Series)):
+        yield prefijo, valor
+    elif isinstance(valor, dict):
+        for clave, v in valor.items():
+            yield from _tablas_de(v, f"{prefijo}.{clave}")
+    elif isinstance(valor, (list, tuple)):
+        for i, v in enumerate(valor):
+            yield from _tablas_de(v, f"{prefijo}[{i}]")
+    elif hasattr(valor, '__dataclass_fields__') and not isinstance(valor, type):
+        for nombre in valor.__dataclass_fields__:
+            yield from _tablas_de(getattr(valor, nombre), f"{prefijo}.{nombre}")
+
+def _tamano_categorica(serie: pd.Series) -> Optional[int]:
+    if serie.dtype != object:
+        return None
+    try:
+        categorias = pd.Series(serie.dropna().unique(), dtype=object)
+    except TypeError:  # valores no hashables
+        return None
+    n = len(categorias)
+    ancho_codigo = 1 if n < 2 ** 7 else 2 if n < 2 ** 15 else 4
+    return len(serie) * ancho_codigo + int(categorias.memory_usage(deep=True, index=False))
+
+def _tamano_arrow(serie: pd.Series) -> Optional[int]:
+    if pa is None or isinstance(serie.dtype, pd.CategoricalDtype):
+        return None
+    try:
+        return int(pa.Array.from_pandas(serie).nbytes)
+    except (pa.ArrowException, TypeError, ValueError):
+        return None
+
+@functools.lru_cache(maxsize=None)
+def _rangos_funciones(archivo: str) -> List[tuple]:
+    try:
+        arbol = ast.parse(Path(archivo).read_text(encoding='utf-8'))
+    except (OSError, SyntaxError, ValueError):
+        return []
+    return sorted(
+        (nodo.lineno, nodo.end_lineno, nodo.name)
+        for nodo in ast.walk(arbol)
+        if isinstance(nodo, (ast.FunctionDef, ast.AsyncFunctionDef))
+    )
+
+def _funcion_en_linea(archivo: str, linea: int) -> str:
+    """
+    Función más interna del archivo que contiene la línea (o el módulo)
+    """
+    nombre = '<módulo>'
+    for inicio, fin, funcion in _rangos_funciones(archivo):
+        if inicio > linea:
+            break
+        if linea <= fin:
+            nombre = funcion
+    return f"{Path(archivo).stem}.{nombre}"
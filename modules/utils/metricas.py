@@ -0,0 +1,302 @@
+"""
+Módulo de métricas operativas
+Contadores, indicadores e histogramas del proceso del dashboard en formato de
+texto de Prometheus, para vigilar su salud sin abrir la interfaz
+
+Las métricas se exponen de dos formas, ambas opcionales:
+- DASHBOARD_METRICAS_ARCHIVO: archivo que se reescribe al final de cada rerun
+  (apto para el textfile collector de node_exporter)
+- DASHBOARD_METRICAS_PUERTO: endpoint local http://127.0.0.1:<puerto>/metrics
+  (DASHBOARD_METRICAS_HOST para escuchar en otra interfaz)
+"""
+
+import functools
+import math
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from modules.utils.cache import obtener_cache
+
+# Límites de los histogramas de duración, en segundos
+LIMITES_SEGUNDOS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+TIPO_CONTENIDO = 'text/plain; version=0.0.4; charset=utf-8'
+
+class _Metrica:
+    tipo = ''
+
+    def __init__(self, nombre: str, ayuda: str, etiquetas: Sequence[str] = ()):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = tuple(etiquetas)
+        self._valores: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def _clave(self, etiquetas: Dict[str, str]) -> Tuple[str, ...]:
+        if set(etiquetas) != set(self.etiquetas):
+            raise ValueError(f"{self.nombre} requiere las etiquetas {self.etiquetas}")
+        return tuple(str(etiquetas[e]) for e in self.etiquetas)
+
+    def _etiquetas(self, clave: Tuple[str, ...], extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+        pares = list(zip(self.etiquetas, clave)) + list(extra)
+        if not pares:
+            return ''
+        return '{' + ','.join(f'{e}="{_escapar(v)}"' for e, v in pares) + '}'
+
+    def exportar(self) -> List[str]:
+        lineas = [f"# HELP {self.nombre} {self.ayuda}", f"# TYPE {self.nombre} {self.tipo}"]
+        with self._lock:
+            valores = sorted(self._valores.items())
+        for clave, valor in valores:
+            lineas.extend(self._muestras(clave, valor))
+        return lineas
+
+    def _muestras(self, clave: Tuple[str, ...], valor) -> List[str]:
+        return [f"{self.nombre}{self._etiquetas(clave)} {_numero(valor)}"]
+
+class Contador(_Metrica):
+    """
+    Valor que solo crece (el nombre debe terminar en _total)
+    """
+    tipo = 'counter'
+
+    def incrementar(self, valor: float = 1, **etiquetas: str) -> None:
+        clave = self._clave(etiquetas)
+        with self._lock:
+            self._valores[clave] = self._valores.get(clave, 0) + valor
+
+class Indicador(_Metrica):
+    """
+    Valor que puede subir o bajar
+    """
+    tipo = 'gauge'
+
+    def fijar(self, valor: float, **etiquetas: str) -> None:
+        clave = self._clave(etiquetas)
+        with self._lock:
+            self._valores[clave] = valor
+
+class Histograma(_Metrica):
+    """
+    Distribución de observaciones en intervalos acumulados, con suma y cuenta
+    """
+    tipo = 'histogram'
+
+    def __init__(self, nombre: str, ayuda: str, etiquetas: Sequence[str] = (),
+                 limites: Sequence[float] = LIMITES_SEGUNDOS):
+        super().__init__(nombre, ayuda, etiquetas)
+        self.limites = tuple(sorted(limites))
+
+    def observar(self, valor: float, **etiquetas: str) -> None:
+        clave = self._clave(etiquetas)
+        with self._lock:
+            cubetas, suma, cuenta = self._valores.get(clave, ([0] * len(self.limites), 0.0, 0))
+            cubetas = [c + (valor <= limite) for c, limite in zip(cubetas, self.limites)]
+            self._valores[clave] = (cubetas, suma + valor, cuenta + 1)
+
+    def _muestras(self, clave: Tuple[str, ...], valor) -> List[str]:
+        cubetas, suma, cuenta = valor
+        lineas = [
+            f"{self.nombre}_bucket{self._etiquetas(clave, (('le', _numero(limite)),))} {c}"
+            for limite, c in zip(self.limites, cubetas)
+        ]
+        lineas.append(f"{self.nombre}_bucket{self._etiquetas(clave, (('le', '+Inf'),))} {cuenta}")
+        lineas.append(f"{self.nombre}_sum{self._etiquetas(clave)} {_numero(suma)}")
+        lineas.append(f"{self.nombre}_count{self._etiquetas(clave)} {cuenta}")
+        return lineas
+
+CARGA_DATASET = Histograma(
+    'dashboard_carga_dataset_segundos',
+    "Duración de la carga de un consolidado (origen: excel o disco)",
+    ('proceso', 'origen')
+)
+RERUN = Histograma(
+    'dashboard_rerun_segundos',
+    "Duración de un rerun completo por vista",
+    ('vista',)
+)
+ESCRITURA_HISTORICO = Histograma(
+    'dashboard_historico_actualizacion_segundos',
+    "Duración de la actualización de un histórico, se escriba o no",
+    ('historico',)
+)
+ESCRITURAS_HISTORICO = Contador(
+    'dashboard_historico_escrituras_total',
+    "Veces que se reescribió un histórico",
+    ('historico',)
+)
+FILAS_HISTORICO = Indicador(
+    'dashboard_historico_filas',
+    "Filas del histórico tras la última escritura",
+    ('historico',)
+)
+ERRORES_CARGA = Contador(
+    'dashboard_carga_dataset_errores_total',
+    "Cargas de consolidado que terminaron en error",
+    ('proceso',)
+)
+
+SOLICITUDES_API = Contador(
+    'dashboard_api_solicitudes_total',
+    "Solicitudes a la API JSON por recurso y código de respuesta",
+    ('recurso', 'estado')
+)
+RESPUESTA_API = Histograma(
+    'dashboard_api_respuesta_segundos',
+    "Duración de las respuestas de la API JSON por recurso",
+    ('recurso',)
+)
+
+_METRICAS: List[_Metrica] = [
+    CARGA_DATASET, ERRORES_CARGA, RERUN, ESCRITURA_HISTORICO, ESCRITURAS_HISTORICO, FILAS_HISTORICO,
+    SOLICITUDES_API, RESPUESTA_API
+]
+
+def metrica_historico(historico: str) -> Callable:
+    """
+    Decorador que mide la duración de cada actualización de un histórico
+
+    Args:
+        historico: Nombre del histórico (etiqueta de la métrica)
+    """
+    def decorador(f: Callable) -> Callable:
+        @functools.wraps(f)
+        def envoltura(*args, **kwargs):
+            inicio = time.perf_counter()
+            try:
+                return f(*args, **kwargs)
+            finally:
+                ESCRITURA_HISTORICO.observar(time.perf_counter() - inicio, historico=historico)
+        return envoltura
+    return decorador
+
+def registrar_escritura_historico(historico: str, filas: int) -> None:
+    """
+    Anota que un histórico se reescribió y con cuántas filas quedó
+    """
+    ESCRITURAS_HISTORICO.incrementar(historico=historico)
+    FILAS_HISTORICO.fijar(filas, historico=historico)
+
+def registrar_rerun(vista: str, segundos: float) -> None:
+    """
+    Anota la duración de un rerun completo de la vista indicada
+    """
+    RERUN.observar(segundos, vista=vista)
+
+def registrar_solicitud_api(recurso: str, estado: int, segundos: float) -> None:
+    """
+    Anota una respuesta de la API JSON con su código y duración
+    """
+    SOLICITUDES_API.incrementar(recurso=recurso, estado=estado)
+    RESPUESTA_API.observar(segundos, recurso=recurso)
+
+def exportar_prometheus() -> str:
+    """
+    Todas las métricas en formato de texto de Prometheus
+
+    Incluye los contadores de la caché de cálculos, leídos en el momento.
+
+    Returns:
+        Texto listo para servir o escribir en el archivo de métricas
+    """
+    lineas = []
+    for metrica in _METRICAS:
+        lineas.extend(metrica.exportar())
+    lineas.extend(_metricas_cache())
+    return '\n'.join(lineas) + '\n'
+
+def publicar_metricas() -> Optional[Path]:
+    """
+    Reescribe el archivo de métricas si DASHBOARD_METRICAS_ARCHIVO está definido
+
+    La escritura es atómica (archivo temporal y reemplazo), de modo que quien
+    lo lee nunca ve un archivo a medias. Un error de escritura no interrumpe
+    el rerun.
+
+    Returns:
+        Ruta escrita, o None si no hay archivo configurado o no se pudo escribir
+    """
+    ruta = os.environ.get('DASHBOARD_METRICAS_ARCHIVO')
+    if not ruta:
+        return None
+    ruta = Path(ruta)
+    temporal = ruta.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        ruta.parent.mkdir(parents=True, exist_ok=True)
+        temporal.write_text(exportar_prometheus(), encoding='utf-8')
+        os.replace(temporal, ruta)
+    except OSError:
+        temporal.unlink(missing_ok=True)
+        return None
+    return ruta
+
+_servidor: Optional[ThreadingHTTPServer] = None
+_lock_servidor = threading.Lock()
+
+class _ManejadorMetricas(BaseHTTPRequestHandler):
+    def do_GET(self) -> None:
+        if self.path.split('?', 1)[0] not in ('/metrics', '/'):
+            self.send_error(404)
+            return
+        cuerpo = exportar_prometheus().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', TIPO_CONTENIDO)
+        self.send_header('Content-Length', str(len(cuerpo)))
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def log_message(self, *args) -> None:
+        pass
+
+def iniciar_servidor_metricas() -> Optional[ThreadingHTTPServer]:
+    """
+    Levanta una sola vez por proceso el endpoint de métricas si
+    DASHBOARD_METRICAS_PUERTO está definido
+
+    Returns:
+        Servidor en ejecución, o None si no hay puerto configurado
+    """
+    global _servidor
+    puerto = os.environ.get('DASHBOARD_METRICAS_PUERTO')
+    if not puerto:
+        return None
+    with _lock_servidor:
+        if _servidor is None:
+            host = os.environ.get('DASHBOARD_METRICAS_HOST', '127.0.0.1')
+            _servidor = ThreadingHTTPServer((host, int(puerto)), _ManejadorMetricas)
+            _servidor.daemon_threads = True
+            threading.Thread(target=_servidor.serve_forever, name='metricas', daemon=True).start()
+    return _servidor
+
+def _metricas_cache() -> List[str]:
+    stats = obtener_cache().estadisticas()
+    valores = [
+        ('dashboard_cache_aciertos_total', 'counter', "Aciertos de la caché de cálculos", stats['aciertos']),
+        ('dashboard_cache_fallos_total', 'counter', "Fallos de la caché de cálculos", stats['fallos']),
+        ('dashboard_cache_expulsiones_total', 'counter', "Entradas expulsadas de la caché de cálculos",
+         stats['expulsiones']),
+        ('dashboard_cache_tasa_aciertos', 'gauge', "Aciertos sobre accesos a la caché de cálculos",
+         stats['tasa_aciertos']),
+        ('dashboard_cache_entradas', 'gauge', "Entradas en la caché de cálculos", stats['entradas']),
+        ('dashboard_cache_bytes', 'gauge', "Tamaño estimado de la caché de cálculos", stats['bytes'])
+    ]
+    lineas = []
+    for nombre, tipo, ayuda, valor in valores:
+        lineas.extend([f"# HELP {nombre} {ayuda}", f"# TYPE {nombre} {tipo}", f"{nombre} {_numero(valor)}"])
+    return lineas
+
+def _escapar(valor: str) -> str:
+    return valor.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _numero(valor: float) -> str:
+    if isinstance(valor, float):
+        if math.isinf(valor):
+            return '+Inf' if valor > 0 else '-Inf'
+        if math.isnan(valor):
+            return 'NaN'
+        return repr(valor)
+    return str(valor)
@@ -0,0 +1,294 @@
+"""
+Módulo de perfilado
+Mide el tiempo de pared, las filas procesadas y los accesos a la caché de cada
+tramo de un rerun
+
+El perfilado está desactivado por defecto. Mientras no haya un perfilado en
+curso en el hilo, medir() y las funciones decoradas con perfilar() solo
+comprueban un atributo thread-local, por lo que el coste es despreciable.
+"""
+
+import functools
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterator, List, Optional
+
+import pandas as pd
+
+# Tramos por debajo de esta fracción del total no se muestran en el resumen tipo llama
+FRACCION_MINIMA_LLAMA = 0.005
+
+@dataclass
+class Tramo:
+    """
+    Tramo medido dentro de un rerun (duraciones en segundos)
+    """
+    nombre: str
+    duracion: float = 0.0
+    filas: Optional[int] = None
+    aciertos_cache: int = 0
+    fallos_cache: int = 0
+    hijos: List['Tramo'] = field(default_factory=list)
+
+    @property
+    def duracion_propia(self) -> float:
+        """Tiempo del tramo descontando el de sus hijos"""
+        return max(0.0, self.duracion - sum(h.duracion for h in self.hijos))
+
+    def recorrer(self, profundidad: int = 0) -> Iterator[tuple]:
+        """Recorre el árbol en profundidad, devolviendo (profundidad, tramo)"""
+        yield profundidad, self
+        for hijo in self.hijos:
+            yield from hijo.recorrer(profundidad + 1)
+
+class _EstadoHilo(threading.local):
+    # Pila de tramos abiertos del rerun en curso (None si no se está perfilando)
+    pila: Optional[List[Tramo]] = None
+    inicio: float = 0.0
+
+_estado = _EstadoHilo()
+
+def perfilado_por_entorno() -> bool:
+    """
+    Indica si el perfilado está activado con DASHBOARD_PERFILADO=1
+    """
+    return os.environ.get('DASHBOARD_PERFILADO', '0').lower() in ('1', 'true', 'si', 'sí')
+
+def iniciar_perfilado(nombre: str = 'rerun') -> Tramo:
+    """
+    Comienza a perfilar el hilo actual, descartando cualquier perfilado previo
+
+    Args:
+        nombre: Nombre del tramo raíz
+
+    Returns:
+        Tramo raíz, al que se irán añadiendo los tramos medidos
+    """
+    raiz = Tramo(nombre)
+    _estado.pila = [raiz]
+    _estado.inicio = time.perf_counter()
+    return raiz
+
+def finalizar_perfilado() -> Optional[Tramo]:
+    """
+    Termina el perfilado del hilo actual
+
+    Returns:
+        Tramo raíz con la duración total, o None si no había perfilado en curso
+    """
+    pila = _estado.pila
+    if not pila:
+        return None
+    raiz = pila[0]
+    raiz.duracion = time.perf_counter() - _estado.inicio
+    _estado.pila = None
+    return raiz
+
+class _Medicion:
+    __slots__ = ('_pila', '_tramo', '_inicio')
+
+    def __init__(self, pila: List[Tramo], tramo: Tramo):
+        self._pila = pila
+        self._tramo = tramo
+
+    def __enter__(self) -> Tramo:
+        self._pila[-1].hijos.append(self._tramo)
+        self._pila.append(self._tramo)
+        self._inicio = time.perf_counter()
+        return self._tramo
+
+    def __exit__(self, *exc) -> bool:
+        self._tramo.duracion = time.perf_counter() - self._inicio
+        self._pila.pop()
+        return False
+
+class _SinMedicion:
+    __slots__ = ()
+
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, *exc) -> bool:
+        return False
+
+_SIN_MEDICION = _SinMedicion()
+
+def medir(nombre: str, filas: Optional[int] = None):
+    """
+    Context manager que mide un tramo del rerun en curso
+
+    Si no hay perfilado en curso en el hilo no mide nada y entrega None.
+
+    Args:
+        nombre: Nombre del tramo
+        filas: Filas procesadas por el tramo (también puede asignarse después)
+
+    Returns:
+        Context manager que entrega el Tramo (o None)
+    """
+    pila = _estado.pila
+    if not pila:
+        return _SIN_MEDICION
+    return _Medicion(pila, Tramo(nombre, filas=filas))
+
+def anotar_cache(acierto: bool) -> None:
+    """
+    Anota un acceso a la caché en el tramo abierto más interno
+    """
+    pila = _estado.pila
+    if not pila:
+        return
+    if acierto:
+        pila[-1].aciertos_cache += 1
+    else:
+        pila[-1].fallos_cache += 1
+
+def filas_procesadas(args: tuple, kwargs: dict) -> Optional[int]:
+    """
+    Filas del primer DataFrame o Series recibido como parámetro
+    """
+    for valor in (*args, *kwargs.values()):
+        if isinstance(valor, (pd.DataFrame, pd.Series)):
+            return len(valor)
+    return None
+
+def perfilar(funcion: Optional[Callable] = None, *, nombre: Optional[str] = None) -> Callable:
+    """
+    Decorador que mide cada llamada a la función como un tramo
+
+    Registra el tiempo de pared y las filas del primer DataFrame recibido.
+
+    Args:
+        funcion: Función a perfilar
+        nombre: Nombre del tramo (por defecto, el nombre de la función)
+    """
+    def decorador(f: Callable) -> Callable:
+        etiqueta = nombre or f.__qualname__
+
+        @functools.wraps(f)
+        def envoltura(*args, **kwargs):
+            if not _estado.pila:
+                return f(*args, **kwargs)
+            with medir(etiqueta, filas_procesadas(args, kwargs)):
+                return f(*args, **kwargs)
+
+        return envoltura
+
+    if funcion is not None:
+        return decorador(funcion)
+    return decorador
+
+def en_hilo(funcion: Callable, nombre: Optional[str] = None) -> Callable:
+    """
+    Prepara una tarea que se ejecutará en otro hilo para que se perfile
+
+    El estado del perfilado es por hilo, así que los tramos medidos en un
+    pool se perderían. La tarea se mide en su hilo como un tramo propio
+    (con sus hijos y accesos a la caché) y, al terminar, se agrega como hijo
+    del tramo que estaba abierto al llamar a en_hilo. Las tareas paralelas
+    pueden sumar más tiempo que su padre.
+
+    Args:
+        funcion: Tarea a ejecutar en otro hilo
+        nombre: Nombre del tramo (por defecto, el nombre de la función)
+
+    Returns:
+        La propia función si no hay perfilado en curso; si no, una envoltura
+    """
+    pila = _estado.pila
+    if not pila:
+        return funcion
+    padre = pila[-1]
+    etiqueta = nombre or funcion.__qualname__
+
+    @functools.wraps(funcion)
+    def envoltura(*args, **kwargs):
+        anterior = (_estado.pila, _estado.inicio)
+        tramo = Tramo(etiqueta, filas=filas_procesadas(args, kwargs))
+        _estado.pila = [tramo]
+        inicio = time.perf_counter()
+        try:
+            return funcion(*args, **kwargs)
+        finally:
+            tramo.duracion = time.perf_counter() - inicio
+            _estado.pila, _estado.inicio = anterior
+            padre.hijos.append(tramo)
+
+    return envoltura
+
+def resumen_por_tramo(raiz: Tramo) -> pd.DataFrame:
+    """
+    Agrega los tramos de un rerun por nombre
+
+    Args:
+        raiz: Tramo raíz devuelto por finalizar_perfilado
+
+    Returns:
+        DataFrame ordenado por tiempo propio, con llamadas, tiempos en ms,
+        filas máximas y accesos a la caché de cada tramo
+    """
+    agregado: Dict[str, dict] = {}
+    for _, tramo in raiz.recorrer():
+        if tramo is raiz:
+            continue
+        fila = agregado.setdefault(tramo.nombre, {
+            'Tramo': tramo.nombre, 'Llamadas': 0, 'Total (ms)': 0.0, 'Propio (ms)': 0.0,
+            'Filas': None, 'Aciertos caché': 0, 'Fallos caché': 0
+        })
+        fila['Llamadas'] += 1
+        fila['Total (ms)'] += tramo.duracion * 1000
+        fila['Propio (ms)'] += tramo.duracion_propia * 1000
+        if tramo.filas is not None:
+            fila['Filas'] = max(fila['Filas'] or 0, tramo.filas)
+        fila['Aciertos caché'] += tramo.aciertos_cache
+        fila['Fallos caché'] += tramo.fallos_cache
+
+    columnas = ['Tramo', 'Llamadas', 'Total (ms)', 'Propio (ms)', 'Filas', 'Aciertos caché', 'Fallos caché']
+    resumen = pd.DataFrame(list(agregado.values()), columns=columnas)
+    resumen['Filas'] = resumen['Filas'].astype('Int64')
+    return resumen.sort_values('Propio (ms)', ascending=False, ignore_index=True)
+
+def resumen_llama(raiz: Tramo, ancho: int = 24) -> str:
+    """
+    Resumen en texto tipo gráfico de llama del árbol de tramos
+
+    Los hermanos con el mismo nombre se fusionan y se omiten los tramos
+    por debajo de FRACCION_MINIMA_LLAMA del total.
+
+    Args:
+        raiz: Tramo raíz devuelto por finalizar_perfilado
+        ancho: Ancho en caracteres de la barra del tramo raíz
+
+    Returns:
+        Texto con una línea por tramo: barra, duración en ms y nombre indentado
+    """
+    total = raiz.duracion or 1e-9
+    lineas = []
+
+    def agregar(tramo: Tramo, profundidad: int) -> None:
+        fraccion = tramo.duracion / total
+        if profundidad > 0 and fraccion < FRACCION_MINIMA_LLAMA:
+            return
+        barra = '█' * max(1, round(fraccion * ancho))
+        lineas.append(f"{barra:<{ancho}} {tramo.duracion * 1000:8.1f} ms  {'  ' * profundidad}{tramo.nombre}")
+        for hijo in _fusionar_hermanos(tramo.hijos):
+            agregar(hijo, profundidad + 1)
+
+    agregar(raiz, 0)
+    return '\n'.join(lineas)
+
+def _fusionar_hermanos(hijos: List[Tramo]) -> List[Tramo]:
+    fusionados: Dict[str, Tramo] = {}
+    for hijo in hijos:
+        actual = fusionados.get(hijo.nombre)
+        if actual is None:
+            fusionados[hijo.nombre] = Tramo(hijo.nombre, hijo.duracion, hijo.filas,
+                                            hijo.aciertos_cache, hijo.fallos_cache, list(hijo.hijos))
+        else:
+            actual.duracion += hijo.duracion
+            actual.aciertos_cache += hijo.aciertos_cache
+            actual.fallos_cache += hijo.fallos_cache
+            actual.hijos.extend(hijo.hijos)
+    return list(fusionados.values())
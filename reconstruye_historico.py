@@ -0,0 +1,37 @@
+"""
+Completa el histórico de pendientes con las fechas que faltan, reconstruidas desde los consolidados
+
+Las fechas que ya tienen registros de un proceso no se modifican.
+
+Uso:
+    python reconstruye_historico.py [--desde AAAA-MM-DD | --dias 365] [--hasta AAAA-MM-DD]
+                                    [--procesos CCM PRR]
+"""
+
+import argparse
+import time
+import pandas as pd
+from modules.data.loader import cargar_datos, obtener_archivos_proceso
+from modules.data.reconstruccion_pendientes import completar_historico_pendientes
+
+def main():
+    archivos = obtener_archivos_proceso()
+    parser = argparse.ArgumentParser(description="Completa el histórico de pendientes desde los consolidados")
+    parser.add_argument("--desde", default=None, help="Primera fecha a completar (AAAA-MM-DD)")
+    parser.add_argument("--dias", type=int, default=365, help="Días hacia atrás si no se indica --desde")
+    parser.add_argument("--hasta", default=None, help="Última fecha a completar (por defecto, ayer)")
+    parser.add_argument("--procesos", nargs="+", choices=list(archivos), default=list(archivos),
+                        help="Procesos a completar")
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    hoy = pd.Timestamp.now(tz='America/Lima').tz_localize(None).normalize()
+    hasta = pd.Timestamp(args.hasta) if args.hasta else hoy - pd.Timedelta(days=1)
+    desde = pd.Timestamp(args.desde) if args.desde else hasta - pd.Timedelta(days=args.dias - 1)
+    consolidados = {proceso: cargar_datos(archivos[proceso]) for proceso in args.procesos}
+    agregadas = completar_historico_pendientes(consolidados, desde, hasta)
+    print(f"{agregadas} filas agregadas al histórico de pendientes entre {desde:%Y-%m-%d} y {hasta:%Y-%m-%d} "
+          f"({time.perf_counter() - inicio:.1f} s)")
+
+if __name__ == "__main__":
+    main()
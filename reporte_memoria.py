@@ -0,0 +1,79 @@
+"""
+Informe de memoria de los datasets y de las tablas derivadas, sin abrir el dashboard
+
+Carga los consolidados, construye las tablas del reporte completo (las mismas
+funciones memoizadas que usan las pestañas) e imprime la memoria de cada
+dataset y artefacto cacheado, el detalle por columna, el ahorro proyectado de
+convertir a categórica o Arrow y el pico de RSS durante la carga.
+
+Uso:
+    python reporte_memoria.py [--procesos CCM PRR] [--solo-datasets] [--columnas N]
+                              [--tracemalloc] [--directorio RUTA]
+"""
+
+import argparse
+import os
+import pandas as pd
+from modules.components.reporte_completo import PROCESOS_REPORTE, construir_tablas_reporte
+from modules.data.loader import cargar_datos, obtener_archivos_proceso
+from modules.utils.memoria import (
+    atribuir_asignaciones, cargas_registradas, iniciar_rastreo, inventario_memoria,
+    pico_rss_mb, rss_actual_mb
+)
+
+def _imprimir(titulo: str, tabla: pd.DataFrame) -> None:
+    print(f"\n== {titulo} ==")
+    if tabla.empty:
+        print("(sin datos)")
+    else:
+        print(tabla.to_string(index=False, float_format=lambda v: f"{v:,.2f}", na_rep='-'))
+
+def main():
+    parser = argparse.ArgumentParser(description="Informe de memoria de datasets y tablas derivadas")
+    parser.add_argument("--procesos", nargs="+", choices=PROCESOS_REPORTE, default=list(PROCESOS_REPORTE),
+                        help="Procesos a cargar")
+    parser.add_argument("--solo-datasets", action="store_true",
+                        help="No construye las tablas derivadas del reporte")
+    parser.add_argument("--columnas", type=int, default=30,
+                        help="Columnas más pesadas a listar (0 para todas)")
+    parser.add_argument("--tracemalloc", action="store_true",
+                        help="Atribuye la memoria viva a las funciones que la asignaron (más lento)")
+    parser.add_argument("--directorio", default=None,
+                        help="Directorio que contiene ARCHIVOS/ (por defecto, el actual)")
+    args = parser.parse_args()
+
+    if args.directorio:
+        os.chdir(args.directorio)
+    if args.tracemalloc:
+        iniciar_rastreo()
+
+    archivos = obtener_archivos_proceso()
+    datasets = [cargar_datos(archivos[p]) for p in args.procesos]
+    if not args.solo_datasets:
+        construir_tablas_reporte(args.procesos)
+
+    inventario = inventario_memoria()
+    artefactos = inventario['artefactos']
+    columnas = inventario['columnas'].sort_values('Memoria (MB)', ascending=False)
+    if args.columnas:
+        columnas = columnas.head(args.columnas)
+
+    _imprimir("Cargas", cargas_registradas())
+    _imprimir("Datasets y artefactos", artefactos)
+    _imprimir("Columnas", columnas)
+    if args.tracemalloc:
+        _imprimir("Memoria viva por función (tracemalloc)", atribuir_asignaciones())
+
+    print(
+        f"\nTotal: {artefactos['Memoria (MB)'].sum():,.1f} MB en {len(artefactos)} artefactos · "
+        f"ahorro proyectado: categórica {artefactos['Ahorro categórica (MB)'].sum():,.1f} MB, "
+        f"Arrow {artefactos['Ahorro Arrow (MB)'].sum():,.1f} MB"
+    )
+    rss, pico = rss_actual_mb(), pico_rss_mb()
+    if rss is not None and pico is not None:
+        print(f"RSS actual: {rss:,.0f} MB · pico del proceso: {pico:,.0f} MB")
+    # Los datasets se mantienen vivos hasta aquí para que figuren en el inventario
+    del datasets
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+"""
+Levanta la API JSON del dashboard sin abrir Streamlit
+
+Uso:
+    python servidor_api.py [--host 127.0.0.1] [--puerto 8600] [--precargar]
+"""
+
+import argparse
+import time
+from modules.api.servidor import PUERTO_DEFECTO, crear_servidor
+from modules.data.loader import cargar_datos, obtener_archivos_proceso
+
+def main():
+    parser = argparse.ArgumentParser(description="Sirve los datos del dashboard como JSON")
+    parser.add_argument("--host", default="127.0.0.1", help="Interfaz en la que escuchar")
+    parser.add_argument("--puerto", type=int, default=PUERTO_DEFECTO, help="Puerto de la API")
+    parser.add_argument("--precargar", action="store_true",
+                        help="Carga los consolidados antes de aceptar solicitudes")
+    args = parser.parse_args()
+
+    if args.precargar:
+        inicio = time.perf_counter()
+        for archivo in obtener_archivos_proceso().values():
+            cargar_datos(archivo)
+        print(f"Consolidados cargados ({time.perf_counter() - inicio:.1f} s)")
+
+    servidor = crear_servidor(args.host, args.puerto)
+    host, puerto = servidor.server_address[:2]
+    print(f"API en http://{host}:{puerto}/api")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+
+if __name__ == "__main__":
+    main()
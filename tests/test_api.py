@@ -0,0 +1,64 @@
+"""
+API JSON: rutas, ETag y solicitudes condicionales contra un servidor real
+sobre datos sintéticos
+
+Uso:
+    python -m pytest tests -q
+"""
+
+import json
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+from modules.api.servidor import crear_servidor
+from modules.data.sintetico import escribir_datos_sinteticos
+
+@pytest.fixture(scope='module')
+def url_base(tmp_path_factory):
+    directorio = tmp_path_factory.mktemp('api')
+    escribir_datos_sinteticos(directorio / 'ARCHIVOS', 2_000)
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.chdir(directorio)
+        monkeypatch.setenv('DASHBOARD_CACHE_DISCO', '0')
+        servidor = crear_servidor(puerto=0)
+        threading.Thread(target=servidor.serve_forever, daemon=True).start()
+        yield f"http://127.0.0.1:{servidor.server_address[1]}"
+        servidor.shutdown()
+        servidor.server_close()
+
+def pedir(url: str, **cabeceras):
+    """Estado, cabeceras y cuerpo JSON (None si no hay cuerpo) de una solicitud GET"""
+    solicitud = urllib.request.Request(url, headers=cabeceras)
+    try:
+        with urllib.request.urlopen(solicitud) as respuesta:
+            estado, encabezados, cuerpo = respuesta.status, respuesta.headers, respuesta.read()
+    except urllib.error.HTTPError as e:
+        estado, encabezados, cuerpo = e.code, e.headers, e.read()
+    return estado, encabezados, json.loads(cuerpo) if cuerpo else None
+
+def test_etag_y_304(url_base):
+    estado, cabeceras, cuerpo = pedir(f"{url_base}/api/CCM/pendientes")
+    assert estado == 200 and cuerpo['proceso'] == 'CCM'
+    etag = cabeceras['ETag']
+    estado, cabeceras, cuerpo = pedir(f"{url_base}/api/CCM/pendientes", **{'If-None-Match': etag})
+    assert estado == 304 and cuerpo is None and cabeceras['ETag'] == etag
+    # Otro recurso u otros parámetros tienen otra ETag
+    assert pedir(f"{url_base}/api/PRR/pendientes")[1]['ETag'] != etag
+    assert pedir(f"{url_base}/api/CCM/pendientes", **{'If-None-Match': '"otra"'})[0] == 200
+
+def test_consulta_no_cambia_proceso_de_la_ruta(url_base):
+    estado, _, cuerpo = pedir(f"{url_base}/api/CCM/pendientes?proceso=PRR")
+    assert estado == 200 and cuerpo['proceso'] == 'CCM'
+    estado, _, cuerpo = pedir(f"{url_base}/api/ccm/produccion?proceso=XYZ")
+    assert estado == 200 and cuerpo['proceso'] == 'CCM'
+
+@pytest.mark.parametrize('ruta, esperado', [
+    ('/api', 200), ('/api/historico?proceso=PRR&dias=10', 200),
+    ('/api/XYZ/pendientes', 404), ('/api/CCM/otra', 404), ('/otra', 404),
+])
+def test_rutas(url_base, ruta, esperado):
+    estado, _, cuerpo = pedir(url_base + ruta)
+    assert estado == esperado
+    assert ('error' in cuerpo) == (esperado != 200)
@@ -0,0 +1,45 @@
+"""
+Huellas de la caché de derivados: solo el objeto marcado usa la huella
+registrada; las copias, los filtros y los objetos que reutilizan la
+dirección de uno liberado se vuelven a hashear. Las figuras cacheadas cuentan
+para el presupuesto por su tamaño real
+
+Uso:
+    python -m pytest tests -q
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from modules.utils.cache import estimar_tamano, huella_dataframe, marcar_huella
+
+def test_derivados_no_heredan_huella():
+    df = marcar_huella(pd.DataFrame({'a': range(100)}), 'registrada')
+    assert huella_dataframe(df) == 'registrada'
+    assert huella_dataframe(df.copy()) != 'registrada'
+    assert huella_dataframe(df.iloc[10:20]) != 'registrada'
+    assert huella_dataframe(df['a']) != 'registrada'
+
+def test_direccion_reutilizada():
+    # Las copias, que heredan los attrs del original, suelen terminar
+    # ocupando la dirección de un objeto marcado ya liberado
+    reutilizadas = 0
+    for _ in range(50):
+        marcado = marcar_huella(pd.DataFrame({'a': range(100)}), 'registrada')
+        padre = marcado.copy()
+        direccion = id(marcado)
+        del marcado
+        for _ in range(2_000):
+            hijo = padre.copy()
+            if id(hijo) == direccion:
+                assert huella_dataframe(hijo) != 'registrada'
+                reutilizadas += 1
+                break
+            del hijo
+    if not reutilizadas:
+        pytest.skip('ninguna copia reutilizó la dirección de un objeto marcado')
+
+def test_tamano_figura():
+    go = pytest.importorskip('plotly.graph_objects')
+    figura = go.Figure(go.Scatter(x=np.arange(100_000), y=np.random.default_rng(0).random(100_000)))
+    assert estimar_tamano(figura) > 1_000_000
@@ -0,0 +1,91 @@
+"""
+Paridad de las capas incrementales de evolución: tras cualquier secuencia de
+días nuevos, correcciones y fechas quitadas, la matriz debe ser la misma que
+pivoteando todo el histórico
+
+Uso:
+    python -m pytest tests -q
+"""
+
+import pandas as pd
+import pytest
+from modules.core import evolucion
+from modules.data.capas_evolucion import CapasEvolucion
+from modules.data.motores import tabla_dinamica
+from modules.data.sintetico import generar_historico_pendientes
+from modules.utils.analytics import agrupar_anios_antiguos
+
+PROCESO = 'CCM'
+
+@pytest.fixture(scope='module')
+def historico() -> pd.DataFrame:
+    return agrupar_anios_antiguos.sin_cache(generar_historico_pendientes(20_000))
+
+def selecciones(historico: pd.DataFrame) -> list:
+    anios = evolucion.anios_disponibles(historico, PROCESO)
+    return [['Todos'], [], [anios[0]], [anios[-1]], anios[:2], ['1999']]
+
+def assert_misma_matriz(capas: CapasEvolucion, historico: pd.DataFrame) -> None:
+    anios = evolucion.anios_disponibles(historico, PROCESO)
+    for anios_sel in selecciones(historico):
+        filtro = evolucion.filtrar_datos_historicos.sin_cache(historico, PROCESO, anios_sel, anios)
+        obtenida = capas.matriz(anios_sel)
+        if filtro.empty:
+            assert obtenida is None
+        else:
+            esperada = tabla_dinamica(filtro, 'OPERADOR', 'Fecha', 'Pendientes', funcion='sum')
+            pd.testing.assert_frame_equal(obtenida, esperada.reindex(sorted(esperada.columns), axis=1))
+
+def test_dia_nuevo(historico):
+    ultima = historico['Fecha'].max()
+    capas = CapasEvolucion(PROCESO)
+    capas.sincronizar(historico[historico['Fecha'] < ultima])
+    anios_ultima = historico.loc[(historico['Fecha'] == ultima) & (historico['Proceso'] == PROCESO), 'Año']
+    assert capas.sincronizar(historico) == anios_ultima.nunique()
+    assert_misma_matriz(capas, historico)
+    assert capas.sincronizar(historico) == 0
+
+def test_correccion_y_fecha_quitada(historico):
+    capas = CapasEvolucion(PROCESO)
+    capas.sincronizar(historico)
+    corregido = historico.copy()
+    fila = corregido.index[corregido['Proceso'] == PROCESO][10]
+    corregido.loc[fila, 'Pendientes'] += 7
+    quitada = sorted(corregido['Fecha'].unique())[3]
+    corregido = corregido[corregido['Fecha'] != quitada]
+    # Se rehace solo la columna corregida y se quitan las de la fecha
+    anios_quitada = historico.loc[(historico['Fecha'] == quitada) & (historico['Proceso'] == PROCESO), 'Año']
+    assert capas.sincronizar(corregido) == 1 + anios_quitada.nunique()
+    assert_misma_matriz(capas, corregido)
+
+def test_operador_nuevo(historico):
+    capas = CapasEvolucion(PROCESO)
+    capas.sincronizar(historico)
+    ultima = historico[(historico['Fecha'] == historico['Fecha'].max()) & (historico['Proceso'] == PROCESO)]
+    nuevo = ultima.head(1).assign(OPERADOR='AAA OPERADOR NUEVO', Pendientes=3)
+    ampliado = pd.concat([historico, nuevo], ignore_index=True)
+    capas.sincronizar(ampliado)
+    assert_misma_matriz(capas, ampliado)
+
+def test_calcular_evolucion_usa_capas(monkeypatch, historico):
+    monkeypatch.setenv('DASHBOARD_CACHE_DISCO', '0')
+    anios = evolucion.anios_disponibles(historico, PROCESO)
+    filtro = evolucion.filtrar_datos_historicos.sin_cache(historico, PROCESO, ['Todos'], anios)
+    resultado = evolucion.calcular_evolucion(historico, PROCESO, ['Todos'])
+    pd.testing.assert_frame_equal(resultado.matriz, evolucion.crear_matriz_evolucion.sin_cache(filtro))
+
+def test_grilla_incompleta():
+    # Un año nuevo no tiene filas en las fechas anteriores
+    historico = pd.DataFrame({
+        'Fecha': ['2025-01-01', '2025-01-02', '2025-01-02'],
+        'Proceso': PROCESO,
+        'OPERADOR': ['OPERADOR A', 'OPERADOR A', 'OPERADOR B'],
+        'Año': ['2024', '2024', '2025'],
+        'Pendientes': [5, 4, 2]
+    })
+    capas = CapasEvolucion(PROCESO)
+    assert capas.sincronizar(historico) == 3
+    assert_misma_matriz(capas, historico)
+    recortado = historico.iloc[:2]
+    assert capas.sincronizar(recortado) == 1
+    assert_misma_matriz(capas, recortado)
@@ -0,0 +1,110 @@
+"""
+Paridad de los motores de cálculo: polars y duckdb deben producir exactamente
+las mismas tablas que pandas
+
+Uso:
+    python -m pytest tests -q
+"""
+
+import pandas as pd
+import pytest
+from modules.core import evolucion, ingresos, produccion
+from modules.data.loader import crear_tabla_pendientes, procesar_pendientes
+from modules.data.motores import agregar, motores_disponibles, obtener_motor, tabla_dinamica
+from modules.data.sintetico import generar_consolidado, generar_historico_pendientes
+from modules.utils.analytics import agrupar_anios_antiguos
+
+MOTORES_ALTERNATIVOS = ('polars', 'duckdb')
+
+COL_OPERADOR, COL_FECHA, COL_TRAMITE = 'OperadorPre', 'FechaPre', 'NumeroTramite'
+
+@pytest.fixture(scope='module')
+def consolidado() -> pd.DataFrame:
+    return generar_consolidado(20_000, 'CCM')
+
+@pytest.fixture(scope='module')
+def historico() -> pd.DataFrame:
+    return agrupar_anios_antiguos.sin_cache(generar_historico_pendientes(20_000))
+
+@pytest.fixture(params=MOTORES_ALTERNATIVOS)
+def motor(request, monkeypatch) -> str:
+    """Motor alternativo; el cálculo de referencia se hace con pandas"""
+    pytest.importorskip(request.param)
+    monkeypatch.setenv('DASHBOARD_MOTOR', 'pandas')
+    return request.param
+
+def con_motor(monkeypatch, motor: str, funcion, *args):
+    """Resultado de funcion con el motor indicado y con pandas"""
+    referencia = funcion(*args)
+    monkeypatch.setenv('DASHBOARD_MOTOR', motor)
+    assert obtener_motor().nombre == motor
+    resultado = funcion(*args)
+    monkeypatch.setenv('DASHBOARD_MOTOR', 'pandas')
+    return resultado, referencia
+
+def test_pandas_equivale_a_pivot_table(consolidado):
+    filtrado = procesar_pendientes.sin_cache(consolidado, 'CCM')
+    esperado = pd.pivot_table(filtrado, index='OPERADOR', columns='Anio', values='NumeroTramite',
+                              aggfunc='count', fill_value=0, margins=True, margins_name='Total')
+    obtenido = tabla_dinamica(filtrado, 'OPERADOR', 'Anio', 'NumeroTramite', margenes='Total')
+    pd.testing.assert_frame_equal(obtenido, esperado)
+
+def test_motor_no_instalado_usa_pandas(monkeypatch):
+    for nombre in MOTORES_ALTERNATIVOS:
+        if nombre not in motores_disponibles():
+            assert obtener_motor(nombre).nombre == 'pandas'
+    with pytest.raises(ValueError):
+        obtener_motor('spark')
+
+def test_tabla_pendientes(monkeypatch, motor, consolidado):
+    filtrado = procesar_pendientes.sin_cache(consolidado, 'CCM')
+    resultado, referencia = con_motor(monkeypatch, motor, crear_tabla_pendientes.sin_cache, filtrado, 'CCM')
+    pd.testing.assert_frame_equal(resultado, referencia)
+
+def test_tabla_produccion(monkeypatch, motor, consolidado):
+    df_20dias = produccion.filtrar_ultimos_20_dias.sin_cache(consolidado, COL_FECHA)
+    resultado, referencia = con_motor(monkeypatch, motor, produccion.crear_tabla_produccion.sin_cache,
+                                      df_20dias, COL_OPERADOR, COL_FECHA, COL_TRAMITE)
+    pd.testing.assert_frame_equal(resultado, referencia)
+
+def test_tabla_fines_semana(monkeypatch, motor, consolidado):
+    resultado, referencia = con_motor(monkeypatch, motor, produccion.crear_tabla_fines_semana.sin_cache,
+                                      consolidado, COL_OPERADOR, COL_FECHA, COL_TRAMITE)
+    pd.testing.assert_frame_equal(resultado, referencia)
+
+def test_ingresos_diarios(monkeypatch, motor, consolidado):
+    resultado, referencia = con_motor(monkeypatch, motor, ingresos.calcular_ingresos_diarios.sin_cache,
+                                      consolidado, 'FechaExpendiente', COL_TRAMITE)
+    pd.testing.assert_frame_equal(resultado, referencia)
+
+def test_matriz_evolucion(monkeypatch, motor, historico):
+    anios = sorted(historico['Año'].unique(), reverse=True)
+    filtro = evolucion.filtrar_datos_historicos.sin_cache(historico, 'CCM', ['Todos'], anios)
+    resultado, referencia = con_motor(monkeypatch, motor, evolucion.crear_matriz_evolucion.sin_cache, filtro)
+    pd.testing.assert_frame_equal(resultado, referencia)
+
+@pytest.mark.parametrize('filtros', [
+    [('EstadoTramite', '==', 'PENDIENTE')],
+    [('EQUIPO', '!=', 'VULNERABLE'), ('Anio', '>=', 2022)],
+    [('UltimaEtapa', 'en', ['EVALUACIÓN - I', 'EVALUACIÓN - F'])],
+    [('EstadoPre', 'no_en', ['APROBADO']), ('Anio', '<=', 2023)],
+    [('FechaPre', 'dia_semana_en', [0, 5, 6])],
+], ids=['igual', 'distinto_mayor', 'en', 'no_en_menor', 'dia_semana'])
+def test_filtros_con_nulos(monkeypatch, motor, consolidado, filtros):
+    # OPERADOR y EstadoPre tienen nulos: deben tratarse igual que en pandas
+    resultado, referencia = con_motor(monkeypatch, motor, agregar, consolidado,
+                                      ['OPERADOR', 'Anio'], COL_TRAMITE, 'count', filtros)
+    pd.testing.assert_frame_equal(resultado, referencia)
+
+def test_solo_columnas_no_soportadas_usan_pandas(monkeypatch):
+    pytest.importorskip('polars')
+    mezclada = pd.DataFrame({'OPERADOR': ['A', 1, 'A'], 'Anio': [2024, 2024, 2025], 'n': [1, 2, 3]})
+    pd.testing.assert_frame_equal(agregar(mezclada, ['OPERADOR', 'Anio'], 'n', 'sum', motor='polars'),
+                                  agregar(mezclada, ['OPERADOR', 'Anio'], 'n', 'sum', motor='pandas'))
+
+    # Cualquier otro error del motor se propaga en lugar de ocultarse tras pandas
+    def falla(*args):
+        raise ValueError('error del motor')
+    monkeypatch.setattr(obtener_motor('polars'), 'agregar', falla)
+    with pytest.raises(ValueError, match='error del motor'):
+        agregar(mezclada.astype({'OPERADOR': str}), ['OPERADOR', 'Anio'], 'n', 'sum', motor='polars')
@@ -0,0 +1,25 @@
+"""
+Dimensión de operadores: las grafías se agrupan sin importar tildes,
+mayúsculas ni espacios, y los nombres que se guardan en el histórico no
+dependen del orden en que se vieron las grafías
+
+Uso:
+    python -m pytest tests -q
+"""
+
+import pandas as pd
+from modules.data.loader import preparar_historico_pendientes
+from modules.data.operadores import DimensionOperadores, canonizar, es_operador
+
+def test_grafias_mismo_id():
+    dimension = DimensionOperadores({'PEREZ, J.': 'Pérez, José'})
+    ids = dimension.codificar(['Perez, Jose', ' PÉREZ,  JOSÉ ', 'perez, j.', None])
+    assert ids[0] == ids[1] == ids[2] and ids[3] < 0
+    assert es_operador(pd.Series(['APONTE SÁNCHEZ,  PAOLA LITA']), ['Aponte Sanchez, Paola Lita'])[0]
+
+def test_historico_no_depende_del_orden():
+    # La dimensión compartida ya vio la grafía sin tildes
+    canonizar(pd.Series(['Perez, Jose']))
+    tabla = pd.DataFrame({2024: [3], 2025: [1]}, index=pd.Index([' Pérez, José'], name='OPERADOR'))
+    historico = preparar_historico_pendientes(tabla, 'CCM')
+    assert set(historico['OPERADOR']) == {'PÉREZ, JOSÉ'}
@@ -0,0 +1,40 @@
+"""
+Perfilado de tareas en otros hilos: sus tramos y accesos a la caché se
+anotan bajo el tramo que las lanzó
+
+Uso:
+    python -m pytest tests -q
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+from modules.utils.perfilado import (
+    anotar_cache, en_hilo, finalizar_perfilado, iniciar_perfilado, medir, perfilar
+)
+
+@perfilar
+def calculo(valor: int) -> int:
+    anotar_cache(valor % 2 == 0)
+    return valor * 2
+
+def tarea(valor: int) -> int:
+    return calculo(valor)
+
+def test_tramos_de_otros_hilos():
+    iniciar_perfilado()
+    with medir('paralelo'):
+        with ThreadPoolExecutor(max_workers=2) as ejecutor:
+            futuros = [ejecutor.submit(en_hilo(tarea, f'tarea[{i}]'), i) for i in range(2)]
+            assert [f.result() for f in futuros] == [0, 2]
+    raiz = finalizar_perfilado()
+
+    paralelo, = raiz.hijos
+    tareas = sorted(paralelo.hijos, key=lambda t: t.nombre)
+    assert [t.nombre for t in tareas] == ['tarea[0]', 'tarea[1]']
+    for tramo, acierto in zip(tareas, (1, 0)):
+        hijo, = tramo.hijos
+        assert hijo.nombre == calculo.__qualname__
+        assert (hijo.aciertos_cache, hijo.fallos_cache) == (acierto, 1 - acierto)
+
+def test_sin_perfilado_no_envuelve():
+    assert en_hilo(tarea) is tarea
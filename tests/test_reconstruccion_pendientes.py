@@ -0,0 +1,96 @@
+"""
+Reconstrucción de pendientes desde el consolidado: al día del consolidado
+debe coincidir con la foto de la pestaña de Pendientes, en fechas pasadas con
+el conteo directo de los intervalos ingreso-pretrabajo, y al completar el
+histórico no debe tocar las fechas ya registradas ni impedir armar la
+matriz de Evolución
+
+Uso:
+    python -m pytest tests -q
+"""
+
+import pandas as pd
+import pytest
+from modules.core import evolucion
+from modules.data.loader import (
+    crear_tabla_pendientes, mascara_pendientes, preparar_historico_pendientes, procesar_pendientes
+)
+from modules.data.operadores import normalizar_operadores
+from modules.data import reconstruccion_pendientes
+from modules.data.reconstruccion_pendientes import completar_historico_pendientes, linea_pendientes
+from modules.data.sintetico import generar_consolidado
+from modules.utils.analytics import agrupar_anios_antiguos
+
+CLAVES = ['Proceso', 'OPERADOR', 'Año']
+
+@pytest.fixture(scope='module', params=['CCM', 'PRR'])
+def consolidado(request):
+    return request.param, generar_consolidado(20_000, request.param)
+
+def ordenar(df: pd.DataFrame) -> pd.DataFrame:
+    return df.sort_values(CLAVES).reset_index(drop=True)
+
+def test_coincide_con_tabla_actual(consolidado):
+    proceso, df = consolidado
+    tabla = crear_tabla_pendientes.sin_cache(procesar_pendientes.sin_cache(df, proceso), proceso)
+    esperado = preparar_historico_pendientes(tabla, proceso).drop(columns='Fecha')
+    obtenido = linea_pendientes.sin_cache(df, proceso).historico([df['FechaExpendiente'].max()])
+    pd.testing.assert_frame_equal(ordenar(obtenido.drop(columns='Fecha')), ordenar(esperado),
+                                  check_dtype=False)
+
+def test_fechas_pasadas(consolidado):
+    proceso, df = consolidado
+    linea = linea_pendientes.sin_cache(df, proceso)
+    fechas = pd.date_range(end=df['FechaExpendiente'].max(), periods=12, freq='90D')
+    pendientes = linea.pendientes_en(fechas)
+    pendiente_hoy = mascara_pendientes(df, proceso)
+    for i, fecha in enumerate(fechas):
+        abiertos = df[
+            (df['EQUIPO'] != 'VULNERABLE') & (df['FechaExpendiente'] <= fecha) &
+            (pendiente_hoy | (df['FechaPre'] > fecha))
+        ]
+        esperado = abiertos.groupby([normalizar_operadores(abiertos['OPERADOR'].fillna('Sin asignar')),
+                                     abiertos['Anio'].astype(str)]).size()
+        obtenido = pd.Series(pendientes[i].ravel(),
+                             index=pd.MultiIndex.from_product([linea.operadores, linea.anios]))
+        assert obtenido[obtenido > 0].sort_index().to_dict() == esperado.sort_index().to_dict()
+
+def test_completar_historico(tmp_path):
+    df = generar_consolidado(5_000, 'CCM')
+    ruta = tmp_path / 'historico_pendientes_operador.csv'
+    fin = df['FechaExpendiente'].max()
+    registrada = pd.DataFrame({'Fecha': [f"{fin - pd.Timedelta(days=2):%Y-%m-%d}"], 'Proceso': ['CCM'],
+                               'OPERADOR': ['OPERADOR REGISTRADO'], 'Año': ['2025'], 'Pendientes': [1]})
+    registrada.to_csv(ruta, index=False)
+
+    agregadas = completar_historico_pendientes({'CCM': df}, fin - pd.Timedelta(days=4), fin, ruta=str(ruta))
+    historico = pd.read_csv(ruta, dtype=str)
+    assert agregadas == len(historico) - 1
+    # La fecha ya registrada conserva su única fila; las otras cuatro se reconstruyen
+    por_fecha = historico.groupby('Fecha')['OPERADOR'].unique()
+    assert list(por_fecha.iloc[2]) == ['OPERADOR REGISTRADO']
+    assert len(por_fecha) == 5
+    assert completar_historico_pendientes({'CCM': df}, fin - pd.Timedelta(days=4), fin, ruta=str(ruta)) == 0
+
+def test_historico_por_bloques(monkeypatch, consolidado):
+    proceso, df = consolidado
+    linea = linea_pendientes.sin_cache(df, proceso)
+    fechas = pd.date_range(end=df['FechaExpendiente'].max(), periods=40)
+    completo = linea.historico(fechas)
+    monkeypatch.setattr(reconstruccion_pendientes, 'CELDAS_POR_BLOQUE', 1)
+    pd.testing.assert_frame_equal(linea.historico(fechas), completo)
+
+def test_evolucion_con_historico_completado(monkeypatch, tmp_path):
+    monkeypatch.setenv('DASHBOARD_CACHE_DISCO', '0')
+    ruta = tmp_path / 'historico_pendientes_operador.csv'
+    # Cruza el cambio de año: las fechas de diciembre no tienen filas de 2024
+    completar_historico_pendientes({'CCM': generar_consolidado(5_000, 'CCM')},
+                                   '2023-12-15', '2024-01-20', ruta=str(ruta))
+    historico = agrupar_anios_antiguos.sin_cache(pd.read_csv(ruta, dtype={'Año': str}))
+    assert historico.groupby('Fecha')['Año'].nunique().nunique() > 1
+
+    anios = evolucion.anios_disponibles(historico, 'CCM')
+    for anios_sel in (['Todos'], ['ANTIGUOS']):
+        filtro = evolucion.filtrar_datos_historicos.sin_cache(historico, 'CCM', anios_sel, anios)
+        resultado = evolucion.calcular_evolucion(historico, 'CCM', anios_sel)
+        pd.testing.assert_frame_equal(resultado.matriz, evolucion.crear_matriz_evolucion.sin_cache(filtro))